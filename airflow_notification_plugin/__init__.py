@@ -2,7 +2,7 @@
 Airflow Notification Plugin - A comprehensive notification management system for Apache Airflow.
 
 This plugin provides:
-- Multi-channel notification support (Slack, SMS, Youdu, FCM, APNS)
+- Multi-channel notification support (Slack, SMS, Youdu, FCM, APNS, Web Push, Email, webhooks)
 - Subscription management for DAG events
 - Flask-Admin UI for configuration
 - Event listeners for task status changes
@@ -20,8 +20,11 @@ from airflow_notification_plugin.views import (
     DagSubscriptionView,
     NotificationTemplateView,
     DeviceRegistrationView,
+    UserContactView,
 )
 from airflow_notification_plugin.api.device_registration import device_registration_blueprint
+from airflow_notification_plugin.api.metrics import metrics_blueprint
+from airflow_notification_plugin.api.templates import templates_blueprint
 
 
 class NotificationHubView(BaseView):
@@ -51,7 +54,7 @@ class AirflowNotificationPlugin(AirflowPlugin):
     name = "notification_hub"
     
     # Flask blueprints for API endpoints
-    flask_blueprints = [device_registration_blueprint]
+    flask_blueprints = [device_registration_blueprint, metrics_blueprint, templates_blueprint]
     
     # Admin views for management UI
     admin_views = [
@@ -59,6 +62,7 @@ class AirflowNotificationPlugin(AirflowPlugin):
         DagSubscriptionView,
         NotificationTemplateView,
         DeviceRegistrationView,
+        UserContactView,
     ]
     
     # Airflow listeners (registered separately)
@@ -1,5 +1,7 @@
 """API endpoints for the notification plugin."""
 
 from airflow_notification_plugin.api.device_registration import device_registration_blueprint
+from airflow_notification_plugin.api.metrics import metrics_blueprint
+from airflow_notification_plugin.api.templates import templates_blueprint
 
-__all__ = ["device_registration_blueprint"]
+__all__ = ["device_registration_blueprint", "metrics_blueprint", "templates_blueprint"]
@@ -23,7 +23,7 @@ def register_device():
     Expected JSON payload:
     {
         "device_token": "string",
-        "platform_type": "pwa|ios|android",
+        "platform_type": "pwa|ios|android|webpush",
         "user_id": "string"
     }
     
@@ -0,0 +1,23 @@
+"""Prometheus scrape endpoint for the notification plugin."""
+
+from flask import Blueprint, Response
+
+from airflow_notification_plugin.metrics import CONTENT_TYPE_LATEST, generate_metrics
+
+
+metrics_blueprint = Blueprint(
+    "notification_metrics",
+    __name__,
+    url_prefix="/api/v1/notification"
+)
+
+
+@metrics_blueprint.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Expose dispatch pipeline metrics in the Prometheus text format.
+    
+    In multiprocess mode (``PROMETHEUS_MULTIPROC_DIR`` set) this aggregates
+    the samples written by every process on the node.
+    """
+    return Response(generate_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,51 @@
+"""REST API for inspecting template resolution."""
+
+from flask import Blueprint, request, jsonify
+from airflow.settings import Session as AirflowSession
+
+from airflow_notification_plugin.dispatchers.templates import TemplateTable
+
+
+templates_blueprint = Blueprint(
+    "notification_templates",
+    __name__,
+    url_prefix="/api/v1/notification"
+)
+
+
+@templates_blueprint.route("/template-resolution", methods=["GET"])
+def template_resolution():
+    """
+    List the template every event type and channel type pair resolves to.
+    
+    Query parameters:
+        dag_id: Resolve for this DAG, including its per-DAG overrides (optional)
+    
+    Returns:
+    {
+        "success": true,
+        "dag_id": "etl",
+        "resolution": [
+            {"event_type": "task_failed", "channel_type": "slack",
+             "template": "slack_task_failed", "source": "channel"},
+            ...
+        ]
+    }
+    """
+    dag_id = request.args.get("dag_id") or None
+    session = AirflowSession()
+    try:
+        table = TemplateTable()
+        table.refresh(session)
+        return jsonify({
+            "success": True,
+            "dag_id": dag_id,
+            "resolution": table.resolution(dag_id),
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Database error: {str(e)}"
+        }), 500
+    finally:
+        session.close()
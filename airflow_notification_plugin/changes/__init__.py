@@ -0,0 +1,264 @@
+"""Change notifications for the dispatcher's caches of admin-edited tables.
+
+Whoever changes subscriptions, channels, templates or contacts calls
+``bump`` in the same transaction (or ``notify_change`` after committing).
+That increments the table's row in ``notification_meta`` and the ``*`` row
+covering all tables, creating them on first use with an upsert
+(``ON CONFLICT DO UPDATE``, or ``ON DUPLICATE KEY UPDATE`` on MySQL). On PostgreSQL it also sends a ``NOTIFY`` on the
+``notification_meta`` channel, which is delivered when the transaction
+commits.
+
+``ChangeWatcher`` runs callbacks for the tables whose generation moved. The
+dispatcher calls ``check`` at most once per ``NOTIFICATION_CHANGE_CHECK_SECONDS``
+and invalidates the matching caches. Changes are found through a listener
+chosen by ``NOTIFICATION_CHANGE_LISTENER``:
+
+- ``notify``: ``LISTEN`` on a dedicated psycopg2 connection. A check only
+  reads notifications already received on its socket, with no query.
+- ``poll``: read the ``*`` row by primary key. Only when its generation moved,
+  read the per-table rows to see which tables changed.
+- ``auto`` (default): ``notify`` on PostgreSQL with psycopg2, else ``poll``.
+- ``none``: caches expire only on their own refresh intervals.
+
+The ``LISTEN`` connection is held for the life of the process, so only
+long-lived processes (the dispatch worker) use ``notify``; short-lived task
+processes poll whatever the setting, rather than each holding a connection.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import NotificationMeta
+
+logger = logging.getLogger(__name__)
+
+# Row bumped with every change, so pollers only need to read one row
+ALL_TABLES = "*"
+NOTIFY_CHANNEL = "notification_meta"
+# Pause after a failed check (e.g. the table is not created yet) instead of retrying every second
+ERROR_BACKOFF_SECONDS = 60
+# Dialects whose INSERT can increment an existing row instead of failing
+_UPSERT_INSERTS = {"mysql": mysql.insert, "postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def bump(session: Session, *tables: str) -> None:
+    """Bump the generations of ``tables`` as part of the session's transaction."""
+    tables = tuple(sorted(set(tables)))
+    if not tables:
+        return
+    dialect = session.get_bind().dialect.name
+    for table in tables + (ALL_TABLES,):
+        _increment(session, dialect, table)
+    if dialect == "postgresql":
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": ",".join(tables)},
+        )
+
+
+def _increment(session: Session, dialect: str, table: str) -> None:
+    """Increment the generation of ``table``, creating its row on first use."""
+    now = datetime.utcnow()
+    increment = {"generation": NotificationMeta.generation + 1, "updated_at": now}
+    insert = _UPSERT_INSERTS.get(dialect)
+    if insert is not None:
+        # One upsert, so concurrent first edits of a table cannot both try to insert its row
+        statement = insert(NotificationMeta).values(table_name=table, generation=1, updated_at=now)
+        if dialect == "mysql":
+            statement = statement.on_duplicate_key_update(**increment)
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=[NotificationMeta.table_name], set_=increment
+            )
+        session.execute(statement)
+        return
+
+    # Elsewhere a concurrent first edit of the table may fail on the primary key and roll back
+    updated = session.query(NotificationMeta).filter(
+        NotificationMeta.table_name == table
+    ).update(
+        {NotificationMeta.generation: NotificationMeta.generation + 1, NotificationMeta.updated_at: now},
+        synchronize_session=False,
+    )
+    if not updated:
+        session.add(NotificationMeta(table_name=table, generation=1))
+
+
+def notify_change(session: Session, *tables: str) -> bool:
+    """
+    Record committed changes to ``tables`` in a transaction of their own.
+
+    Returns:
+        bool: True if the generations were bumped
+    """
+    try:
+        bump(session, *tables)
+        session.commit()
+        return True
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error recording changes to {', '.join(tables)}: {str(e)}")
+        return False
+
+
+class PollingListener:
+    """Finds changed tables by polling ``notification_meta``."""
+
+    def __init__(self):
+        self._generations: Optional[Dict[str, int]] = None
+
+    def changed_tables(self, session: Session) -> Set[str]:
+        overall = session.query(NotificationMeta.generation).filter(
+            NotificationMeta.table_name == ALL_TABLES
+        ).scalar()
+        if self._generations is not None and self._generations.get(ALL_TABLES) == overall:
+            return set()
+
+        generations = dict(session.query(NotificationMeta.table_name, NotificationMeta.generation))
+        previous, self._generations = self._generations, generations
+        if previous is None:
+            return set()
+        return {
+            table for table, generation in generations.items()
+            if table != ALL_TABLES and previous.get(table) != generation
+        }
+
+
+class NotifyListener:
+    """Receives changed tables through PostgreSQL ``LISTEN``."""
+
+    def __init__(self, session: Session):
+        connection = session.get_bind().raw_connection()
+        # Keep the connection out of the pool; it stays in LISTEN mode for good
+        connection.detach()
+        self._connection = connection.connection
+        if not hasattr(self._connection, "notifies"):
+            connection.close()
+            raise TypeError("the database driver does not deliver notifications")
+        self._connection.autocommit = True
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+    def changed_tables(self, session: Session) -> Set[str]:
+        # Reads whatever arrived on the socket; no round trip to the server
+        self._connection.poll()
+        tables = set()
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            tables.update(table for table in notification.payload.split(",") if table)
+        return tables
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def create_listener(session: Session, kind: Optional[str] = None, long_lived: bool = True):
+    """
+    Listener for ``kind`` (default ``NOTIFICATION_CHANGE_LISTENER``), or None if disabled.
+
+    A process that is not ``long_lived`` always gets a ``PollingListener``.
+    """
+    kind = (kind or config.CHANGE_LISTENER).lower()
+    if kind == "none":
+        return None
+    if kind in ("auto", "notify") and not long_lived:
+        return PollingListener()
+    if kind in ("auto", "notify") and session.get_bind().dialect.name == "postgresql":
+        try:
+            return NotifyListener(session)
+        except Exception as e:
+            logger.warning(f"LISTEN/NOTIFY unavailable, polling for changes: {str(e)}")
+    elif kind == "notify":
+        logger.warning("LISTEN/NOTIFY needs PostgreSQL, polling for changes")
+    elif kind not in ("auto", "poll"):
+        logger.warning(f"Unknown change listener: {kind}, polling for changes")
+    return PollingListener()
+
+
+class ChangeWatcher:
+    """
+    Runs the callbacks of tables whose generation moved since the last check.
+
+    Args:
+        check_seconds: Minimum interval between checks
+        listener: Listener kind, default ``NOTIFICATION_CHANGE_LISTENER``
+        long_lived: Whether the process may hold a ``LISTEN`` connection
+    """
+
+    def __init__(
+        self,
+        check_seconds: Optional[float] = None,
+        listener: Optional[str] = None,
+        long_lived: bool = False,
+    ):
+        self.check_seconds = config.CHANGE_CHECK_SECONDS if check_seconds is None else check_seconds
+        self._kind = listener
+        self.long_lived = long_lived
+        self._listener = None
+        self._pid: Optional[int] = None
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, table: str, callback: Callable[[], None]) -> None:
+        """Call ``callback`` whenever ``table`` changes."""
+        self._callbacks.setdefault(table, []).append(callback)
+
+    def check(self, session: Session) -> Set[str]:
+        """
+        Invalidate after changes, if a check is due.
+
+        Returns:
+            Set[str]: Tables found changed
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return set()
+        if not self._lock.acquire(blocking=False):
+            return set()
+        try:
+            self._checked_at = now
+            if self._pid != os.getpid():
+                # A forked process must not share its parent's LISTEN connection
+                self._pid = os.getpid()
+                self._listener = create_listener(session, self._kind, self.long_lived)
+            if self._listener is None:
+                return set()
+            try:
+                tables = self._listener.changed_tables(session)
+            except Exception as e:
+                logger.error(f"Error checking for configuration changes: {str(e)}")
+                session.rollback()
+                self._checked_at = now + ERROR_BACKOFF_SECONDS
+                if isinstance(self._listener, NotifyListener):
+                    self._close_listener()
+                    self._listener = PollingListener()
+                return set()
+        finally:
+            self._lock.release()
+
+        for table in tables:
+            for callback in self._callbacks.get(table, ()):
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error invalidating cache of {table}: {str(e)}")
+        if tables:
+            logger.info(f"Configuration changed: {', '.join(sorted(tables))}")
+        return tables
+
+    def _close_listener(self) -> None:
+        # The connection is detached from the pool, so nothing else would ever close it
+        try:
+            self._listener.close()
+        except Exception as e:
+            logger.warning(f"Error closing change listener connection: {str(e)}")
@@ -23,6 +23,121 @@ class NotificationConfig:
     
     # Logging
     LOG_LEVEL = os.getenv("NOTIFICATION_LOG_LEVEL", "INFO")
+
+    # Delivery log (notification_delivery table)
+    DELIVERY_LOG_ENABLED = os.getenv("NOTIFICATION_DELIVERY_LOG_ENABLED", "true").lower() == "true"
+    DELIVERY_LOG_BATCH_SIZE = int(os.getenv("NOTIFICATION_DELIVERY_LOG_BATCH_SIZE", "100"))
+    DELIVERY_LOG_FLUSH_INTERVAL_MS = int(os.getenv("NOTIFICATION_DELIVERY_LOG_FLUSH_MS", "2000"))
+    DELIVERY_LOG_RETENTION_DAYS = int(os.getenv("NOTIFICATION_DELIVERY_LOG_RETENTION_DAYS", "30"))
+    DELIVERY_LOG_PURGE_CHUNK_SIZE = int(os.getenv("NOTIFICATION_DELIVERY_LOG_PURGE_CHUNK", "1000"))
+    
+    # Metrics (see also PROMETHEUS_MULTIPROC_DIR for multiprocess collection)
+    METRICS_TEXTFILE_PATH = os.getenv("NOTIFICATION_METRICS_TEXTFILE", "")
+    METRICS_TEXTFILE_INTERVAL = int(os.getenv("NOTIFICATION_METRICS_TEXTFILE_INTERVAL", "15"))
+    
+    # Tracing backend: "none" or "opentelemetry"
+    TRACING_BACKEND = os.getenv("NOTIFICATION_TRACING", "none").lower()
+    
+    # Event transport used by the listeners: "sync" dispatches in the task
+    # process, "outbox" queues events for the standalone dispatch worker and
+    # "socket" sends them to a node-local worker (sidecar) over a Unix socket
+    TRANSPORT = os.getenv("NOTIFICATION_TRANSPORT", "sync").lower()
+    SIDECAR_BUFFER_SIZE = int(os.getenv("NOTIFICATION_SIDECAR_BUFFER_SIZE", "64"))
+    
+    # Standalone dispatch worker
+    WORKER_PROCESSES = int(os.getenv("NOTIFICATION_WORKER_PROCESSES", "4"))
+    WORKER_SEND_CONCURRENCY = int(os.getenv("NOTIFICATION_WORKER_SEND_CONCURRENCY", "16"))
+    WORKER_BATCH_SIZE = int(os.getenv("NOTIFICATION_WORKER_BATCH_SIZE", "50"))
+    WORKER_POLL_INTERVAL = float(os.getenv("NOTIFICATION_WORKER_POLL_INTERVAL", "1.0"))
+    WORKER_DRAIN_TIMEOUT = int(os.getenv("NOTIFICATION_WORKER_DRAIN_TIMEOUT", "30"))
+    WORKER_PROBE_PORT = int(os.getenv("NOTIFICATION_WORKER_PROBE_PORT", "8794"))
+    # Anyone who can write to the sidecar socket can send alerts with the channels'
+    # credentials: keep it in a private directory (created 0700 by the worker)
+    WORKER_SOCKET_PATH = os.getenv(
+        "NOTIFICATION_WORKER_SOCKET",
+        os.path.join(
+            os.getenv("AIRFLOW_HOME", os.path.expanduser("~/airflow")), "run", "notification.sock"
+        ),
+    )
+    OUTBOX_LEASE_SECONDS = int(os.getenv("NOTIFICATION_OUTBOX_LEASE_SECONDS", "300"))
+    
+    # Seconds between reloads of glob/regex/tag/owner subscriptions, and between
+    # incremental refreshes of the DAG tag/owner index from Airflow's dag tables
+    PATTERN_REFRESH_SECONDS = float(os.getenv("NOTIFICATION_PATTERN_REFRESH_SECONDS", "60"))
+    DAG_INDEX_REFRESH_SECONDS = float(os.getenv("NOTIFICATION_DAG_INDEX_REFRESH_SECONDS", "30"))
+    
+    # Node-wide routing snapshot (subscriptions, channels, templates) in a memory-mapped
+    # file shared by all dispatcher processes; empty routes from the database. The file is
+    # rebuilt by one dispatch worker process once it is older than
+    # ROUTING_SNAPSHOT_REFRESH_SECONDS; task processes only read it. It holds
+    # channel secrets: keep it in a directory only the Airflow user can access
+    ROUTING_SNAPSHOT_PATH = os.getenv("NOTIFICATION_ROUTING_SNAPSHOT_PATH", "")
+    ROUTING_SNAPSHOT_REFRESH_SECONDS = float(
+        os.getenv("NOTIFICATION_ROUTING_SNAPSHOT_REFRESH_SECONDS", "30")
+    )
+    
+    # How dispatchers learn about admin edits (notification_meta generations): "auto"
+    # (LISTEN/NOTIFY on PostgreSQL, else polling), "notify", "poll" or "none"; checked at
+    # most every CHANGE_CHECK_SECONDS. Task processes poll rather than hold a LISTEN
+    # connection; only the dispatch worker listens
+    CHANGE_LISTENER = os.getenv("NOTIFICATION_CHANGE_LISTENER", "auto").lower()
+    CHANGE_CHECK_SECONDS = float(os.getenv("NOTIFICATION_CHANGE_CHECK_SECONDS", "1.0"))
+    
+    # Reload interval of the compiled template resolution table (also reloaded on admin edits)
+    TEMPLATE_REFRESH_SECONDS = float(os.getenv("NOTIFICATION_TEMPLATE_REFRESH_SECONDS", "60"))
+    
+    # Priority lanes for queued sends ("event_type=lane" / "lane=weight" pairs);
+    # a send waiting longer than LANE_MAX_WAIT_SECONDS is served next regardless of weight
+    EVENT_PRIORITIES = os.getenv(
+        "NOTIFICATION_EVENT_PRIORITIES",
+        "task_failed=critical,dag_failed=critical,sla_miss=critical,"
+        "task_retry=high,dag_success=normal,task_success=low",
+    )
+    LANE_WEIGHTS = os.getenv("NOTIFICATION_LANE_WEIGHTS", "critical=8,high=4,normal=2,low=1")
+    LANE_MAX_WAIT_SECONDS = float(os.getenv("NOTIFICATION_LANE_MAX_WAIT", "30"))
+    
+    # Backpressure: at most LANE_CAPACITY queued sends per worker process (0: unbounded).
+    # When full, each event type's overflow policy applies: "block" waits up to
+    # OVERFLOW_BLOCK_SECONDS for room, "drop" evicts a lower-priority send (or drops the
+    # event if there is none) and "spill" writes the event to notification_outbox
+    LANE_CAPACITY = int(os.getenv("NOTIFICATION_LANE_CAPACITY", "10000"))
+    OVERFLOW_POLICIES = os.getenv(
+        "NOTIFICATION_OVERFLOW_POLICIES",
+        "task_failed=spill,dag_failed=spill,sla_miss=spill,"
+        "task_retry=block,dag_success=drop,task_success=drop",
+    )
+    OVERFLOW_BLOCK_SECONDS = float(os.getenv("NOTIFICATION_OVERFLOW_BLOCK_SECONDS", "2"))
+    
+    # Task SLA tracking: listeners record deadlines of tasks with an ``sla`` and the
+    # dispatch worker holding the advisory lock emits SLA_MISS events. Off by default:
+    # without a running worker nothing consumes the deadlines
+    SLA_TRACKING_ENABLED = os.getenv("NOTIFICATION_SLA_TRACKING_ENABLED", "false").lower() == "true"
+    SLA_CHECK_INTERVAL = float(os.getenv("NOTIFICATION_SLA_CHECK_INTERVAL", "5"))
+    
+    # APNs: provider tokens are re-signed after APNS_TOKEN_REFRESH_SECONDS (APNs accepts
+    # tokens up to an hour old); sends are multiplexed over at most APNS_MAX_CONNECTIONS
+    # HTTP/2 connections per APNs host
+    APNS_TOKEN_REFRESH_SECONDS = float(os.getenv("NOTIFICATION_APNS_TOKEN_REFRESH_SECONDS", "3000"))
+    APNS_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_APNS_MAX_CONNECTIONS", "1"))
+    
+    # Web Push: the local ECDH key pair cached per PWA subscription is rotated this often
+    WEBPUSH_KEY_ROTATION_SECONDS = float(
+        os.getenv("NOTIFICATION_WEBPUSH_KEY_ROTATION_SECONDS", "3600")
+    )
+    
+    # Email: pooled SMTP connections per server and account, closed after EMAIL_IDLE_TIMEOUT
+    # idle seconds; in the dispatch worker, concurrent sends of the same message wait
+    # EMAIL_BATCH_WAIT_MS to share one SMTP transaction
+    EMAIL_POOL_SIZE = int(os.getenv("NOTIFICATION_EMAIL_POOL_SIZE", "4"))
+    EMAIL_IDLE_TIMEOUT = float(os.getenv("NOTIFICATION_EMAIL_IDLE_TIMEOUT", "60"))
+    EMAIL_BATCH_WAIT_MS = float(os.getenv("NOTIFICATION_EMAIL_BATCH_WAIT_MS", "20"))
+    
+    # SMS: in the dispatch worker, concurrent sends of the same message wait SMS_BATCH_WAIT_MS
+    # to share one gateway call (for channels whose config sets max_recipients above 1)
+    SMS_BATCH_WAIT_MS = float(os.getenv("NOTIFICATION_SMS_BATCH_WAIT_MS", "20"))
+    
+    # Contact details (phone, email, Youdu id) per user_id are cached this long
+    CONTACT_CACHE_SECONDS = float(os.getenv("NOTIFICATION_CONTACT_CACHE_SECONDS", "300"))
     
     # Feature flags
     ENABLE_SLACK = os.getenv("NOTIFICATION_ENABLE_SLACK", "true").lower() == "true"
@@ -30,6 +145,9 @@ class NotificationConfig:
     ENABLE_YOUDU = os.getenv("NOTIFICATION_ENABLE_YOUDU", "true").lower() == "true"
     ENABLE_FCM = os.getenv("NOTIFICATION_ENABLE_FCM", "true").lower() == "true"
     ENABLE_APNS = os.getenv("NOTIFICATION_ENABLE_APNS", "false").lower() == "true"
+    ENABLE_WEBPUSH = os.getenv("NOTIFICATION_ENABLE_WEBPUSH", "true").lower() == "true"
+    ENABLE_EMAIL = os.getenv("NOTIFICATION_ENABLE_EMAIL", "true").lower() == "true"
+    ENABLE_WEBHOOK = os.getenv("NOTIFICATION_ENABLE_WEBHOOK", "true").lower() == "true"
     
     @classmethod
     def get(cls, key: str, default: Optional[str] = None) -> Optional[str]:
@@ -38,15 +156,27 @@ class NotificationConfig:
     
     @classmethod
     def is_channel_enabled(cls, channel_type: str) -> bool:
-        """Check if a channel type is enabled."""
+        """
+        Check if a channel type is enabled.
+        
+        Channels of third-party handlers are enabled unless
+        ``NOTIFICATION_ENABLE_<NAME>`` is set to something other than ``true``.
+        """
         channel_map = {
             "slack": cls.ENABLE_SLACK,
             "sms": cls.ENABLE_SMS,
             "youdu": cls.ENABLE_YOUDU,
             "fcm": cls.ENABLE_FCM,
             "apns": cls.ENABLE_APNS,
+            "webpush": cls.ENABLE_WEBPUSH,
+            "email": cls.ENABLE_EMAIL,
+            "webhook": cls.ENABLE_WEBHOOK,
         }
-        return channel_map.get(channel_type.lower(), False)
+        name = channel_type.lower()
+        if name in channel_map:
+            return channel_map[name]
+        env_name = "".join(c if c.isalnum() else "_" for c in name.upper())
+        return os.getenv(f"NOTIFICATION_ENABLE_{env_name}", "true").lower() == "true"
 
 
 config = NotificationConfig()
@@ -5,6 +5,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from airflow.settings import Session as AirflowSession
 
+from airflow_notification_plugin.changes import bump
 from airflow_notification_plugin.models import Base
 
 logger = logging.getLogger(__name__)
@@ -82,6 +83,7 @@ def create_default_templates():
                 template = NotificationTemplate(**template_data)
                 session.add(template)
         
+        bump(session, NotificationTemplate.__tablename__)
         session.commit()
         logger.info("Default templates created successfully")
         session.close()
@@ -0,0 +1,213 @@
+"""APNs provider API client: cached JWT provider tokens and pooled HTTP/2 connections.
+
+APNs authenticates providers with an ES256-signed JWT (``kid`` = key id,
+``iss`` = team id) that is valid for an hour and must not be refreshed more
+often than every 20 minutes. ``ProviderToken`` loads the signing key once and
+re-signs the token every ``NOTIFICATION_APNS_TOKEN_REFRESH_SECONDS``, so a
+send only formats a header. Requests go through one ``httpx`` client per APNs
+host; with HTTP/2 every concurrent send is a stream on the same persistent
+connection (at most ``NOTIFICATION_APNS_MAX_CONNECTIONS`` of them), so the
+worker's send threads share a single TLS session instead of one per device.
+The clients are async ones run on a shared event loop (``clients.ClientPool``),
+since httpcore's synchronous HTTP/2 connection is not safe to share between
+threads.
+
+HTTP/2 support comes from the optional ``h2`` package (the ``apns`` extra).
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.clients import ClientPool
+from airflow_notification_plugin.dispatchers.handlers import NotificationHandler
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+APNS_URL = "https://api.push.apple.com"
+APNS_SANDBOX_URL = "https://api.sandbox.push.apple.com"
+
+
+class ProviderToken:
+    """ES256 provider token for one APNs signing key, re-signed before it expires."""
+
+    def __init__(self, team_id: str, key_id: str, private_key: str,
+                 refresh_seconds: Optional[float] = None):
+        self.team_id = team_id
+        self.key_id = key_id
+        self.refresh_seconds = (
+            config.APNS_TOKEN_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._signing_key = load_pem_private_key(private_key.encode("utf-8"), password=None)
+        self._token: Optional[str] = None
+        self._issued_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """Current provider token, signing a new one if the cached one is due for refresh."""
+        token = self._token
+        if token is not None and time.monotonic() - self._issued_at < self.refresh_seconds:
+            return token
+        with self._lock:
+            if self._token is None or time.monotonic() - self._issued_at >= self.refresh_seconds:
+                self._token = jwt.encode(
+                    {"iss": self.team_id, "iat": int(time.time())},
+                    self._signing_key,
+                    algorithm="ES256",
+                    headers={"kid": self.key_id},
+                )
+                self._issued_at = time.monotonic()
+            return self._token
+
+    def invalidate(self) -> None:
+        """Sign a new token on next use (after APNs rejected this one as expired)."""
+        self._token = None
+
+
+_tokens: Dict[Tuple[str, str, str], ProviderToken] = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def _read_key_file(key_path: str) -> str:
+    with open(key_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _read_private_key(channel_config: Dict[str, Any]) -> Optional[str]:
+    private_key = channel_config.get("private_key")
+    if private_key:
+        return private_key
+    key_path = channel_config.get("private_key_path")
+    if key_path:
+        return _read_key_file(key_path)
+    return None
+
+
+def provider_token(channel_config: Dict[str, Any]) -> ProviderToken:
+    """
+    Shared provider token for a channel config's team, key id and signing key.
+
+    Raises:
+        ValueError: If team_id, key_id or the signing key is missing
+    """
+    team_id = channel_config.get("team_id")
+    key_id = channel_config.get("key_id")
+    private_key = _read_private_key(channel_config)
+    if not all([team_id, key_id, private_key]):
+        raise ValueError("APNS requires team_id, key_id and private_key or private_key_path")
+
+    key = (team_id, key_id, hashlib.sha256(private_key.encode("utf-8")).hexdigest())
+    token = _tokens.get(key)
+    if token is None:
+        with _lock:
+            token = _tokens.get(key)
+            if token is None:
+                token = _tokens[key] = ProviderToken(team_id, key_id, private_key)
+    return token
+
+
+def _new_client(base_url: str) -> httpx.AsyncClient:
+    # APNs only speaks HTTP/2; http1=False also allows h2c for local stubs
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http1=False,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=config.APNS_MAX_CONNECTIONS,
+            max_keepalive_connections=config.APNS_MAX_CONNECTIONS,
+        ),
+        timeout=10,
+    )
+
+
+# Persistent HTTP/2 clients per APNs host, shared by all sending threads
+_clients = ClientPool("apns", _new_client)
+
+
+def close_clients() -> None:
+    """Close all pooled APNs connections."""
+    _clients.close()
+
+
+class APNSHandler(NotificationHandler):
+    """Handler for Apple Push Notification Service (APNS) over HTTP/2 with token auth."""
+
+    channel_type = "apns"
+
+    def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
+        """Send push notification via the APNs provider API."""
+        try:
+            device_token = kwargs.get("device_token")
+            topic = config.get("bundle_id")
+
+            if not all([device_token, topic]):
+                logger.error("APNS configuration incomplete")
+                return False
+
+            if not HTTP2_AVAILABLE:
+                logger.error("APNS requires HTTP/2 support: install the 'apns' extra")
+                return False
+
+            token = provider_token(config)
+            apns_url = config.get("apns_url") or (
+                APNS_SANDBOX_URL if config.get("use_sandbox") else APNS_URL
+            )
+
+            payload = {
+                "aps": {
+                    "alert": {
+                        "title": kwargs.get("title", "Airflow Notification"),
+                        "body": message,
+                    },
+                    "sound": config.get("sound", "default"),
+                },
+                **kwargs.get("data", {}),
+            }
+
+            headers = {
+                "authorization": f"bearer {token.get()}",
+                "apns-topic": topic,
+                "apns-push-type": "alert",
+                "apns-priority": "10",
+            }
+
+            response = _clients.request(
+                apns_url,
+                "POST",
+                f"/3/device/{device_token}",
+                json=payload,
+                headers=headers,
+            )
+            self._record_status_code(response.status_code)
+
+            if response.status_code == 200:
+                logger.info("APNS notification sent successfully")
+                return True
+
+            reason = response.json().get("reason") if response.content else None
+            if response.status_code == 410:
+                logger.warning(f"APNS device token is no longer valid: {reason}")
+            else:
+                if reason == "ExpiredProviderToken":
+                    token.invalidate()
+                logger.error(f"APNS notification failed: {response.status_code} - {reason}")
+            return False
+
+        except Exception as e:
+            logger.error(f"Error sending APNS notification: {str(e)}")
+            return False
@@ -0,0 +1,92 @@
+"""Group commit of concurrent sends of one message to many recipients.
+
+One event usually renders the same message for every subscriber of a channel,
+and the worker sends those concurrently. Channels whose provider accepts
+several recipients per call (SMTP transactions, bulk SMS gateways) pass their
+sends through a ``RecipientBatcher``: the first send of a message waits
+``wait_ms`` for others to join, then delivers once for all of them (in calls of
+at most ``max_recipients``) and hands each caller its own recipient's result.
+
+Only the dispatch worker sends concurrently; elsewhere the dispatcher sends one
+recipient at a time, so nobody could join and the first send does not wait.
+Nor does it wait when ``max_recipients`` is 1.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# Set by the dispatch worker when its sender runs several sends at once
+concurrent_senders = False
+
+
+class _Batch:
+    def __init__(self):
+        self.recipients: List[str] = []
+        self.done = threading.Event()
+        self.results: Dict[str, Any] = {}
+        self.error: Optional[Exception] = None
+
+
+class RecipientBatcher:
+    """Merges concurrent sends with the same key into one multi-recipient delivery."""
+
+    def __init__(self, wait_ms: float, concurrent: Optional[bool] = None):
+        self.wait_ms = wait_ms
+        # None: wait only where the worker has enabled concurrent_senders
+        self.concurrent = concurrent
+        self._open: Dict[Hashable, _Batch] = {}
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        key: Hashable,
+        recipient: str,
+        deliver: Callable[[List[str]], Dict[str, Any]],
+        max_recipients: int,
+    ) -> Any:
+        """
+        Send to ``recipient``, possibly in a delivery shared with other callers.
+
+        ``deliver`` is called once per batch with its recipients and returns a
+        result per recipient.
+
+        Returns:
+            Any: This recipient's result
+
+        Raises:
+            Exception: Whatever ``deliver`` raised for the shared batch
+        """
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            batch.recipients.append(recipient)
+            full = len(batch.recipients) >= max_recipients
+            if full:
+                # Full: later callers start a new batch
+                del self._open[key]
+
+        if leader:
+            if not full and self.wait_ms > 0 and self._can_join():
+                time.sleep(self.wait_ms / 1000)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            try:
+                batch.results = deliver(batch.recipients)
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[recipient]
+
+    def _can_join(self) -> bool:
+        """Whether other sends may arrive while the leader waits."""
+        return concurrent_senders if self.concurrent is None else self.concurrent
@@ -0,0 +1,79 @@
+"""Shared HTTP/2 clients, driven by one event loop thread per process.
+
+httpcore's synchronous HTTP/2 connection allocates stream ids and encodes
+headers (HPACK keeps compression state per connection) without a lock, so
+threads sending concurrently on one shared ``httpx.Client`` can corrupt the
+connection. ``ClientPool`` keeps one ``httpx.AsyncClient`` per key instead and
+runs them all on an event loop in a background thread: ``request`` may be
+called from any thread and blocks until the response is read, while the
+requests of concurrent callers are multiplexed on the same connections.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    """Async ``httpx`` clients by key, used synchronously from the sending threads."""
+
+    def __init__(self, name: str, factory: Callable[[Hashable], httpx.AsyncClient]):
+        self.name = name
+        self._factory = factory
+        self._clients: Dict[Hashable, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # A forked process opens its own connections instead of sharing the parent's sockets,
+        # and has no loop thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def request(self, key: Hashable, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request with the client of ``key`` and wait for the response."""
+        loop, client = self._client(key)
+        return asyncio.run_coroutine_threadsafe(client.request(method, url, **kwargs), loop).result()
+
+    def _client(self, key: Hashable):
+        loop, client = self._loop, self._clients.get(key)
+        if loop is not None and client is not None:
+            return loop, client
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name=f"{self.name}-client", daemon=True
+                )
+                self._thread.start()
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._factory(key)
+            return self._loop, client
+
+    def close(self) -> None:
+        """Close all clients and stop the loop thread."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        for client in clients:
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            except Exception as e:
+                logger.warning(f"Error closing {self.name} client: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _reset(self) -> None:
+        self._clients = {}
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
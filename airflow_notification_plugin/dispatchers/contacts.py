@@ -0,0 +1,80 @@
+"""TTL-cached directory of subscriber contact details.
+
+SMS, email and Youdu sends need the subscriber's phone number, address or
+Youdu id, which live in ``notification_user_contact`` keyed by the
+subscription's ``user_id``. The dispatcher calls ``ContactDirectory.prefetch``
+with all subscribers of an event, which loads every uncached or expired user
+with one ``IN`` query; sends then read the cache. Entries (including users
+without a contact row) are kept for ``NOTIFICATION_CONTACT_CACHE_SECONDS``,
+so edits show up within that time.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import UserContact
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN lists well below database parameter limits
+QUERY_CHUNK_SIZE = 500
+
+
+class Contact(NamedTuple):
+    phone_number: Optional[str]
+    email: Optional[str]
+    youdu_id: Optional[str]
+
+
+class ContactDirectory:
+    """Contact details per user_id, bulk-loaded and cached for ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = config.CONTACT_CACHE_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries: Dict[str, Tuple[float, Optional[Contact]]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Reload every contact on next use."""
+        with self._lock:
+            self._entries = {}
+
+    def get(self, user_id: str) -> Optional[Contact]:
+        """Cached contact of a user, if any (call ``prefetch`` first)."""
+        entry = self._entries.get(user_id)
+        return entry[1] if entry is not None else None
+
+    def prefetch(self, session: Session, user_ids: Iterable[str]) -> None:
+        """Load the users that are not cached or whose entry expired, in bulk."""
+        now = time.monotonic()
+        missing = sorted({
+            user_id for user_id in user_ids
+            if user_id not in self._entries or now - self._entries[user_id][0] >= self.ttl_seconds
+        })
+        if not missing:
+            return
+
+        loaded: Dict[str, Optional[Contact]] = dict.fromkeys(missing)
+        try:
+            for start in range(0, len(missing), QUERY_CHUNK_SIZE):
+                rows = session.query(
+                    UserContact.user_id,
+                    UserContact.phone_number,
+                    UserContact.email,
+                    UserContact.youdu_id,
+                ).filter(UserContact.user_id.in_(missing[start:start + QUERY_CHUNK_SIZE])).all()
+                for user_id, phone_number, email, youdu_id in rows:
+                    loaded[user_id] = Contact(phone_number, email, youdu_id)
+        except Exception as e:
+            # Cache the misses anyway so a missing table is not queried on every event
+            session.rollback()
+            logger.error(f"Error loading user contacts: {str(e)}")
+
+        with self._lock:
+            for user_id, contact in loaded.items():
+                self._entries[user_id] = (now, contact)
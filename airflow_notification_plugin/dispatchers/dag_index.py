@@ -0,0 +1,200 @@
+"""DAG tag and owner subscriptions, resolved through an in-memory index.
+
+A ``DagSubscription`` whose ``match_type`` is ``tag`` or ``owner`` holds a DAG
+tag (``tier1``) or owner (``data-eng``) in its ``dag_id`` column and matches
+every DAG carrying it. ``DagMetadataIndex`` mirrors the tags and owners of
+active DAGs from Airflow's ``dag`` and ``dag_tag`` tables; after the first
+full load it only re-reads DAGs whose ``last_parsed_time`` moved, so it
+follows DAG parsing at the cost of two small queries per refresh interval.
+Deactivating or deleting a DAG does not move ``last_parsed_time``, so every
+refresh also reads the ids of the active DAGs and drops the ones now missing.
+``SelectorIndex`` combines it with the tag/owner subscriptions and caches the
+matching subscription ids per event type and DAG id, so routing an event is a
+dictionary lookup rather than a join against ``dag_tag``.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import DagSubscription, EventType, MatchType
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_MATCH_TYPES = (MatchType.TAG, MatchType.OWNER)
+
+
+def _split_owners(owners: Optional[str]) -> FrozenSet[str]:
+    # DagModel.owners is a comma-separated list
+    return frozenset(owner.strip() for owner in (owners or "").split(",") if owner.strip())
+
+
+class DagMetadataIndex:
+    """Tags and owners of active DAGs, refreshed incrementally from Airflow's tables."""
+
+    def __init__(self):
+        self._tags: Dict[str, FrozenSet[str]] = {}
+        self._owners: Dict[str, FrozenSet[str]] = {}
+        self._watermark: Optional[datetime] = None
+
+    def tags(self, dag_id: str) -> FrozenSet[str]:
+        return self._tags.get(dag_id, frozenset())
+
+    def owners(self, dag_id: str) -> FrozenSet[str]:
+        return self._owners.get(dag_id, frozenset())
+
+    def refresh(self, session: Session) -> Set[str]:
+        """
+        Load DAGs parsed since the last refresh (all DAGs on the first call),
+        and drop DAGs that were deleted or deactivated.
+
+        Returns:
+            Set[str]: DAG ids whose tags or owners may have changed
+        """
+        from airflow.models import DagModel
+
+        full_load = self._watermark is None
+        changed = self._load_parsed(session, full_load)
+        if not full_load:
+            active = {
+                dag_id for dag_id, in
+                session.query(DagModel.dag_id).filter(DagModel.is_active == True)
+            }
+            gone = set(self._tags).union(self._owners) - active
+            for dag_id in gone:
+                self._tags.pop(dag_id, None)
+                self._owners.pop(dag_id, None)
+            changed |= gone
+        return changed
+
+    def _load_parsed(self, session: Session, full_load: bool) -> Set[str]:
+        from airflow.models import DagModel, DagTag
+
+        query = session.query(
+            DagModel.dag_id, DagModel.owners, DagModel.is_active, DagModel.last_parsed_time
+        )
+        if not full_load:
+            # >= so DAGs parsed in the same instant as the watermark are not missed
+            query = query.filter(DagModel.last_parsed_time >= self._watermark)
+        rows = query.all()
+        if not rows:
+            return set()
+
+        active = {row.dag_id for row in rows if row.is_active}
+        tag_query = session.query(DagTag.dag_id, DagTag.name)
+        if not full_load:
+            tag_query = tag_query.filter(DagTag.dag_id.in_(active))
+        tags = defaultdict(set)
+        if active:
+            for dag_id, name in tag_query.all():
+                tags[dag_id].add(name)
+
+        for row in rows:
+            if row.is_active:
+                self._tags[row.dag_id] = frozenset(tags.get(row.dag_id, ()))
+                self._owners[row.dag_id] = _split_owners(row.owners)
+            else:
+                self._tags.pop(row.dag_id, None)
+                self._owners.pop(row.dag_id, None)
+
+        parsed = [row.last_parsed_time for row in rows if row.last_parsed_time is not None]
+        if parsed:
+            self._watermark = max(parsed + ([self._watermark] if self._watermark else []))
+        return {row.dag_id for row in rows}
+
+
+class SelectorIndex:
+    """Resolves tag/owner subscriptions to subscription ids per event type and DAG id."""
+
+    def __init__(
+        self,
+        refresh_seconds: Optional[float] = None,
+        dag_refresh_seconds: Optional[float] = None,
+    ):
+        self.refresh_seconds = (
+            config.PATTERN_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self.dag_refresh_seconds = (
+            config.DAG_INDEX_REFRESH_SECONDS if dag_refresh_seconds is None else dag_refresh_seconds
+        )
+        self.dags = DagMetadataIndex()
+        # event type -> (match type, tag or owner) -> subscription ids
+        self._selectors: Dict[EventType, Dict[Tuple[MatchType, str], List[int]]] = {}
+        self._resolved: Dict[Tuple[EventType, str], Tuple[int, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._dags_loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Reload the subscriptions on next use."""
+        self._loaded_at = None
+
+    def match(self, session: Session, event_type: EventType, dag_id: str) -> Tuple[int, ...]:
+        """Ids of active tag/owner subscriptions for ``event_type`` that cover ``dag_id``."""
+        now = time.monotonic()
+        if self._due(self._loaded_at, self.refresh_seconds, now) or (
+            self._selectors and self._due(self._dags_loaded_at, self.dag_refresh_seconds, now)
+        ):
+            self._refresh(session, now)
+
+        key = (event_type, dag_id)
+        ids = self._resolved.get(key)
+        if ids is None:
+            ids = self._resolved[key] = self._resolve(event_type, dag_id)
+        return ids
+
+    @staticmethod
+    def _due(loaded_at: Optional[float], interval: float, now: float) -> bool:
+        return loaded_at is None or now - loaded_at >= interval
+
+    def _resolve(self, event_type: EventType, dag_id: str) -> Tuple[int, ...]:
+        selectors = self._selectors.get(event_type)
+        if not selectors:
+            return ()
+        ids = []
+        for tag in self.dags.tags(dag_id):
+            ids.extend(selectors.get((MatchType.TAG, tag), ()))
+        for owner in self.dags.owners(dag_id):
+            ids.extend(selectors.get((MatchType.OWNER, owner), ()))
+        return tuple(sorted(set(ids)))
+
+    def _refresh(self, session: Session, now: float) -> None:
+        with self._lock:
+            if self._due(self._loaded_at, self.refresh_seconds, now):
+                self._load_selectors(session)
+                self._loaded_at = now
+                self._resolved = {}
+
+            if self._selectors and self._due(self._dags_loaded_at, self.dag_refresh_seconds, now):
+                try:
+                    changed = self.dags.refresh(session)
+                except Exception as e:
+                    logger.error(f"Error refreshing the DAG tag index: {str(e)}")
+                    changed = set()
+                self._dags_loaded_at = now
+                if changed:
+                    self._resolved = {
+                        key: ids for key, ids in self._resolved.items() if key[1] not in changed
+                    }
+
+    def _load_selectors(self, session: Session) -> None:
+        rows = session.query(
+            DagSubscription.id,
+            DagSubscription.event_type,
+            DagSubscription.match_type,
+            DagSubscription.dag_id,
+        ).filter(
+            DagSubscription.match_type.in_(SELECTOR_MATCH_TYPES),
+            DagSubscription.is_active == True,
+        ).all()
+
+        selectors = defaultdict(lambda: defaultdict(list))
+        for subscription_id, event_type, match_type, value in rows:
+            selectors[event_type][(match_type, value)].append(subscription_id)
+        self._selectors = {event_type: dict(entries) for event_type, entries in selectors.items()}
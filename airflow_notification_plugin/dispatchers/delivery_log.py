@@ -0,0 +1,181 @@
+"""Buffered delivery log writer and retention job for the notification_delivery table."""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from airflow.settings import Session as AirflowSession
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import NotificationDelivery
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryLogBuffer:
+    """Collects delivery rows in memory and bulk-inserts them.
+
+    Rows are flushed with a single ``executemany`` INSERT when ``batch_size``
+    rows are pending or ``flush_interval_ms`` has elapsed since the oldest
+    pending row, whichever comes first. Dispatchers also flush at the end of
+    each dispatch (or, in the dispatch worker, of each batch): Airflow task
+    processes exit through ``os._exit``, which skips timers and ``atexit``.
+
+    With ``flush_in_background`` (set by the long-running dispatch worker) a
+    daemon timer thread takes care of the time-based flush so a quiet process
+    does not hold rows indefinitely. Anything left over is flushed at
+    interpreter exit, where the interpreter exits normally.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        flush_in_background: bool = False,
+    ):
+        self._session_factory = session_factory or AirflowSession
+        self.batch_size = batch_size or config.DELIVERY_LOG_BATCH_SIZE
+        self.flush_interval_ms = flush_interval_ms or config.DELIVERY_LOG_FLUSH_INTERVAL_MS
+        self.enabled = config.DELIVERY_LOG_ENABLED if enabled is None else enabled
+        self.flush_in_background = flush_in_background
+
+        self._rows: List[Dict[str, Any]] = []
+        self._first_row_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def record(self, **row) -> None:
+        """Queue one delivery row; columns follow ``NotificationDelivery``.
+
+        ``attempt`` defaults to 1; the dispatcher passes the event's attempt
+        number when the worker resends an outbox row.
+        """
+        if not self.enabled:
+            return
+
+        row.setdefault("attempt", 1)
+        row.setdefault("created_at", datetime.utcnow())
+
+        with self._lock:
+            self._rows.append(row)
+            if self._first_row_at is None:
+                self._first_row_at = time.monotonic()
+                if self.flush_in_background:
+                    self._schedule_timer()
+            due = len(self._rows) >= self.batch_size or self._is_overdue()
+
+        if due:
+            self.flush()
+
+    def pending(self) -> int:
+        """Number of rows waiting to be written."""
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self) -> int:
+        """Write all pending rows in one bulk INSERT. Returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                self._first_row_at = None
+                self._cancel_timer()
+
+            if not rows:
+                return 0
+
+            session = self._session_factory()
+            try:
+                # A list of parameter dicts makes SQLAlchemy use executemany
+                session.execute(NotificationDelivery.__table__.insert(), rows)
+                session.commit()
+                return len(rows)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Error writing {len(rows)} delivery log rows: {str(e)}")
+                return 0
+            finally:
+                session.close()
+
+    def _is_overdue(self) -> bool:
+        if self._first_row_at is None:
+            return False
+        return (time.monotonic() - self._first_row_at) * 1000 >= self.flush_interval_ms
+
+    def _schedule_timer(self) -> None:
+        self._cancel_timer()
+        self._timer = threading.Timer(self.flush_interval_ms / 1000.0, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+def purge_delivery_log(
+    retention_days: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    session_factory: Optional[Callable] = None,
+) -> int:
+    """
+    Delete delivery log rows older than the retention window.
+
+    Rows are deleted in chunks of ``chunk_size`` ids, each in its own
+    transaction, so the table is never locked for the duration of a large purge.
+
+    Returns:
+        int: Total number of rows deleted
+    """
+    retention_days = retention_days if retention_days is not None else config.DELIVERY_LOG_RETENTION_DAYS
+    chunk_size = chunk_size or config.DELIVERY_LOG_PURGE_CHUNK_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    session_factory = session_factory or AirflowSession
+
+    total = 0
+    session = session_factory()
+    try:
+        while True:
+            ids = [
+                row.id
+                for row in session.query(NotificationDelivery.id)
+                .filter(NotificationDelivery.created_at < cutoff)
+                .order_by(NotificationDelivery.id)
+                .limit(chunk_size)
+            ]
+            if not ids:
+                break
+
+            session.query(NotificationDelivery).filter(
+                NotificationDelivery.id.in_(ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+            total += len(ids)
+
+            if len(ids) < chunk_size:
+                break
+
+        logger.info(f"Purged {total} delivery log rows older than {retention_days} days")
+        return total
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error purging delivery log: {str(e)}")
+        return total
+    finally:
+        session.close()
+
+
+# Global delivery log buffer
+delivery_log = DeliveryLogBuffer()
+
+
+if __name__ == "__main__":
+    # Run the retention job when executed as a script (e.g. from cron)
+    purge_delivery_log()
@@ -2,209 +2,569 @@
 
 import json
 import logging
-from typing import Dict, Any, List
-from jinja2 import Template, TemplateError
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Mapping, Optional, Callable, Tuple, Union
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from airflow.settings import Session as AirflowSession
 
 from airflow_notification_plugin.models import (
+    ChannelType,
     DagSubscription,
     NotificationChannel,
     NotificationTemplate,
     DeviceRegistration,
     EventType,
+    DeliveryStatus,
+    MatchType,
+    PlatformType,
+    UserContact,
 )
-from airflow_notification_plugin.dispatchers.handlers import get_handler
+from airflow_notification_plugin.dispatchers.handlers import (
+    flush_handlers,
+    get_handler,
+    NotificationHandler,
+)
+from airflow_notification_plugin.dispatchers.contacts import ContactDirectory
+from airflow_notification_plugin.dispatchers.delivery_log import delivery_log as default_delivery_log
+from airflow_notification_plugin.dispatchers.dag_index import SelectorIndex
+from airflow_notification_plugin.dispatchers.filters import matches_filter
+from airflow_notification_plugin.dispatchers.matching import PatternIndex
+from airflow_notification_plugin.dispatchers.routing import SharedRouting
+from airflow_notification_plugin.dispatchers.templates import ResolvedTemplate, TemplateTable
+from airflow_notification_plugin.config import config as plugin_config
+from airflow_notification_plugin import metrics
+from airflow_notification_plugin.changes import ChangeWatcher
+from airflow_notification_plugin.metrics import ensure_textfile_exporter, timed
+from airflow_notification_plugin.tracing import correlation_attributes, get_tracer
 
 logger = logging.getLogger(__name__)
 
+# Device platforms reachable through each push channel type; every platform is
+# served by exactly one channel type, so a device never gets the same alert twice
+PUSH_CHANNEL_PLATFORMS = {
+    "fcm": [PlatformType.ANDROID, PlatformType.PWA],
+    "apns": [PlatformType.IOS],
+    "webpush": [PlatformType.WEBPUSH],
+}
+
+
+def _deferred_success(done: Future) -> bool:
+    """Outcome of a finished deferred send; one that failed holds the error."""
+    return done.exception() is None and bool(done.result())
+
 
 class NotificationDispatcher:
     """Central dispatcher for notifications."""
     
-    def __init__(self):
+    # Write buffered output after every dispatch; the worker flushes per batch instead
+    flush_after_dispatch = True
+    
+    # Whether the process outlives single tasks (the dispatch worker): only such
+    # processes rebuild the shared routing snapshot and hold a LISTEN connection,
+    # task processes just read the snapshot and poll for changes
+    long_lived = False
+    
+    # Attempt number of the event being dispatched, for the delivery log
+    _attempt = 1
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        delivery_log=None,
+        routing_snapshot_path: Optional[str] = None,
+    ):
         # Don't store session as instance variable - create fresh session for each dispatch
-        pass
+        self._session_factory = session_factory or AirflowSession
+        self.delivery_log = delivery_log or default_delivery_log
+        self._patterns = PatternIndex()
+        self._selectors = SelectorIndex()
+        self._contacts = ContactDirectory()
+        self._templates = TemplateTable()
+        
+        # Shared node-wide routing snapshot instead of per-event queries, if configured
+        if routing_snapshot_path is None:
+            routing_snapshot_path = plugin_config.ROUTING_SNAPSHOT_PATH
+        self._routing = (
+            SharedRouting(routing_snapshot_path, writer=self.long_lived)
+            if routing_snapshot_path else None
+        )
+        
+        # Drop cached routing data soon after it is edited
+        self._changes = ChangeWatcher(long_lived=self.long_lived)
+        subscriptions = DagSubscription.__tablename__
+        self._changes.subscribe(subscriptions, self._patterns.invalidate)
+        self._changes.subscribe(subscriptions, self._selectors.invalidate)
+        self._changes.subscribe(UserContact.__tablename__, self._contacts.invalidate)
+        self._changes.subscribe(NotificationTemplate.__tablename__, self._templates.invalidate)
+        if self._routing is not None:
+            for table in (subscriptions, NotificationChannel.__tablename__,
+                          NotificationTemplate.__tablename__):
+                self._changes.subscribe(table, self._routing.invalidate)
     
-    def dispatch(self, event_type: EventType, event_data: Dict[str, Any]) -> None:
+    def dispatch(self, event_type: EventType, event_data: Mapping[str, Any], attempt: int = 1) -> None:
         """
         Dispatch notifications for a given event.
         
         Args:
             event_type: Type of event that occurred
             event_data: Event metadata (dag_id, task_id, state, etc.)
+            attempt: How many times the event has been dispatched, this time
+                included (above 1 when the worker resends an outbox row)
         """
-        session = AirflowSession()
-        try:
-            dag_id = event_data.get("dag_id")
+        ensure_textfile_exporter()
+        self._attempt = attempt
+        
+        tracer = get_tracer()
+        attributes = None
+        if tracer.enabled:
+            attributes = correlation_attributes(event_data)
+            attributes["notification.event_type"] = event_type.value
+        
+        with tracer.start_span("notification.dispatch", attributes) as span, timed(
+            metrics.DISPATCH_TOTAL,
+            metrics.DISPATCH_SECONDS,
+            outcome="dispatched",
+            event_type=event_type.value,
+        ) as timer:
+            session = self._session_factory()
+            try:
+                self._changes.check(session)
+                dag_id = event_data.get("dag_id")
+                
+                if not dag_id:
+                    logger.warning("No dag_id in event data, skipping notification")
+                    timer.outcome = "skipped"
+                    return
+                
+                subscriptions = self._filter_subscriptions(
+                    self._get_subscriptions(session, event_type, dag_id), event_type, event_data
+                )
+                
+                if not subscriptions:
+                    logger.debug(f"No active subscriptions for {dag_id} / {event_type.value}")
+                    timer.outcome = "no_subscriptions"
+                    return
+                
+                logger.info(f"Found {len(subscriptions)} subscriptions for {dag_id} / {event_type.value}")
+                span.set_attribute("notification.subscriptions", len(subscriptions))
+                if not self._admit(event_type, event_data, len(subscriptions)):
+                    timer.outcome = "shed"
+                    return
+                self._contacts.prefetch(session, (s.user_id for s in subscriptions))
+                
+                # Process each subscription
+                for subscription in subscriptions:
+                    try:
+                        self._send_notification(session, subscription, event_type, event_data)
+                    except Exception as e:
+                        logger.error(f"Error processing subscription {subscription.id}: {str(e)}")
             
-            if not dag_id:
-                logger.warning("No dag_id in event data, skipping notification")
-                return
+            except Exception as e:
+                logger.error(f"Error dispatching notifications: {str(e)}")
+                timer.outcome = "error"
+                span.set_error(str(e))
+            finally:
+                session.close()
+                if self.flush_after_dispatch:
+                    self.flush()
+    
+    def flush(self) -> None:
+        """
+        Write buffered delivery log rows and send what handlers hold back.
+        
+        Airflow task processes exit through ``os._exit``, skipping timers and
+        ``atexit`` handlers, so nothing may be left buffered after a dispatch.
+        Handlers go first: posting a batch records the delivery log rows of its sends.
+        """
+        flush_handlers()
+        self.delivery_log.flush()
+    
+    def _admit(self, event_type: EventType, event_data: Mapping[str, Any], sends: int) -> bool:
+        """
+        Whether an event's ``sends`` (one per subscription) may be made.
+        
+        Sends are made inline here, so every event is admitted; the dispatch
+        worker overrides this to apply its overflow policies.
+        """
+        return True
+    
+    def _get_subscriptions(
+        self,
+        session: Session,
+        event_type: EventType,
+        dag_id: str
+    ) -> List[DagSubscription]:
+        """
+        Active subscriptions for this DAG and event type: exact, pattern, tag or owner.
+        
+        Read from the routing snapshot when one is configured, else queried.
+        """
+        with get_tracer().start_span("notification.resolve_subscriptions"), timed(
+            None, metrics.SUBSCRIPTION_QUERY_SECONDS, event_type=event_type.value
+        ):
+            snapshot = self._routing.current(session) if self._routing else None
+            if snapshot is not None:
+                return snapshot.subscriptions(
+                    snapshot.match(event_type, dag_id)
+                    + self._selectors.match(session, event_type, dag_id)
+                )
             
-            # Query subscriptions for this DAG and event type
-            subscriptions = session.query(DagSubscription).filter(
+            matches = and_(
                 DagSubscription.dag_id == dag_id,
+                DagSubscription.match_type == MatchType.EXACT,
+            )
+            indexed_ids = self._patterns.match(session, event_type, dag_id) + self._selectors.match(
+                session, event_type, dag_id
+            )
+            if indexed_ids:
+                matches = or_(matches, DagSubscription.id.in_(indexed_ids))
+            return session.query(DagSubscription).filter(
+                matches,
                 DagSubscription.event_type == event_type,
                 DagSubscription.is_active == True
             ).all()
-            
-            if not subscriptions:
-                logger.debug(f"No active subscriptions for {dag_id} / {event_type.value}")
-                return
-            
-            logger.info(f"Found {len(subscriptions)} subscriptions for {dag_id} / {event_type.value}")
-            
-            # Process each subscription
-            for subscription in subscriptions:
-                try:
-                    self._send_notification(session, subscription, event_type, event_data)
-                except Exception as e:
-                    logger.error(f"Error processing subscription {subscription.id}: {str(e)}")
-        
-        except Exception as e:
-            logger.error(f"Error dispatching notifications: {str(e)}")
-        finally:
-            session.close()
+    
+    def _filter_subscriptions(
+        self,
+        subscriptions: List[DagSubscription],
+        event_type: EventType,
+        event_data: Mapping[str, Any]
+    ) -> List[DagSubscription]:
+        """Drop subscriptions whose filter expression rejects the event, before any rendering."""
+        selected = [
+            subscription for subscription in subscriptions
+            if not subscription.filter_expression
+            or matches_filter(subscription.filter_expression, event_data)
+        ]
+        if len(selected) < len(subscriptions):
+            metrics.FILTERED_TOTAL.labels(event_type=event_type.value).inc(
+                len(subscriptions) - len(selected)
+            )
+        return selected
     
     def _send_notification(
         self,
         session: Session,
         subscription: DagSubscription,
         event_type: EventType,
-        event_data: Dict[str, Any]
+        event_data: Mapping[str, Any]
     ) -> None:
         """Send notification for a specific subscription."""
-        try:
-            channel = subscription.channel
-            
-            if not channel or not channel.is_active:
-                logger.warning(f"Channel {subscription.channel_id} is not active")
-                return
-            
-            # Get or create default template
-            template = self._get_template(session, event_type, channel.channel_type)
+        channel = subscription.channel
+        channel_type = channel.channel_type.value if channel else "unknown"
+        
+        with timed(
+            metrics.NOTIFICATION_TOTAL,
+            metrics.NOTIFICATION_SECONDS,
+            event_type=event_type.value,
+            channel_type=channel_type,
+        ) as timer:
+            try:
+                timer.outcome = self._process_subscription(
+                    session, subscription, channel, event_type, event_data
+                )
+            except Exception as e:
+                logger.error(f"Error sending notification: {str(e)}")
+                timer.outcome = "error"
+    
+    def _process_subscription(
+        self,
+        session: Session,
+        subscription: DagSubscription,
+        channel: Optional[NotificationChannel],
+        event_type: EventType,
+        event_data: Mapping[str, Any]
+    ) -> str:
+        """Render and deliver one subscription. Returns the outcome label for metrics."""
+        if not channel or not channel.is_active:
+            logger.warning(f"Channel {subscription.channel_id} is not active")
+            return "inactive_channel"
+        
+        with get_tracer().start_span("notification.render") as render_span, timed(
+            None,
+            metrics.RENDER_SECONDS,
+            outcome="rendered",
+            event_type=event_type.value,
+            channel_type=channel.channel_type.value,
+        ) as render_timer:
+            template = self._get_template(
+                session,
+                event_type,
+                channel.channel_type,
+                dag_id=event_data.get("dag_id"),
+                template_id=getattr(subscription, "template_id", None),
+            )
             
             if not template:
                 logger.warning(f"No template found for {event_type.value} / {channel.channel_type.value}")
-                return
+                render_timer.outcome = "no_template"
+                render_span.set_error("no template")
+                return "no_template"
             
             # Render message from template
-            message = self._render_template(template.template_content, event_data)
+            message = template.render(event_data)
             
             if not message:
                 logger.error("Failed to render message template")
-                return
-            
-            # Parse channel config
-            try:
-                config = json.loads(channel.config)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON config for channel {channel.id}")
-                return
-            
-            # Get appropriate handler
-            handler = get_handler(channel.channel_type.value)
+                render_timer.outcome = "failed"
+                render_span.set_error("render failed")
+                return "render_failed"
+        
+        # Parse channel config
+        try:
+            config = json.loads(channel.config)
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON config for channel {channel.id}")
+            return "invalid_config"
+        
+        # Get appropriate handler; custom channels name a third-party handler
+        if channel.channel_type == ChannelType.CUSTOM:
+            handler_name = str(config.get("handler") or "")
+        else:
+            handler_name = channel.channel_type.value
+        handler = get_handler(handler_name)
+        
+        if not handler:
+            logger.error(f"No handler for channel type {handler_name!r} (unknown or disabled)")
+            return "no_handler"
+        
+        with get_tracer().start_span(
+            "notification.handler_send",
+            {
+                "notification.channel_type": channel.channel_type.value,
+                "notification.channel_id": channel.id,
+                "notification.subscription_id": subscription.id,
+            },
+        ) as span:
+            outcome = self._send_to_channel(
+                session, handler, config, message, subscription, channel, event_type, event_data
+            )
+            if outcome not in ("sent", "queued"):
+                span.set_error(outcome)
+            return outcome
+    
+    def _send_to_channel(
+        self,
+        session: Session,
+        handler: NotificationHandler,
+        config: Dict[str, Any],
+        message: str,
+        subscription: DagSubscription,
+        channel: NotificationChannel,
+        event_type: EventType,
+        event_data: Mapping[str, Any]
+    ) -> str:
+        """Hand the rendered message to the channel handler, once per device for push channels."""
+        # Prepare additional kwargs
+        kwargs = {
+            "user_id": subscription.user_id,
+            "dag_id": event_data.get("dag_id"),
+            "task_id": event_data.get("task_id"),
+            "event_type": event_type.value,
+            "event_data": event_data,
+        }
+        contact = self._contacts.get(subscription.user_id)
+        if contact is not None:
+            # phone_number, email and youdu_id address the subscriber on SMS, email and Youdu
+            kwargs.update((field, value) for field, value in contact._asdict().items() if value)
+        
+        # For push notifications, get device tokens
+        if channel.channel_type.value in PUSH_CHANNEL_PLATFORMS:
+            devices = self._get_user_devices(
+                session,
+                subscription.user_id,
+                channel.channel_type.value
+            )
             
-            if not handler:
-                logger.error(f"No handler found for channel type {channel.channel_type.value}")
-                return
+            if not devices:
+                return "no_devices"
             
-            # Prepare additional kwargs
-            kwargs = {
-                "user_id": subscription.user_id,
-                "dag_id": event_data.get("dag_id"),
-                "task_id": event_data.get("task_id"),
-            }
+            results = []
+            for device in devices:
+                kwargs["device_token"] = device.device_token
+                with get_tracer().start_span(
+                    "notification.device_send", {"notification.device_id": device.id}
+                ) as device_span:
+                    success = self._deliver(
+                        handler, config, message, kwargs,
+                        subscription, event_type, event_data, device_id=device.id,
+                        attempt=self._attempt,
+                    )
+                    if not success:
+                        device_span.set_error("send failed")
+                results.append((device.id, success))
             
-            # For push notifications, get device tokens
-            if channel.channel_type.value in ["fcm", "apns"]:
-                devices = self._get_user_devices(
-                    session,
-                    subscription.user_id,
-                    channel.channel_type.value
-                )
-                
-                for device in devices:
-                    kwargs["device_token"] = device.device_token
-                    success = handler.send(config, message, **kwargs)
-                    
-                    if success:
-                        logger.info(f"Notification sent to device {device.id}")
-                    else:
-                        logger.warning(f"Failed to send notification to device {device.id}")
-            else:
-                # Send to channel (Slack, SMS, Youdu)
-                success = handler.send(config, message, **kwargs)
-                
+            return self._send_outcome(channel, results)
+        
+        # Send to channel (Slack, SMS, Youdu)
+        success = self._deliver(
+            handler, config, message, kwargs, subscription, event_type, event_data,
+            attempt=self._attempt,
+        )
+        return self._send_outcome(channel, [(None, success)])
+    
+    def _send_outcome(
+        self, channel: NotificationChannel, results: List[Tuple[Optional[int], Union[bool, Future]]]
+    ) -> str:
+        """
+        Log the handler results of one subscription, per device for push channels.
+        
+        A send still waiting for its batch to be posted makes the subscription
+        ``queued`` unless another of its sends succeeded.
+        """
+        sent = queued = 0
+        for device_id, success in results:
+            if isinstance(success, Future):
+                if not success.done():
+                    logger.info(f"Notification queued for the next batch via {channel.name}")
+                    queued += 1
+                    continue
+                success = _deferred_success(success)
+            if device_id is None:
                 if success:
                     logger.info(f"Notification sent via {channel.name}")
                 else:
                     logger.warning(f"Failed to send notification via {channel.name}")
+            elif success:
+                logger.info(f"Notification sent to device {device_id}")
+            else:
+                logger.warning(f"Failed to send notification to device {device_id}")
+            if success:
+                sent += 1
+        if sent:
+            return "sent"
+        return "queued" if queued else "failed"
+    
+    def _deliver(
+        self,
+        handler: NotificationHandler,
+        config: Dict[str, Any],
+        message: str,
+        kwargs: Dict[str, Any],
+        subscription: DagSubscription,
+        event_type: EventType,
+        event_data: Mapping[str, Any],
+        device_id: Optional[int] = None,
+        attempt: int = 1,
+    ) -> Union[bool, Future]:
+        """
+        Call the handler and record the attempt in the delivery log.
         
+        A send the handler makes later (a ``Future``) is recorded once it is
+        made, and the ``Future`` is returned for the caller to wait on.
+        """
+        handler._record_status_code(None)
+        error = None
+        started = time.monotonic()
+        try:
+            success = handler.send(config, message, **kwargs)
         except Exception as e:
-            logger.error(f"Error sending notification: {str(e)}")
-    
-    def _get_template(self, session: Session, event_type: EventType, channel_type) -> NotificationTemplate:
-        """Get notification template for event and channel type."""
-        template = session.query(NotificationTemplate).filter(
-            NotificationTemplate.event_type == event_type,
-            NotificationTemplate.channel_type == channel_type,
-            NotificationTemplate.is_active == True
-        ).first()
-        
-        # If no specific template, use a default one
-        if not template:
-            template = self._get_default_template(event_type)
-        
-        return template
-    
-    def _get_default_template(self, event_type: EventType) -> NotificationTemplate:
-        """Create a default in-memory template."""
-        default_templates = {
-            EventType.TASK_SUCCESS: "✅ Task {{ task_id }} in DAG {{ dag_id }} succeeded at {{ execution_date }}",
-            EventType.TASK_FAILED: "❌ Task {{ task_id }} in DAG {{ dag_id }} failed at {{ execution_date }}",
-            EventType.TASK_RETRY: "🔄 Task {{ task_id }} in DAG {{ dag_id }} is retrying at {{ execution_date }}",
-            EventType.SLA_MISS: "⏰ SLA missed for task {{ task_id }} in DAG {{ dag_id }}",
-            EventType.DAG_SUCCESS: "✅ DAG {{ dag_id }} completed successfully at {{ execution_date }}",
-            EventType.DAG_FAILED: "❌ DAG {{ dag_id }} failed at {{ execution_date }}",
-        }
+            success = False
+            error = str(e)
         
-        # Create temporary template object
-        template = NotificationTemplate(
-            name=f"default_{event_type.value}",
-            event_type=event_type,
-            channel_type=None,  # Generic
-            template_content=default_templates.get(event_type, "Event occurred: {{ dag_id }}")
+        if isinstance(success, Future):
+            def record(done: Future) -> None:
+                failure = done.exception()
+                self._record_delivery(
+                    subscription, event_type, event_data, device_id, attempt,
+                    success=_deferred_success(done),
+                    http_status=getattr(getattr(failure, "response", None), "status_code", None),
+                    latency_ms=(time.monotonic() - started) * 1000,
+                    error=str(failure) if failure is not None else None,
+                )
+            
+            success.add_done_callback(record)
+            return success
+        
+        self._record_delivery(
+            subscription, event_type, event_data, device_id, attempt,
+            success=success,
+            http_status=handler.last_status_code,
+            latency_ms=(time.monotonic() - started) * 1000,
+            error=error,
         )
         
-        return template
+        if device_id is not None and handler.last_status_code in handler.device_gone_status_codes:
+            self._deactivate_device(device_id)
+        
+        return success
+    
+    def _record_delivery(
+        self,
+        subscription: DagSubscription,
+        event_type: EventType,
+        event_data: Mapping[str, Any],
+        device_id: Optional[int],
+        attempt: int,
+        success: bool,
+        http_status: Optional[int],
+        latency_ms: float,
+        error: Optional[str],
+    ) -> None:
+        self.delivery_log.record(
+            event_type=event_type,
+            dag_id=event_data.get("dag_id"),
+            task_id=event_data.get("task_id"),
+            run_id=event_data.get("run_id"),
+            execution_date=event_data.get("execution_date"),
+            subscription_id=subscription.id,
+            channel_id=subscription.channel_id,
+            channel_type=subscription.channel.channel_type,
+            device_id=device_id,
+            status=DeliveryStatus.SENT if success else DeliveryStatus.FAILED,
+            http_status=http_status,
+            latency_ms=latency_ms,
+            attempt=attempt,
+            error=error,
+        )
     
-    def _render_template(self, template_content: str, context: Dict[str, Any]) -> str:
-        """Render Jinja2 template with context."""
+    def _deactivate_device(self, device_id: int) -> None:
+        """Stop sending to a device whose token the push service no longer accepts."""
+        session = self._session_factory()
         try:
-            template = Template(template_content)
-            return template.render(**context)
-        except TemplateError as e:
-            logger.error(f"Template rendering error: {str(e)}")
-            return None
+            session.query(DeviceRegistration).filter(
+                DeviceRegistration.id == device_id
+            ).update({DeviceRegistration.is_active: False}, synchronize_session=False)
+            session.commit()
+            logger.info(f"Deactivated unregistered device {device_id}")
         except Exception as e:
-            logger.error(f"Unexpected error rendering template: {str(e)}")
-            return None
+            session.rollback()
+            logger.error(f"Error deactivating device {device_id}: {str(e)}")
+        finally:
+            session.close()
+    
+    def _get_template(
+        self,
+        session: Session,
+        event_type: EventType,
+        channel_type: ChannelType,
+        dag_id: Optional[str] = None,
+        template_id: Optional[int] = None,
+    ) -> ResolvedTemplate:
+        """Compiled template for a send: the subscription's, DAG's, channel's or default one."""
+        snapshot = self._routing.snapshot if self._routing else None
+        if snapshot is not None:
+            self._templates.use_snapshot(snapshot)
+        else:
+            self._templates.refresh(session)
+        return self._templates.resolve(event_type, channel_type, dag_id, template_id)
     
     def _get_user_devices(self, session: Session, user_id: str, platform_type: str) -> List[DeviceRegistration]:
-        """Get active devices for a user and platform."""
-        # Convert platform_type string to enum
-        from airflow_notification_plugin.models import PlatformType
-        try:
-            platform_enum = PlatformType[platform_type.upper()]
-        except KeyError:
-            logger.warning(f"Invalid platform type: {platform_type}")
-            return []
+        """Get active devices for a user reachable through a push channel or platform."""
+        platforms = PUSH_CHANNEL_PLATFORMS.get(platform_type.lower())
+        if platforms is None:
+            # Convert platform_type string to enum
+            try:
+                platforms = [PlatformType[platform_type.upper()]]
+            except KeyError:
+                logger.warning(f"Invalid platform type: {platform_type}")
+                return []
         
         devices = session.query(DeviceRegistration).filter(
             DeviceRegistration.user_id == user_id,
-            DeviceRegistration.platform_type == platform_enum,
+            DeviceRegistration.platform_type.in_(platforms),
             DeviceRegistration.is_active == True
         ).all()
         
@@ -0,0 +1,124 @@
+"""Restricted filter expressions for conditional subscriptions.
+
+``DagSubscription.filter_expression`` is a Python-like boolean expression over
+the event's template variables, for example::
+
+    duration > 1800
+    try_number == max_tries and state == "failed"
+    glob(hostname, "pool-a-*") or regex(hostname, r"gpu-\\d+")
+
+Only literals, event variables, comparisons (including ``in``), ``and``/
+``or``/``not``, ``+``/``-``/``/`` and the functions in ``FUNCTIONS`` are allowed;
+attribute access, subscripts, comprehensions and any other call are rejected
+when the expression is compiled. Each distinct expression is validated and
+compiled to a code object once and cached, so evaluating it per event costs a
+single ``eval`` against the event mapping.
+"""
+
+import ast
+import fnmatch
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+from airflow_notification_plugin.events import DAG_KEYS, TASK_KEYS
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPRESSION_LENGTH = 1000
+
+# Names an expression may refer to
+VARIABLES = frozenset(TASK_KEYS) | frozenset(DAG_KEYS)
+
+
+@lru_cache(maxsize=256)
+def _compiled_regex(pattern: str) -> "re.Pattern":
+    return re.compile(pattern)
+
+
+def _glob(value: Any, pattern: str) -> bool:
+    return value is not None and fnmatch.fnmatchcase(str(value), pattern)
+
+
+def _regex(value: Any, pattern: str) -> bool:
+    return value is not None and _compiled_regex(pattern).fullmatch(str(value)) is not None
+
+
+FUNCTIONS = {
+    "glob": _glob,
+    "regex": _regex,
+    "lower": lambda value: str(value).lower() if value is not None else None,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Div,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple, ast.Call,
+)
+
+
+class FilterError(ValueError):
+    """Raised for filter expressions that are invalid or use disallowed syntax."""
+
+
+def _validate(tree: ast.AST) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FilterError(f"'{type(node).__name__}' is not allowed in filter expressions")
+        if isinstance(node, ast.Name) and node.id not in VARIABLES and node.id not in FUNCTIONS:
+            raise FilterError(f"Unknown name '{node.id}'")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise FilterError(f"Only {sorted(FUNCTIONS)} may be called")
+            if node.keywords:
+                raise FilterError("Keyword arguments are not allowed")
+        if isinstance(node, ast.Constant) and not isinstance(
+            node.value, (str, int, float, bool, type(None))
+        ):
+            raise FilterError(f"Literal {node.value!r} is not allowed")
+
+
+@lru_cache(maxsize=1024)
+def compile_filter(expression: str) -> Callable[[Mapping[str, Any]], bool]:
+    """
+    Compile a filter expression into a predicate over event data.
+
+    Raises:
+        FilterError: If the expression is too long, malformed or not allowed
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise FilterError(f"Filter expressions are limited to {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FilterError(f"Invalid filter expression: {e.msg}")
+    _validate(tree)
+    code = compile(tree, "<filter_expression>", "eval")
+    scope = {"__builtins__": {}, **FUNCTIONS}
+
+    def predicate(event_data: Mapping[str, Any]) -> bool:
+        # Variables missing from this event (e.g. task_id on DAG events) are None
+        variables = {name: event_data.get(name) for name in code.co_names if name in VARIABLES}
+        return bool(eval(code, scope, variables))
+
+    return predicate
+
+
+def matches_filter(expression: str, event_data: Mapping[str, Any]) -> bool:
+    """
+    Evaluate a subscription's filter against an event.
+
+    Invalid expressions and evaluation errors (e.g. comparing None with a
+    number) let the notification through, so a bad filter never hides an alert.
+    """
+    try:
+        return compile_filter(expression)(event_data)
+    except Exception as e:
+        logger.warning(f"Error evaluating filter expression '{expression}': {str(e)}")
+        return True
+
@@ -1,17 +1,60 @@
 """Notification channel handlers using strategy pattern."""
 
 from abc import ABC, abstractmethod
+import functools
+import importlib
 import json
 import logging
-from typing import Dict, Any
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple
 import requests
 
+from airflow_notification_plugin.config import config as plugin_config
+from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+from airflow_notification_plugin.metrics import HANDLER_SECONDS, HANDLER_TOTAL, timed
+
 logger = logging.getLogger(__name__)
 
+FCM_URL = "https://fcm.googleapis.com/fcm/send"
+
+# Groups concurrent SMS sends of one message for gateways that accept several numbers
+sms_batcher = RecipientBatcher(plugin_config.SMS_BATCH_WAIT_MS)
+
 
 class NotificationHandler(ABC):
     """Abstract base class for notification handlers."""
     
+    # Channel type label used in metrics; subclasses set their ChannelType value
+    channel_type = "unknown"
+    
+    # HTTP status codes meaning the device token is gone for good; the dispatcher
+    # deactivates the device when a push send gets one
+    device_gone_status_codes = frozenset({410})
+    
+    # Per-thread state so concurrent sends never see each other's status code;
+    # created lazily so subclasses don't need to call super().__init__()
+    _state = None
+    
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """HTTP status code of the last request made by this thread, if any."""
+        return getattr(self._state, "status_code", None)
+    
+    def _record_status_code(self, status_code: Optional[int]) -> None:
+        """Remember the HTTP status code of the current send for the delivery log."""
+        if self._state is None:
+            self._state = threading.local()
+        self._state.status_code = status_code
+    
+    def __init_subclass__(cls, **kwargs):
+        """Wrap every concrete ``send`` so all handlers are instrumented uniformly."""
+        super().__init_subclass__(**kwargs)
+        send = cls.__dict__.get("send")
+        if send is not None and not getattr(send, "__isabstractmethod__", False):
+            cls.send = _instrumented_send(send)
+    
     @abstractmethod
     def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
         """
@@ -23,14 +66,48 @@ class NotificationHandler(ABC):
             **kwargs: Additional parameters
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful, False otherwise. A handler that sends later
+            (batching) returns a ``Future`` instead, set to the outcome or to
+            the error once the send is made
         """
         pass
+    
+    def flush(self) -> None:
+        """Send anything held back for batching; called at the end of each dispatch."""
+
+
+# Tracks whether this thread is already inside an instrumented send, so a
+# subclass calling super().send() is only counted once
+_instrumentation = threading.local()
+
+
+def _instrumented_send(send):
+    """Count and time a handler's ``send`` by channel type and outcome."""
+    @functools.wraps(send)
+    def wrapper(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
+        if getattr(_instrumentation, "active", False):
+            return send(self, config, message, **kwargs)
+        
+        _instrumentation.active = True
+        try:
+            with timed(HANDLER_TOTAL, HANDLER_SECONDS, channel_type=self.channel_type) as timer:
+                success = send(self, config, message, **kwargs)
+                if isinstance(success, Future):
+                    timer.outcome = "queued"
+                else:
+                    timer.outcome = "success" if success else "failure"
+            return success
+        finally:
+            _instrumentation.active = False
+    
+    return wrapper
 
 
 class SlackHandler(NotificationHandler):
     """Handler for Slack webhook notifications."""
     
+    channel_type = "slack"
+    
     def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
         """Send notification to Slack via webhook."""
         try:
@@ -50,6 +127,7 @@ class SlackHandler(NotificationHandler):
                 json=payload,
                 timeout=10
             )
+            self._record_status_code(response.status_code)
             
             if response.status_code == 200:
                 logger.info("Slack notification sent successfully")
@@ -66,6 +144,8 @@ class SlackHandler(NotificationHandler):
 class SMSHandler(NotificationHandler):
     """Handler for SMS notifications."""
     
+    channel_type = "sms"
+    
     def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
         """Send SMS notification."""
         try:
@@ -77,38 +157,58 @@ class SMSHandler(NotificationHandler):
                 logger.error("SMS configuration incomplete")
                 return False
             
-            payload = {
-                "to": phone_number,
-                "message": message,
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            
-            response = requests.post(
-                api_url,
-                json=payload,
-                headers=headers,
-                timeout=10
-            )
+            max_recipients = int(config.get("max_recipients", 1))
+            if max_recipients > 1:
+                # The gateway takes a list of numbers: share one call with concurrent sends
+                status_code, text = sms_batcher.send(
+                    (api_url, api_key, message),
+                    phone_number,
+                    lambda numbers: self._post(api_url, api_key, numbers, message),
+                    max_recipients,
+                )
+            else:
+                status_code, text = self._post(api_url, api_key, phone_number, message)[phone_number]
+            self._record_status_code(status_code)
             
-            if response.status_code in [200, 201]:
+            if status_code in [200, 201]:
                 logger.info(f"SMS sent successfully to {phone_number}")
                 return True
             else:
-                logger.error(f"SMS failed: {response.status_code} - {response.text}")
+                logger.error(f"SMS failed: {status_code} - {text}")
                 return False
         
         except Exception as e:
             logger.error(f"Error sending SMS: {str(e)}")
             return False
+    
+    @staticmethod
+    def _post(api_url: str, api_key: str, to, message: str) -> Dict[str, Tuple[int, str]]:
+        """Call the gateway for one number or a list of numbers; returns the reply per number."""
+        payload = {
+            "to": to,
+            "message": message,
+        }
+        
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        
+        response = requests.post(
+            api_url,
+            json=payload,
+            headers=headers,
+            timeout=10
+        )
+        numbers = to if isinstance(to, list) else [to]
+        return {number: (response.status_code, response.text) for number in numbers}
 
 
 class YouduHandler(NotificationHandler):
     """Handler for Youdu (有度) webhook notifications."""
     
+    channel_type = "youdu"
+    
     def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
         """Send notification to Youdu via webhook."""
         try:
@@ -120,7 +220,7 @@ class YouduHandler(NotificationHandler):
                 return False
             
             payload = {
-                "toUser": kwargs.get("user_id", ""),
+                "toUser": kwargs.get("youdu_id") or kwargs.get("user_id", ""),
                 "msgType": "text",
                 "text": {
                     "content": message
@@ -135,6 +235,7 @@ class YouduHandler(NotificationHandler):
                 json=payload,
                 timeout=10
             )
+            self._record_status_code(response.status_code)
             
             if response.status_code == 200:
                 logger.info("Youdu notification sent successfully")
@@ -151,6 +252,8 @@ class YouduHandler(NotificationHandler):
 class FCMHandler(NotificationHandler):
     """Handler for Firebase Cloud Messaging (FCM) notifications."""
     
+    channel_type = "fcm"
+    
     def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
         """Send push notification via FCM."""
         try:
@@ -161,7 +264,7 @@ class FCMHandler(NotificationHandler):
                 logger.error("FCM configuration incomplete")
                 return False
             
-            fcm_url = "https://fcm.googleapis.com/fcm/send"
+            fcm_url = config.get("fcm_url", FCM_URL)
             
             payload = {
                 "to": device_token,
@@ -183,6 +286,7 @@ class FCMHandler(NotificationHandler):
                 headers=headers,
                 timeout=10
             )
+            self._record_status_code(response.status_code)
             
             if response.status_code == 200:
                 result = response.json()
@@ -201,38 +305,106 @@ class FCMHandler(NotificationHandler):
             return False
 
 
-class APNSHandler(NotificationHandler):
-    """Handler for Apple Push Notification Service (APNS).
+# Handler registry. Handlers are discovered through the entry point group below
+# and instantiated on first use, so a process only imports (and opens
+# connections for) the channels it actually sends on. Third-party packages
+# register their own handlers in the same group; a name that matches a
+# built-in channel replaces the built-in handler.
+HANDLER_ENTRY_POINT_GROUP = "airflow_notification_plugin.handlers"
+
+# Fallback for source checkouts, where the package's own entry points are not installed
+BUILTIN_HANDLERS = {
+    "slack": "airflow_notification_plugin.dispatchers.handlers:SlackHandler",
+    "sms": "airflow_notification_plugin.dispatchers.handlers:SMSHandler",
+    "youdu": "airflow_notification_plugin.dispatchers.handlers:YouduHandler",
+    "fcm": "airflow_notification_plugin.dispatchers.handlers:FCMHandler",
+    "apns": "airflow_notification_plugin.dispatchers.apns:APNSHandler",
+    "webpush": "airflow_notification_plugin.dispatchers.webpush:WebPushHandler",
+    "email": "airflow_notification_plugin.dispatchers.smtp:EmailHandler",
+    "webhook": "airflow_notification_plugin.dispatchers.webhook:WebhookHandler",
+}
+
+# Handlers instantiated in this process, by name
+HANDLERS: Dict[str, NotificationHandler] = {}
+_handlers_lock = threading.Lock()
+
+
+def _entry_points():
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=HANDLER_ENTRY_POINT_GROUP)
+    return entry_points.get(HANDLER_ENTRY_POINT_GROUP, [])
+
+
+@functools.lru_cache(maxsize=None)
+def _handler_specs() -> Dict[str, str]:
+    """``module:Class`` of every known handler, by name."""
+    specs = dict(BUILTIN_HANDLERS)
+    try:
+        for entry_point in _entry_points():
+            specs[entry_point.name.lower()] = entry_point.value
+    except Exception as e:
+        logger.error(f"Error reading notification handler entry points: {str(e)}")
+    return specs
+
+
+def _load_handler_class(spec: str):
+    module_name, _, attribute = spec.partition(":")
+    target = importlib.import_module(module_name.strip())
+    for name in attribute.strip().split("."):
+        target = getattr(target, name)
+    return target
+
+
+def flush_handlers() -> None:
+    """Flush every loaded handler."""
+    for handler in list(HANDLERS.values()):
+        try:
+            handler.flush()
+        except Exception as e:
+            logger.error(f"Error flushing handler {handler.channel_type}: {str(e)}")
+
+
+def get_handler(channel_type: str) -> Optional[NotificationHandler]:
+    """
+    Get the handler for a channel type, instantiating it on first use.
     
-    Note: This is a placeholder implementation. APNS requires more complex 
-    setup with certificates and proper authentication. To implement:
-    - Use PyAPNs2 or similar library
-    - Provide certificate/key files
-    - Implement proper authentication flow
+    Returns None for unknown channel types and for channels disabled with
+    ``NOTIFICATION_ENABLE_<NAME>=false``; the handler's module is not imported then.
     """
+    name = channel_type.lower()
+    handler = HANDLERS.get(name)
+    if handler is not None:
+        return handler
     
-    def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
-        """Send push notification via APNS.
-        
-        This is a placeholder that returns False. Implement when APNS support is needed.
-        """
-        logger.warning(
-            "APNS handler is not fully implemented. "
-            "Please use FCM for push notifications or implement APNS support."
-        )
-        return False
+    if not plugin_config.is_channel_enabled(name):
+        logger.debug(f"Channel type {name} is disabled")
+        return None
+    
+    spec = _handler_specs().get(name)
+    if spec is None:
+        return None
+    
+    with _handlers_lock:
+        handler = HANDLERS.get(name)
+        if handler is None:
+            try:
+                handler = HANDLERS[name] = _load_handler_class(spec)()
+            except Exception as e:
+                logger.error(f"Error loading handler {spec} for channel type {name}: {str(e)}")
+                return None
+    return handler
 
 
-# Handler registry - APNS commented out until fully implemented
-HANDLERS = {
-    "slack": SlackHandler(),
-    "sms": SMSHandler(),
-    "youdu": YouduHandler(),
-    "fcm": FCMHandler(),
-    # "apns": APNSHandler(),  # Uncomment when APNS is fully implemented
-}
+def _reset_after_fork() -> None:
+    # Handlers hold thread-local state and share connection pools; a forked
+    # worker starts with its own
+    global _handlers_lock
+    HANDLERS.clear()
+    _handlers_lock = threading.Lock()
 
 
-def get_handler(channel_type: str) -> NotificationHandler:
-    """Get the appropriate handler for a channel type."""
-    return HANDLERS.get(channel_type.lower())
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
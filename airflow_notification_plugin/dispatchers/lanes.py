@@ -0,0 +1,273 @@
+"""Priority lanes for queued handler sends.
+
+Every send queued by the dispatch worker is assigned a ``NotificationPriority``:
+the subscription's ``priority`` if set, otherwise the default of its event
+type (``NOTIFICATION_EVENT_PRIORITIES``; failures are critical and successes
+low by default). ``LaneScheduler`` keeps one queue per lane and, inside each
+lane, one queue per channel:
+
+- lanes are served by smooth weighted round-robin (``NOTIFICATION_LANE_WEIGHTS``),
+  so a backlog of ``TASK_SUCCESS`` sends cannot delay a ``DAG_FAILED`` alert
+  by more than a few sends
+- channels within a lane are served round-robin, so one slow or noisy channel
+  does not hold up the others
+- a send that has waited longer than ``NOTIFICATION_LANE_MAX_WAIT`` is served
+  next whatever its lane, so low lanes are never starved
+
+Lane depth and wait time are exported as ``notification_lane_depth`` and
+``notification_lane_wait_seconds``.
+
+The lanes hold at most ``NOTIFICATION_LANE_CAPACITY`` sends. An event is
+admitted only if there is room for all of its sends (one per subscription; an
+event with more sends than the capacity needs empty lanes). What happens to an
+event that does not fit is its type's ``OverflowPolicy``
+(``NOTIFICATION_OVERFLOW_POLICIES``); see ``WorkerDispatcher``.
+"""
+
+import enum
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.metrics import LANE_DEPTH, LANE_WAIT_SECONDS
+from airflow_notification_plugin.models import EventType, NotificationPriority
+
+logger = logging.getLogger(__name__)
+
+# Lane order, highest priority first
+LANES = tuple(NotificationPriority)
+_RANK = {lane: rank for rank, lane in enumerate(LANES)}
+
+
+class OverflowPolicy(enum.Enum):
+    """What to do with an event when the lanes are full."""
+    BLOCK = "block"  # wait briefly for room, then drop
+    DROP = "drop"  # evict a queued lower-priority send, else drop the event
+    SPILL = "spill"  # write the event to the durable outbox table
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    """Parse ``"key=value,key=value"`` into a dict of lower-cased keys and values."""
+    pairs = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        key, sep, val = item.partition("=")
+        if not sep:
+            logger.warning(f"Ignoring malformed setting '{item}', expected key=value")
+            continue
+        pairs[key.strip().lower()] = val.strip().lower()
+    return pairs
+
+
+@lru_cache(maxsize=None)
+def _event_priorities(value: str) -> Dict[EventType, NotificationPriority]:
+    priorities = {}
+    for event_type, lane in _parse_pairs(value).items():
+        try:
+            priorities[EventType(event_type)] = NotificationPriority(lane)
+        except ValueError:
+            logger.warning(f"Ignoring invalid event priority {event_type}={lane}")
+    return priorities
+
+
+@lru_cache(maxsize=None)
+def _lane_weights(value: str) -> Dict[NotificationPriority, int]:
+    weights = {lane: 1 for lane in LANES}
+    for lane, weight in _parse_pairs(value).items():
+        try:
+            weights[NotificationPriority(lane)] = max(1, int(weight))
+        except ValueError:
+            logger.warning(f"Ignoring invalid lane weight {lane}={weight}")
+    return weights
+
+
+@lru_cache(maxsize=None)
+def _overflow_policies(value: str) -> Dict[EventType, OverflowPolicy]:
+    policies = {}
+    for event_type, policy in _parse_pairs(value).items():
+        try:
+            policies[EventType(event_type)] = OverflowPolicy(policy)
+        except ValueError:
+            logger.warning(f"Ignoring invalid overflow policy {event_type}={policy}")
+    return policies
+
+
+def resolve_overflow_policy(event_type: EventType) -> OverflowPolicy:
+    """Overflow policy of an event type; ``block`` if not configured."""
+    return _overflow_policies(config.OVERFLOW_POLICIES).get(event_type, OverflowPolicy.BLOCK)
+
+
+def resolve_priority(event_type: EventType, subscription=None) -> NotificationPriority:
+    """Lane of a send: the subscription's override, else the event type's default."""
+    override = getattr(subscription, "priority", None)
+    if override is not None:
+        return override
+    return _event_priorities(config.EVENT_PRIORITIES).get(event_type, NotificationPriority.NORMAL)
+
+
+def priority_rank(priority: NotificationPriority) -> int:
+    """Sort key putting higher priorities first."""
+    return _RANK[priority]
+
+
+class LaneScheduler:
+    """Thread-safe multi-lane queue with weighted-fair, starvation-free ``get``."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[NotificationPriority, int]] = None,
+        max_wait: Optional[float] = None,
+        capacity: Optional[int] = None,
+    ):
+        self.weights = weights or _lane_weights(config.LANE_WEIGHTS)
+        self.max_wait = config.LANE_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.capacity = config.LANE_CAPACITY if capacity is None else capacity
+        # lane -> channel key -> queue of (enqueued_at, item); channel order is the round-robin
+        self._lanes: Dict[NotificationPriority, "OrderedDict[Hashable, Deque[Tuple[float, Any]]]"]
+        self._lanes = {lane: OrderedDict() for lane in LANES}
+        self._credit = {lane: 0 for lane in LANES}
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)  # items available
+        self._room = threading.Condition(self._lock)  # below capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def full(self) -> bool:
+        return not self.has_room(1)
+
+    def has_room(self, sends: int) -> bool:
+        """Whether ``sends`` more sends fit; more than the capacity fit only in empty lanes."""
+        return self._shortfall(sends) <= 0
+
+    def _shortfall(self, sends: int) -> int:
+        if self.capacity <= 0:
+            return 0
+        return self._size + min(sends, self.capacity) - self.capacity
+
+    def wait_for_room(self, timeout: float, sends: int = 1) -> bool:
+        """Wait up to ``timeout`` seconds until ``sends`` more sends fit."""
+        with self._lock:
+            return self._room.wait_for(lambda: self.has_room(sends) or self._closed, timeout)
+
+    def evict_below(
+        self, priority: NotificationPriority, sends: int = 1
+    ) -> List[Tuple[NotificationPriority, Any]]:
+        """
+        Make room for ``sends`` sends by removing sends of lanes below ``priority``.
+
+        The newest sends of the lowest non-empty lane go first, each taken from
+        the channel with the longest backlog in that lane. Nothing is removed
+        unless the lower lanes hold enough sends to make room.
+
+        Returns:
+            The evicted ``(lane, item)`` pairs; empty if there was not enough to evict
+        """
+        with self._lock:
+            needed = self._shortfall(sends)
+            lower = list(reversed(LANES[_RANK[priority] + 1:]))
+            available = sum(len(queue) for lane in lower for queue in self._lanes[lane].values())
+            if needed <= 0 or available < needed:
+                return []
+            evicted = []
+            for lane in lower:
+                channels = self._lanes[lane]
+                while channels and len(evicted) < needed:
+                    channel_key = max(channels, key=lambda key: len(channels[key]))
+                    queue = channels[channel_key]
+                    _, item = queue.pop()
+                    if not queue:
+                        del channels[channel_key]
+                    evicted.append((lane, item))
+            self._size -= len(evicted)
+        for lane, _ in evicted:
+            LANE_DEPTH.labels(lane=lane.value).dec()
+        return evicted
+
+    def put(self, item: Any, priority: NotificationPriority, channel_key: Hashable = None) -> None:
+        """Queue an item. Capacity is enforced by callers via ``has_room`` before routing an event."""
+        with self._lock:
+            channels = self._lanes[priority]
+            queue = channels.get(channel_key)
+            if queue is None:
+                queue = channels[channel_key] = deque()
+            queue.append((time.monotonic(), item))
+            self._size += 1
+            self._cond.notify()
+        LANE_DEPTH.labels(lane=priority.value).inc()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Take the next item, waiting up to ``timeout`` seconds.
+
+        Returns None on timeout or once the scheduler is closed and empty.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._size or self._closed, timeout)
+            if not self._size:
+                return None
+            now = time.monotonic()
+            lane = self._pick_lane(now)
+            channels = self._lanes[lane]
+            channel_key, queue = next(iter(channels.items()))
+            enqueued_at, item = queue.popleft()
+            # Move the channel to the back of the lane's round-robin
+            del channels[channel_key]
+            if queue:
+                channels[channel_key] = queue
+            self._size -= 1
+            self._room.notify()
+
+        LANE_DEPTH.labels(lane=lane.value).dec()
+        LANE_WAIT_SECONDS.labels(lane=lane.value).observe(now - enqueued_at)
+        return item
+
+    def _pick_lane(self, now: float) -> NotificationPriority:
+        active = [lane for lane in LANES if self._lanes[lane]]
+
+        # Starvation protection: the longest-waiting overdue send goes first
+        oldest_lane, oldest = None, now - self.max_wait
+        for lane in active:
+            head = min(queue[0][0] for queue in self._lanes[lane].values())
+            if head < oldest:
+                oldest_lane, oldest = lane, head
+        if oldest_lane is not None:
+            return oldest_lane
+
+        # Smooth weighted round-robin; ties go to the higher lane
+        total, best = 0, None
+        for lane in active:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+            if best is None or self._credit[lane] > self._credit[best]:
+                best = lane
+        self._credit[best] -= total
+        return best
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Depth and oldest wait (seconds) per lane."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                lane.value: {
+                    "depth": sum(len(queue) for queue in channels.values()),
+                    "oldest_wait": max(
+                        (now - queue[0][0] for queue in channels.values()), default=0.0
+                    ),
+                }
+                for lane, channels in self._lanes.items()
+            }
+
+    def close(self) -> None:
+        """Wake up waiting consumers; ``get`` returns None once the lanes are empty."""
+        with self._lock:
+            self._closed = True
+            self._cond.notify_all()
+            self._room.notify_all()
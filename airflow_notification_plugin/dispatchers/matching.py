@@ -0,0 +1,207 @@
+"""Glob and regex DAG id matching for pattern subscriptions.
+
+A ``DagSubscription`` whose ``match_type`` is ``glob`` or ``regex`` uses its
+``dag_id`` as a pattern (regexes are anchored: the whole DAG id must match).
+``PatternMatcher`` compiles a set of patterns once:
+
+- globs are split at their first wildcard; the literal prefix goes into a
+  character trie, so only patterns whose prefix matches the DAG id are looked
+  at, and the common ``prefix*`` form needs no further check
+- regexes are combined into one alternation that rejects non-matching DAG
+  ids in a single pass. On a hit, a second combined regex tries every
+  pattern as an optional lookahead that sets a named group of its own, so
+  the groups that matched name the matching subscriptions in one more pass.
+  Regexes referring to their own groups (backreferences, conditionals) would
+  refer to the wrong group there, so they are left out and always tried on
+  their own, as are all regexes if the combined regexes do not compile (e.g.
+  the same group name in two patterns)
+
+Results are cached per DAG id. ``PatternIndex`` keeps one matcher per event
+type built from the active pattern subscriptions and rebuilds it every
+``NOTIFICATION_PATTERN_REFRESH_SECONDS``.
+"""
+
+import fnmatch
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import DagSubscription, EventType, MatchType
+
+logger = logging.getLogger(__name__)
+
+PATTERN_MATCH_TYPES = (MatchType.GLOB, MatchType.REGEX)
+
+_GLOB_WILDCARDS = "*?["
+# Marker key for patterns stored at a trie node
+_ENTRIES = ""
+# Numbered or named backreference, or a conditional on a group
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+# Prefix of the group set by each regex in the combined lookaheads
+_REGEX_GROUP = "_pattern_"
+
+
+def validate_pattern(match_type: MatchType, pattern: str) -> None:
+    """
+    Check that a subscription pattern compiles.
+
+    Raises:
+        ValueError: If the pattern is not a valid regex
+    """
+    if match_type == MatchType.REGEX:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid DAG id regex '{pattern}': {str(e)}")
+
+
+def _split_glob(pattern: str) -> Tuple[str, Optional[str]]:
+    """Split a glob into its literal prefix and a regex for the rest (None: matches anything)."""
+    cut = min((pattern.find(c) for c in _GLOB_WILDCARDS if c in pattern), default=len(pattern))
+    prefix, rest = pattern[:cut], pattern[cut:]
+    if rest == "*":
+        return prefix, None
+    # fnmatch.translate anchors the end; an empty rest means an exact match
+    return prefix, fnmatch.translate(rest)
+
+
+class PatternMatcher:
+    """Compiled set of glob/regex patterns, matched against DAG ids."""
+
+    def __init__(
+        self, patterns: Iterable[Tuple[Hashable, MatchType, str]], cache_size: int = 4096
+    ):
+        self._trie: dict = {}
+        self._regexes: List[Tuple[Hashable, "re.Pattern"]] = []
+        self._standalone: List[Tuple[Hashable, "re.Pattern"]] = []
+        self._combined: Optional["re.Pattern"] = None
+        self._which: Optional["re.Pattern"] = None
+        self._cache: "OrderedDict[str, Tuple[Hashable, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+        for key, match_type, pattern in patterns:
+            try:
+                if match_type == MatchType.GLOB:
+                    prefix, rest = _split_glob(pattern)
+                    node = self._trie
+                    for char in prefix:
+                        node = node.setdefault(char, {})
+                    tail = re.compile(rest) if rest is not None else None
+                    node.setdefault(_ENTRIES, []).append((key, tail))
+                elif match_type == MatchType.REGEX:
+                    regexes = self._standalone if _GROUP_REFERENCE.search(pattern) else self._regexes
+                    regexes.append((key, re.compile(pattern)))
+            except re.error as e:
+                logger.warning(f"Ignoring invalid DAG id pattern '{pattern}': {str(e)}")
+
+        if self._regexes:
+            try:
+                self._combined = re.compile(
+                    "|".join(f"(?:{regex.pattern})" for _, regex in self._regexes)
+                )
+                # Zero-width, so every lookahead is tried at the start of the DAG id
+                self._which = re.compile("".join(
+                    f"(?:(?=(?:{regex.pattern})\\Z)(?P<{_REGEX_GROUP}{n}>))?"
+                    for n, (_, regex) in enumerate(self._regexes)
+                ))
+            except re.error:
+                # e.g. conflicting group names; fall back to trying each regex
+                self._combined = self._which = None
+
+    def match(self, dag_id: str) -> Tuple[Hashable, ...]:
+        """Keys of all patterns matching ``dag_id``."""
+        with self._lock:
+            cached = self._cache.get(dag_id)
+            if cached is not None:
+                self._cache.move_to_end(dag_id)
+                return cached
+
+        keys = self._match_globs(dag_id) + self._match_regexes(dag_id)
+        result = tuple(keys)
+
+        with self._lock:
+            self._cache[dag_id] = result
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _match_globs(self, dag_id: str) -> List[Hashable]:
+        keys = []
+        node = self._trie
+        for depth in range(len(dag_id) + 1):
+            for key, tail in node.get(_ENTRIES, ()):
+                if tail is None or tail.match(dag_id, depth):
+                    keys.append(key)
+            if depth == len(dag_id):
+                break
+            node = node.get(dag_id[depth])
+            if node is None:
+                break
+        return keys
+
+    def _match_regexes(self, dag_id: str) -> List[Hashable]:
+        keys = [key for key, regex in self._standalone if regex.fullmatch(dag_id)]
+        if not self._regexes:
+            return keys
+        if self._combined is None:
+            return [key for key, regex in self._regexes if regex.fullmatch(dag_id)] + keys
+        if not self._combined.fullmatch(dag_id):
+            return keys
+        groups = self._which.match(dag_id)
+        return [
+            key for n, (key, _) in enumerate(self._regexes)
+            if groups.group(f"{_REGEX_GROUP}{n}") is not None
+        ] + keys
+
+
+class PatternIndex:
+    """Per-event-type matchers over the active pattern subscriptions, refreshed periodically."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = (
+            config.PATTERN_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._matchers: Dict[EventType, PatternMatcher] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Rebuild the matchers on next use."""
+        self._loaded_at = None
+
+    def match(self, session: Session, event_type: EventType, dag_id: str) -> Tuple[int, ...]:
+        """Ids of active pattern subscriptions for ``event_type`` that match ``dag_id``."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self._load(session)
+        matcher = self._matchers.get(event_type)
+        return matcher.match(dag_id) if matcher is not None else ()
+
+    def _load(self, session: Session) -> None:
+        with self._lock:
+            loaded_at = self._loaded_at
+            if loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+                return
+            rows = session.query(
+                DagSubscription.id,
+                DagSubscription.event_type,
+                DagSubscription.match_type,
+                DagSubscription.dag_id,
+            ).filter(
+                DagSubscription.match_type.in_(PATTERN_MATCH_TYPES),
+                DagSubscription.is_active == True,
+            ).all()
+
+            patterns = defaultdict(list)
+            for subscription_id, event_type, match_type, pattern in rows:
+                patterns[event_type].append((subscription_id, match_type, pattern))
+            self._matchers = {
+                event_type: PatternMatcher(entries) for event_type, entries in patterns.items()
+            }
+            self._loaded_at = time.monotonic()
@@ -0,0 +1,455 @@
+"""Node-wide routing snapshot shared by dispatcher processes through a memory-mapped file.
+
+With ``NOTIFICATION_ROUTING_SNAPSHOT_PATH`` set, dispatchers route events from
+an immutable file holding the active ``DagSubscription`` rows, the
+``NotificationChannel`` rows and the active ``NotificationTemplate`` rows,
+instead of querying them per event. Every process on the node maps the same
+file, so the routing data is held once in the page cache rather than once per
+process.
+
+Only long-lived processes (the dispatch worker) write the file, so a task's
+listener never pays for a rebuild; task processes only read it, and query the
+database while it is missing, older than twice the refresh interval or older
+than an admin edit they noticed. One writer at a time refreshes the file:
+whoever finds it older than ``NOTIFICATION_ROUTING_SNAPSHOT_REFRESH_SECONDS``
+and wins the non-blocking lock on ``<path>.lock`` rebuilds it from the
+database, writes it next to the old one and renames it into place, so readers
+never see a partial file. The file holds channel configs, secrets included, so
+it is created with mode 0600 and must live in a directory only the Airflow
+user can access. The
+generation in the header is bumped only when the contents change (an
+unchanged rebuild just touches the file). Readers ``stat`` the path at most
+once per ``CHECK_INTERVAL_SECONDS`` and map the new file when it was replaced
+with a newer generation; processes that already mapped the old file keep
+reading it until then. After an admin edit (see ``changes``), ``invalidate``
+makes the next check rebuild (or, in a reader, stop using) a file whose build
+started before the edit was noticed.
+
+Layout (big-endian)::
+
+    header    magic, version, content digest, generation, build time,
+              (offset, length) of the five sections below
+    channels  JSON {id: [name, channel_type, config, is_active]}
+    templates JSON [[id, name, event_type, channel_type, dag_id, template_content], ...]
+    selectors JSON [[id, event_type, match_type, pattern], ...] (glob/regex/tag/owner)
+    by id     sorted (subscription id, record offset, record length) entries
+    routes    sorted (hash of event_type and dag_id, offset, length) entries
+
+Subscription records are JSON arrays and route records hold
+``[event_type, dag_id, [subscription ids]]``. Lookups binary-search the entry
+tables in place and decode only the records they hit.
+
+Tag and owner subscriptions still go through ``SelectorIndex``, which needs
+Airflow's DAG tables anyway; their ids are resolved against the snapshot.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.matching import PATTERN_MATCH_TYPES, PatternMatcher
+from airflow_notification_plugin.dispatchers.templates import TemplateRow, load_template_rows
+from airflow_notification_plugin.models import (
+    ChannelType,
+    DagSubscription,
+    EventType,
+    MatchType,
+    NotificationChannel,
+    NotificationPriority,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no refresher election, renames are still atomic
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NRS1"
+SNAPSHOT_VERSION = 2
+# Seconds between checks of the snapshot file for a new generation
+CHECK_INTERVAL_SECONDS = 1.0
+
+# magic, version, digest, generation, built at, 5 x (section offset, section length)
+_HEADER = struct.Struct("!4sH16sQd10Q")
+# key (subscription id or route hash), record offset, record length
+_ENTRY = struct.Struct("!QQI")
+
+
+class RoutedChannel(NamedTuple):
+    """Channel of a routed subscription, as stored in the snapshot."""
+    id: int
+    name: str
+    channel_type: ChannelType
+    config: str
+    is_active: bool
+
+
+class RoutedSubscription(NamedTuple):
+    """Active subscription read from the snapshot, with its channel attached."""
+    id: int
+    user_id: str
+    dag_id: str
+    event_type: EventType
+    channel_id: int
+    priority: Optional[NotificationPriority]
+    filter_expression: Optional[str]
+    template_id: Optional[int]
+    channel: Optional[RoutedChannel]
+
+
+def _route_hash(event_type: str, dag_id: str) -> int:
+    digest = hashlib.blake2b(f"{event_type}\0{dag_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _value(member) -> Optional[str]:
+    return member.value if member is not None else None
+
+
+def _read_header(path: str) -> Optional[Tuple[bytes, int]]:
+    """Content digest and generation of the snapshot at ``path``; None if there is none."""
+    try:
+        with open(path, "rb") as f:
+            header = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if header[0] != MAGIC or header[1] != SNAPSHOT_VERSION:
+        return None
+    return header[2], header[3]
+
+
+def build_snapshot(session: Session, generation: int) -> bytes:
+    """Serialize the current routing data as a snapshot file's contents."""
+    # Taken before reading, so a snapshot built at T reflects every commit before T
+    built_at = time.time()
+    subscriptions = session.query(
+        DagSubscription.id,
+        DagSubscription.user_id,
+        DagSubscription.dag_id,
+        DagSubscription.match_type,
+        DagSubscription.event_type,
+        DagSubscription.channel_id,
+        DagSubscription.priority,
+        DagSubscription.filter_expression,
+        DagSubscription.template_id,
+    ).filter(DagSubscription.is_active == True).order_by(DagSubscription.id).all()
+
+    channels = {
+        str(row.id): [row.name, row.channel_type.value, row.config, bool(row.is_active)]
+        for row in session.query(
+            NotificationChannel.id,
+            NotificationChannel.name,
+            NotificationChannel.channel_type,
+            NotificationChannel.config,
+            NotificationChannel.is_active,
+        )
+    }
+    templates = [
+        [row.id, row.name, row.event_type.value, row.channel_type.value, row.dag_id,
+         row.template_content]
+        for row in load_template_rows(session)
+    ]
+
+    records = bytearray()
+    by_id = []
+    routes = defaultdict(list)
+    selectors = []
+    for row in subscriptions:
+        record = _json([
+            row.id, row.user_id, row.dag_id, row.event_type.value, row.channel_id,
+            _value(row.priority), row.filter_expression, row.template_id,
+        ])
+        by_id.append((row.id, len(records), len(record)))
+        records += record
+        if row.match_type == MatchType.EXACT:
+            routes[(row.event_type.value, row.dag_id)].append(row.id)
+        elif row.match_type is not None:
+            selectors.append([row.id, row.event_type.value, row.match_type.value, row.dag_id])
+
+    route_entries = []
+    for (event_type, dag_id), ids in routes.items():
+        record = _json([event_type, dag_id, ids])
+        route_entries.append((_route_hash(event_type, dag_id), len(records), len(record)))
+        records += record
+    route_entries.sort()
+
+    sections = [_json(channels), _json(templates), _json(selectors)]
+    offset = _HEADER.size + sum(len(section) for section in sections)
+    # Entries hold absolute offsets of their records, which follow the entry tables
+    records_start = offset + _ENTRY.size * (len(by_id) + len(route_entries))
+    for entries in (by_id, route_entries):
+        sections.append(b"".join(
+            _ENTRY.pack(key, records_start + start, length) for key, start, length in entries
+        ))
+    body = b"".join(sections) + bytes(records)
+
+    layout = []
+    offset = _HEADER.size
+    for section in sections:
+        layout += [offset, len(section)]
+        offset += len(section)
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    return _HEADER.pack(MAGIC, SNAPSHOT_VERSION, digest, generation, built_at, *layout) + body
+
+
+class RoutingSnapshot:
+    """One mapped, immutable snapshot file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = _HEADER.unpack_from(self._map, 0)
+        except struct.error as e:
+            self.close()
+            raise ValueError(f"Truncated routing snapshot {path}: {str(e)}")
+        magic, version, self.digest, self.generation, self.built_at = header[:5]
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} routing snapshot")
+        sections = [header[5 + 2 * i:7 + 2 * i] for i in range(5)]
+
+        channels = json.loads(self._section(sections[0]))
+        self._channels = {
+            int(channel_id): RoutedChannel(
+                int(channel_id), name, ChannelType(channel_type), channel_config, is_active
+            )
+            for channel_id, (name, channel_type, channel_config, is_active) in channels.items()
+        }
+        self._templates = [
+            TemplateRow(
+                template_id, name, EventType(event_type), ChannelType(channel_type), dag_id, content
+            )
+            for template_id, name, event_type, channel_type, dag_id, content in json.loads(
+                self._section(sections[1])
+            )
+        ]
+
+        patterns = defaultdict(list)
+        for subscription_id, event_type, match_type, pattern in json.loads(
+            self._section(sections[2])
+        ):
+            if MatchType(match_type) in PATTERN_MATCH_TYPES:
+                patterns[EventType(event_type)].append(
+                    (subscription_id, MatchType(match_type), pattern)
+                )
+        self._matchers = {
+            event_type: PatternMatcher(entries) for event_type, entries in patterns.items()
+        }
+        self._by_id = (sections[3][0], sections[3][1] // _ENTRY.size)
+        self._routes = (sections[4][0], sections[4][1] // _ENTRY.size)
+
+    def _section(self, section: Tuple[int, int]) -> bytes:
+        offset, length = section
+        return self._map[offset:offset + length]
+
+    def close(self) -> None:
+        """Unmap the file; only for snapshots no caller can still be routing from."""
+        self._map.close()
+
+    def same_file(self, stat: os.stat_result) -> bool:
+        return (stat.st_dev, stat.st_ino) == (self._stat.st_dev, self._stat.st_ino)
+
+    def _first_at_or_after(self, table: Tuple[int, int], key: int) -> int:
+        start, count = table
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if _ENTRY.unpack_from(self._map, start + middle * _ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _records(self, table: Tuple[int, int], key: int) -> Iterable[list]:
+        start, count = table
+        index = self._first_at_or_after(table, key)
+        while index < count:
+            entry_key, offset, length = _ENTRY.unpack_from(self._map, start + index * _ENTRY.size)
+            if entry_key != key:
+                break
+            yield json.loads(self._map[offset:offset + length])
+            index += 1
+
+    def subscription(self, subscription_id: int) -> Optional[RoutedSubscription]:
+        """Active subscription by id, if it is in the snapshot."""
+        for record in self._records(self._by_id, subscription_id):
+            (subscription_id, user_id, dag_id, event_type, channel_id, priority, expression,
+             template_id) = record
+            return RoutedSubscription(
+                subscription_id,
+                user_id,
+                dag_id,
+                EventType(event_type),
+                channel_id,
+                NotificationPriority(priority) if priority is not None else None,
+                expression,
+                template_id,
+                self._channels.get(channel_id),
+            )
+        return None
+
+    def match(self, event_type: EventType, dag_id: str) -> Tuple[int, ...]:
+        """Ids of the exact and glob/regex subscriptions for ``event_type`` matching ``dag_id``."""
+        ids: Tuple[int, ...] = ()
+        for record_event_type, record_dag_id, record_ids in self._records(
+            self._routes, _route_hash(event_type.value, dag_id)
+        ):
+            # Different routes may share a hash
+            if record_event_type == event_type.value and record_dag_id == dag_id:
+                ids = tuple(record_ids)
+        matcher = self._matchers.get(event_type)
+        return ids + matcher.match(dag_id) if matcher is not None else ids
+
+    def subscriptions(self, ids: Iterable[int]) -> List[RoutedSubscription]:
+        """Snapshot records for subscription ids; ids not in the snapshot are skipped."""
+        found = (self.subscription(subscription_id) for subscription_id in sorted(set(ids)))
+        return [subscription for subscription in found if subscription is not None]
+
+    def template_rows(self) -> List[TemplateRow]:
+        """Active templates in the snapshot, oldest first (see ``templates.TemplateTable``)."""
+        return list(self._templates)
+
+
+class SharedRouting:
+    """
+    Keeps this process's mapping of the node's routing snapshot current.
+
+    Args:
+        path: Snapshot file
+        refresh_seconds: Age at which the file is rebuilt
+        writer: Whether this process rebuilds the file; readers route from the
+            database while it is stale
+    """
+
+    def __init__(self, path: str, refresh_seconds: Optional[float] = None, writer: bool = True):
+        self.path = path
+        self.refresh_seconds = (
+            config.ROUTING_SNAPSHOT_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self.writer = writer
+        self.snapshot: Optional[RoutingSnapshot] = None
+        self._checked_at: Optional[float] = None
+        self._invalidated_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Rebuild the snapshot on next use unless it was built after this call."""
+        self._invalidated_at = time.time()
+        self._checked_at = None
+
+    def current(self, session: Session) -> Optional[RoutingSnapshot]:
+        """
+        The snapshot to route from, refreshing or remapping it when due.
+
+        Returns None when no snapshot could be built or read; callers then
+        query the database.
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < CHECK_INTERVAL_SECONDS:
+            return self.snapshot
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= CHECK_INTERVAL_SECONDS:
+                try:
+                    self._check(session)
+                except Exception as e:
+                    logger.error(f"Error reading routing snapshot {self.path}: {str(e)}")
+                self._checked_at = now
+        return self.snapshot
+
+    def _check(self, session: Session) -> None:
+        stat = self._stat()
+        if self.writer and self._stale(stat, self.refresh_seconds):
+            self.refresh(session)
+            stat = self._stat()
+        elif not self.writer and self._stale(stat, 2 * self.refresh_seconds):
+            # Left for a writer to rebuild; until then the database is the safe source
+            if self.snapshot is not None:
+                logger.info(f"Routing snapshot {self.path} is out of date, routing from the database")
+            self.snapshot = None
+            return
+        if stat is None or (self.snapshot is not None and self.snapshot.same_file(stat)):
+            return
+        snapshot = RoutingSnapshot(self.path)
+        if self.snapshot is None or snapshot.generation != self.snapshot.generation:
+            logger.info(f"Routing from snapshot generation {snapshot.generation}")
+        self.snapshot = snapshot
+
+    def _stale(self, stat: Optional[os.stat_result], max_age: float) -> bool:
+        # The file's mtime is set to the time its build started reading the database
+        return (
+            stat is None
+            or time.time() - stat.st_mtime >= max_age
+            or stat.st_mtime < self._invalidated_at
+        )
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, session: Session) -> bool:
+        """
+        Rebuild the snapshot file unless another process is doing so.
+
+        Returns:
+            bool: True if this process refreshed the file
+        """
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            if not self._stale(self._stat(), self.refresh_seconds):
+                # Another process refreshed it since we looked
+                return False
+            self._write(session)
+            return True
+
+    def _write(self, session: Session) -> None:
+        # Only the header of the current file is needed, so it is read rather than mapped
+        previous = _read_header(self.path)
+        generation = previous[1] + 1 if previous is not None else 1
+        contents = build_snapshot(session, generation)
+        header = _HEADER.unpack_from(contents, 0)
+        digest, built_at = header[2], header[4]
+        if previous is not None and digest == previous[0]:
+            os.utime(self.path, (built_at, built_at))
+            # Files written by earlier releases were created with the default umask
+            os.chmod(self.path, 0o600)
+            return
+
+        # The snapshot holds channel configs with their secrets, so it is created
+        # readable by the owner only, whatever the umask
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            # Left behind by a crashed process that had the same pid
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        os.utime(temporary, (built_at, built_at))
+        os.replace(temporary, self.path)
+        logger.info(f"Wrote routing snapshot generation {generation} to {self.path}")
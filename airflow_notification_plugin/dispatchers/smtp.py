@@ -0,0 +1,258 @@
+"""Pooled SMTP connections and recipient batching for the email channel.
+
+Opening an SMTP session costs a TCP handshake, EHLO, a STARTTLS negotiation
+and AUTH before the first message, so ``SMTPPool`` keeps up to
+``NOTIFICATION_EMAIL_POOL_SIZE`` authenticated connections per server and
+channel account and reuses them across messages. Connections idle for longer
+than ``NOTIFICATION_EMAIL_IDLE_TIMEOUT`` seconds are closed instead of reused
+(servers drop idle sessions), and a connection the server closed under us is
+replaced and the transaction retried once.
+
+``send_email`` merges concurrent sends of the same message into a single SMTP
+transaction with one ``RCPT TO`` per recipient (up to the channel's
+``max_recipients``), waiting ``NOTIFICATION_EMAIL_BATCH_WAIT_MS`` in the dispatch
+worker for sends to join (see ``batching``). smtplib does not pipeline commands, so batching and
+reuse are what save round trips.
+"""
+
+import logging
+import os
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Tuple
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+from airflow_notification_plugin.dispatchers.handlers import NotificationHandler
+
+logger = logging.getLogger(__name__)
+
+# Servers must accept at least 100 recipients per transaction (RFC 5321)
+DEFAULT_MAX_RECIPIENTS = 100
+# Reply code recorded for recipients the server accepted
+SMTP_OK = 250
+
+
+class SMTPPool:
+    """Authenticated SMTP connections to one server, reused across messages."""
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = True, use_ssl: bool = False,
+                 size: Optional[int] = None, idle_timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.idle_timeout = config.EMAIL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(config.EMAIL_POOL_SIZE if size is None else size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=10, context=ssl.create_default_context()
+            )
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=10)
+            if self.starttls:
+                connection.starttls(context=ssl.create_default_context())
+        connection.ehlo()
+        if self.username:
+            connection.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            now = time.monotonic()
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, released_at = self._idle.pop()
+                if now - released_at < self.idle_timeout:
+                    return connection
+                self._close(connection)
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: Optional[smtplib.SMTP]) -> None:
+        expired = []
+        if connection is not None:
+            now = time.monotonic()
+            with self._lock:
+                self._idle.append((connection, now))
+                # Connections are reused newest first, so the oldest at the left can sit
+                # idle indefinitely under steady load; close them once they time out
+                while self._idle and now - self._idle[0][1] >= self.idle_timeout:
+                    expired.append(self._idle.popleft()[0])
+        self._slots.release()
+        for stale in expired:
+            self._close(stale)
+
+    def send_message(self, message: EmailMessage, recipients: List[str]) -> Dict[str, Tuple]:
+        """
+        Deliver one message to ``recipients`` in a single transaction.
+
+        Returns:
+            Dict[str, Tuple]: Refused recipients with the server's (code, reply)
+
+        Raises:
+            smtplib.SMTPException: If the message could not be sent at all
+        """
+        connection = self._acquire()
+        try:
+            try:
+                refused = connection.send_message(message, to_addrs=recipients)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed an idle session; retry once on a fresh one
+                connection.close()
+                connection = None
+                connection = self._connect()
+                refused = connection.send_message(message, to_addrs=recipients)
+        except smtplib.SMTPRecipientsRefused as e:
+            self._release(connection)
+            return e.recipients
+        except Exception:
+            if connection is not None:
+                connection.close()
+            self._release(None)
+            raise
+        self._release(connection)
+        return refused
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in connections:
+            self._close(connection)
+
+
+def send_email(pool: SMTPPool, sender: str, subject: str, body: str, recipient: str,
+               max_recipients: int = DEFAULT_MAX_RECIPIENTS) -> Tuple[int, str]:
+    """
+    Send ``body`` to ``recipient``, possibly in a transaction shared with other callers.
+
+    Returns:
+        Tuple[int, str]: SMTP reply code and text for this recipient
+
+    Raises:
+        smtplib.SMTPException: If the shared transaction failed
+    """
+    def deliver(recipients: List[str]) -> Dict[str, Tuple[int, str]]:
+        refused = pool.send_message(_build_message(sender, subject, body, recipients), recipients)
+        return {
+            address: _reply(*refused.get(address, (SMTP_OK, b"OK"))) for address in recipients
+        }
+
+    return batcher.send((id(pool), sender, subject, body), recipient, deliver, max_recipients)
+
+
+def _reply(code: int, reply) -> Tuple[int, str]:
+    return code, reply.decode("utf-8", "replace") if isinstance(reply, bytes) else reply
+
+
+def _build_message(sender: str, subject: str, body: str, recipients: List[str]) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender
+    # Recipients of a shared transaction don't see each other's addresses
+    message["To"] = recipients[0] if len(recipients) == 1 else "undisclosed-recipients:;"
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+_pools: Dict[Tuple, SMTPPool] = {}
+_pools_lock = threading.Lock()
+batcher = RecipientBatcher(config.EMAIL_BATCH_WAIT_MS)
+
+
+def get_pool(channel_config: Dict[str, Any]) -> SMTPPool:
+    """Shared connection pool for a channel config's server and account."""
+    key = (
+        channel_config["host"],
+        int(channel_config.get("port", 587)),
+        channel_config.get("username"),
+        channel_config.get("password"),
+        bool(channel_config.get("starttls", True)),
+        bool(channel_config.get("use_ssl", False)),
+    )
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = SMTPPool(*key)
+    return pool
+
+
+def close_pools() -> None:
+    """Close all pooled SMTP connections."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# A forked process opens its own connections instead of sharing the parent's sockets
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pools.clear)
+
+
+class EmailHandler(NotificationHandler):
+    """Handler for email notifications over pooled SMTP connections."""
+
+    channel_type = "email"
+
+    def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
+        """Send notification by email."""
+        try:
+            host = config.get("host")
+            from_addr = config.get("from_addr")
+            recipient = kwargs.get("email") or kwargs.get("user_id")
+
+            if not all([host, from_addr]) or not recipient or "@" not in recipient:
+                logger.error("Email configuration incomplete")
+                return False
+
+            subject = config.get("subject") or f"Airflow notification: {kwargs.get('dag_id')}"
+            code, reply = send_email(
+                get_pool(config),
+                from_addr,
+                subject,
+                message,
+                recipient,
+                max_recipients=int(config.get("max_recipients", DEFAULT_MAX_RECIPIENTS)),
+            )
+            self._record_status_code(code)
+
+            if code == SMTP_OK:
+                logger.info(f"Email sent successfully to {recipient}")
+                return True
+            else:
+                logger.error(f"Email to {recipient} refused: {code} - {reply}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Error sending email: {str(e)}")
+            return False
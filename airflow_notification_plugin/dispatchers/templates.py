@@ -0,0 +1,206 @@
+"""Precomputed template resolution with compiled Jinja2 templates.
+
+The template for a send is the first of:
+
+1. the subscription's own template (``DagSubscription.template_id``)
+2. an active template for the event type and channel type whose ``dag_id`` is the event's DAG
+3. an active template for the event type and channel type without a ``dag_id``
+4. the built-in default for the event type
+
+``TemplateTable`` compiles every active template once and resolves the last two
+steps for every (EventType, ChannelType) pair up front. A lookup is at most
+three dictionary hits and rendering reuses the compiled template. The table is
+rebuilt every ``NOTIFICATION_TEMPLATE_REFRESH_SECONDS``, when
+``notification_template`` changes, or from the routing snapshot when one is in
+use. ``resolution`` lists which template each pair resolves to.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from jinja2 import Template, TemplateError
+from sqlalchemy.orm import Session
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.models import ChannelType, EventType, NotificationTemplate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES = {
+    EventType.TASK_SUCCESS: "✅ Task {{ task_id }} in DAG {{ dag_id }} succeeded at {{ execution_date }}",
+    EventType.TASK_FAILED: "❌ Task {{ task_id }} in DAG {{ dag_id }} failed at {{ execution_date }}",
+    EventType.TASK_RETRY: "🔄 Task {{ task_id }} in DAG {{ dag_id }} is retrying at {{ execution_date }}",
+    EventType.SLA_MISS: "⏰ SLA missed for task {{ task_id }} in DAG {{ dag_id }}",
+    EventType.DAG_SUCCESS: "✅ DAG {{ dag_id }} completed successfully at {{ execution_date }}",
+    EventType.DAG_FAILED: "❌ DAG {{ dag_id }} failed at {{ execution_date }}",
+}
+FALLBACK_TEMPLATE = "Event occurred: {{ dag_id }}"
+
+# Where a resolved template came from, in fallback order
+SOURCE_SUBSCRIPTION = "subscription"
+SOURCE_DAG = "dag"
+SOURCE_CHANNEL = "channel"
+SOURCE_DEFAULT = "default"
+
+
+class TemplateRow(NamedTuple):
+    """Active template as loaded from the database or the routing snapshot."""
+    id: int
+    name: str
+    event_type: EventType
+    channel_type: ChannelType
+    dag_id: Optional[str]
+    template_content: str
+
+
+class ResolvedTemplate(NamedTuple):
+    """A compiled template and where it was resolved from."""
+    name: str
+    source: str
+    template_content: str
+    compiled: Template
+
+    def render(self, context: Mapping[str, Any]) -> Optional[str]:
+        """Render with the event data; None if rendering fails."""
+        try:
+            return self.compiled.render(**context)
+        except TemplateError as e:
+            logger.error(f"Template rendering error in {self.name}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error rendering template {self.name}: {str(e)}")
+        return None
+
+
+def _compile(name: str, source: str, content: str) -> Optional[ResolvedTemplate]:
+    try:
+        return ResolvedTemplate(name, source, content, Template(content))
+    except TemplateError as e:
+        logger.error(f"Ignoring template {name} that does not compile: {str(e)}")
+        return None
+
+
+def load_template_rows(session: Session) -> List[TemplateRow]:
+    """Active templates, oldest first."""
+    return [
+        TemplateRow(*row) for row in session.query(
+            NotificationTemplate.id,
+            NotificationTemplate.name,
+            NotificationTemplate.event_type,
+            NotificationTemplate.channel_type,
+            NotificationTemplate.dag_id,
+            NotificationTemplate.template_content,
+        ).filter(NotificationTemplate.is_active == True).order_by(NotificationTemplate.id)
+    ]
+
+
+class TemplateTable:
+    """Template of every (event type, channel type) pair, with DAG and subscription overrides."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = (
+            config.TEMPLATE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._table: Dict[Tuple[EventType, ChannelType], ResolvedTemplate] = {}
+        self._dag_overrides: Dict[Tuple[EventType, ChannelType, str], ResolvedTemplate] = {}
+        self._by_id: Dict[int, ResolvedTemplate] = {}
+        self._loaded_at: Optional[float] = None
+        self._source: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.load([])
+
+    def invalidate(self) -> None:
+        """Reload the templates on next use."""
+        self._loaded_at = None
+
+    def _due(self, source: Hashable, max_age: float) -> bool:
+        return (
+            self._source != source
+            or self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= max_age
+        )
+
+    def refresh(self, session: Session) -> None:
+        """Reload from the database if the table is due or was built from a snapshot."""
+        if self._due("database", self.refresh_seconds):
+            with self._lock:
+                if self._due("database", self.refresh_seconds):
+                    self.load(load_template_rows(session), source="database")
+
+    def use_snapshot(self, snapshot) -> None:
+        """Rebuild from a routing snapshot's templates when its generation changes."""
+        source = ("snapshot", snapshot.generation)
+        if self._due(source, float("inf")):
+            with self._lock:
+                if self._due(source, float("inf")):
+                    self.load(snapshot.template_rows(), source=source)
+
+    def load(self, rows: Iterable[TemplateRow], source: Hashable = None) -> None:
+        """Compile ``rows`` and precompute every resolution."""
+        defaults = {
+            event_type: _compile(
+                f"default_{event_type.value}",
+                SOURCE_DEFAULT,
+                DEFAULT_TEMPLATES.get(event_type, FALLBACK_TEMPLATE),
+            )
+            for event_type in EventType
+        }
+        by_id = {}
+        generic = {}
+        dag_overrides = {}
+        for row in rows:
+            compiled = _compile(row.name, SOURCE_CHANNEL, row.template_content)
+            if compiled is None:
+                continue
+            by_id[row.id] = compiled._replace(source=SOURCE_SUBSCRIPTION)
+            if row.dag_id:
+                # The oldest template wins when several match
+                dag_overrides.setdefault(
+                    (row.event_type, row.channel_type, row.dag_id),
+                    compiled._replace(source=SOURCE_DAG),
+                )
+            else:
+                generic.setdefault((row.event_type, row.channel_type), compiled)
+
+        self._table = {
+            (event_type, channel_type): generic.get((event_type, channel_type), defaults[event_type])
+            for event_type in EventType
+            for channel_type in ChannelType
+        }
+        self._dag_overrides = dag_overrides
+        self._by_id = by_id
+        self._source = source
+        self._loaded_at = time.monotonic()
+
+    def resolve(
+        self,
+        event_type: EventType,
+        channel_type: ChannelType,
+        dag_id: Optional[str] = None,
+        template_id: Optional[int] = None,
+    ) -> ResolvedTemplate:
+        """Template for a send (see the module docstring for the fallback order)."""
+        if template_id is not None:
+            template = self._by_id.get(template_id)
+            if template is not None:
+                return template
+        if dag_id is not None and self._dag_overrides:
+            template = self._dag_overrides.get((event_type, channel_type, dag_id))
+            if template is not None:
+                return template
+        return self._table[(event_type, channel_type)]
+
+    def resolution(self, dag_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Which template every (event type, channel type) pair resolves to, for ``dag_id``."""
+        return [
+            {
+                "event_type": event_type.value,
+                "channel_type": channel_type.value,
+                "template": template.name,
+                "source": template.source,
+            }
+            for event_type in EventType
+            for channel_type in ChannelType
+            for template in [self.resolve(event_type, channel_type, dag_id)]
+        ]
@@ -0,0 +1,213 @@
+"""Generic webhook delivery: JSON envelopes of events, batched, compressed and signed.
+
+Every request carries an envelope ``{"events": [...], "count": n}``. With the
+channel's ``batch_size`` above 1, events are collected by a ``WebhookBatch``
+and posted when ``batch_size`` events are pending or ``batch_interval_ms``
+has elapsed since the oldest one, whichever comes first, the same way the
+delivery log buffers rows. Envelopes of at least ``gzip_min_bytes`` are sent
+gzip-compressed, and with a ``secret`` each request is signed with
+HMAC-SHA256 over ``"<timestamp>.<body>"`` (the body as sent). Requests to a
+URL share one keep-alive ``requests.Session``.
+
+A batched send only queues the event and returns a ``Future`` of its outcome,
+set when the event's envelope is posted (True) or fails (the exception, e.g.
+``requests.HTTPError``); the dispatcher writes the delivery log row then.
+Pending batches are posted through ``WebhookHandler.flush`` at the end of each
+dispatch (in the dispatch worker, after each batch of events), since Airflow
+task processes exit through ``os._exit`` before timers or ``atexit`` handlers
+run. ``WebhookBatch.flush`` logs every posted and failed envelope.
+"""
+
+import atexit
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from airflow_notification_plugin.dispatchers.handlers import NotificationHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_INTERVAL_MS = 1000
+DEFAULT_GZIP_MIN_BYTES = 1024
+SIGNATURE_HEADER = "X-Notification-Signature"
+TIMESTAMP_HEADER = "X-Notification-Timestamp"
+
+_sessions: Dict[str, requests.Session] = {}
+_batches: Dict[str, "WebhookBatch"] = {}
+_lock = threading.Lock()
+
+
+def _session(url: str) -> requests.Session:
+    session = _sessions.get(url)
+    if session is None:
+        with _lock:
+            session = _sessions.setdefault(url, requests.Session())
+    return session
+
+
+def _reset_after_fork() -> None:
+    # A forked process opens its own connections instead of sharing the parent's
+    # sockets, and leaves the parent's pending events to the parent
+    _sessions.clear()
+    _batches.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def post_events(channel_config: Dict[str, Any], events: List[Dict[str, Any]]) -> requests.Response:
+    """POST one envelope of events to the channel's URL."""
+    body = json.dumps({"events": events, "count": len(events)}, default=str).encode("utf-8")
+    headers = {"Content-Type": "application/json", **channel_config.get("headers", {})}
+
+    gzip_min_bytes = channel_config.get("gzip_min_bytes", DEFAULT_GZIP_MIN_BYTES)
+    if channel_config.get("gzip", True) and len(body) >= gzip_min_bytes:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+
+    secret = channel_config.get("secret")
+    if secret:
+        timestamp = str(int(time.time()))
+        digest = hmac.new(
+            secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, hashlib.sha256
+        ).hexdigest()
+        headers[TIMESTAMP_HEADER] = timestamp
+        headers[SIGNATURE_HEADER] = f"sha256={digest}"
+
+    url = channel_config["url"]
+    return _session(url).post(
+        url, data=body, headers=headers, timeout=channel_config.get("timeout", 10)
+    )
+
+
+class WebhookBatch:
+    """Pending events of one webhook channel, posted by size or age."""
+
+    def __init__(self, channel_config: Dict[str, Any]):
+        self.channel_config = channel_config
+        self.batch_size = int(channel_config["batch_size"])
+        self.batch_interval_ms = float(
+            channel_config.get("batch_interval_ms", DEFAULT_BATCH_INTERVAL_MS)
+        )
+        self._events: List[Tuple[Dict[str, Any], Future]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, event: Dict[str, Any]) -> Future:
+        """Queue an event. Returns a ``Future`` set once its envelope is posted or fails."""
+        outcome = Future()
+        with self._lock:
+            self._events.append((event, outcome))
+            if len(self._events) == 1:
+                self._timer = threading.Timer(self.batch_interval_ms / 1000.0, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            due = len(self._events) >= self.batch_size
+
+        if due:
+            self.flush()
+        return outcome
+
+    def flush(self) -> int:
+        """Post pending events in envelopes of up to ``batch_size``. Returns the number posted."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            posted = 0
+            for start in range(0, len(events), self.batch_size):
+                chunk = events[start:start + self.batch_size]
+                try:
+                    response = post_events(self.channel_config, [event for event, _ in chunk])
+                    if response.status_code < 300:
+                        posted += len(chunk)
+                        logger.info(f"Webhook batch of {len(chunk)} events posted")
+                        for _, outcome in chunk:
+                            outcome.set_result(True)
+                        continue
+                    error = requests.HTTPError(
+                        f"{response.status_code} - {response.text}", response=response
+                    )
+                except Exception as e:
+                    error = e
+                logger.error(f"Webhook batch of {len(chunk)} events failed: {str(error)}")
+                for _, outcome in chunk:
+                    outcome.set_exception(error)
+            return posted
+
+
+def get_batch(channel_config: Dict[str, Any]) -> WebhookBatch:
+    """Shared batch for a webhook channel config."""
+    key = json.dumps(channel_config, sort_keys=True)
+    batch = _batches.get(key)
+    if batch is None:
+        with _lock:
+            batch = _batches.setdefault(key, WebhookBatch(channel_config))
+    return batch
+
+
+def flush_all() -> int:
+    """Post every pending webhook batch."""
+    with _lock:
+        batches = list(_batches.values())
+    return sum(batch.flush() for batch in batches)
+
+
+atexit.register(flush_all)
+
+
+class WebhookHandler(NotificationHandler):
+    """Handler for generic JSON webhooks, optionally batched."""
+
+    channel_type = "webhook"
+
+    def send(self, config: Dict[str, Any], message: str, **kwargs) -> Union[bool, Future]:
+        """POST the event to the webhook, or queue it for the channel's next batch."""
+        try:
+            if not config.get("url"):
+                logger.error("Webhook url not configured")
+                return False
+
+            event = {
+                "event_type": kwargs.get("event_type"),
+                "user_id": kwargs.get("user_id"),
+                "message": message,
+                "data": dict(kwargs.get("event_data") or {}),
+            }
+
+            if int(config.get("batch_size", 1)) > 1:
+                # Queued only: the outcome is set when the batch is posted
+                logger.debug("Webhook notification queued for the next batch")
+                return get_batch(config).add(event)
+
+            response = post_events(config, [event])
+            self._record_status_code(response.status_code)
+
+            if response.status_code < 300:
+                logger.info("Webhook notification sent successfully")
+                return True
+            else:
+                logger.error(f"Webhook notification failed: {response.status_code} - {response.text}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Error sending webhook notification: {str(e)}")
+            return False
+
+    def flush(self) -> None:
+        """Post every pending batch."""
+        flush_all()
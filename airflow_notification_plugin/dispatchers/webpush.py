@@ -0,0 +1,280 @@
+"""Web Push protocol (RFC 8030) with VAPID (RFC 8292) and aes128gcm encryption (RFC 8291).
+
+A PWA registers the JSON of its ``PushSubscription`` (``endpoint`` plus the
+``p256dh`` and ``auth`` keys) as the token of a ``webpush`` platform device. Encrypting a message for it
+takes an ECDH agreement and two HKDF rounds, and authorizing the request takes
+an ES256 signature; both would otherwise dominate the cost of a send. So:
+
+- ``subscription_keys`` caches, per subscription, the parsed keys, a local
+  ECDH key pair and the input keying material derived from them. The local key
+  pair is rotated every ``NOTIFICATION_WEBPUSH_KEY_ROTATION_SECONDS``. Each
+  message still gets a fresh random salt, so its content key and nonce are
+  unique; ``encrypt`` costs two HMACs and one AES-GCM pass.
+- ``vapid_authorization`` caches the signed VAPID header per push-service
+  origin and re-signs it long before it expires.
+- requests go through one pooled ``httpx`` client per push-service origin
+  (HTTP/2 when the optional ``h2`` package is installed), run on a shared
+  event loop by ``clients.ClientPool``.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import struct
+import time
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.clients import ClientPool
+from airflow_notification_plugin.dispatchers.handlers import NotificationHandler
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Record size advertised in the aes128gcm header; messages are sent as one record
+RECORD_SIZE = 4096
+# The record holds the plaintext, a one-byte padding delimiter and the 16-byte GCM tag
+MAX_PLAINTEXT_SIZE = RECORD_SIZE - 17
+# VAPID tokens may be valid for at most 24 hours
+VAPID_TOKEN_SECONDS = 12 * 3600
+VAPID_REFRESH_SECONDS = 6 * 3600
+
+
+def _new_client(origin: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=10)
+
+
+_clients = ClientPool("webpush", _new_client)
+
+
+class SubscriptionKeys(NamedTuple):
+    """Parsed push subscription and the cached ECDH material used to encrypt for it."""
+    endpoint: str
+    origin: str
+    local_public_key: bytes
+    ikm: bytes
+
+
+def b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def b64url_encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def _public_bytes(key) -> bytes:
+    return key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+
+
+def _hkdf(salt: bytes, ikm: bytes, info: bytes, length: int) -> bytes:
+    # Single-block HKDF-SHA256 (all lengths used here are <= 32 bytes)
+    prk = hmac.new(salt, ikm, hashlib.sha256).digest()
+    return hmac.new(prk, info + b"\x01", hashlib.sha256).digest()[:length]
+
+
+def subscription_keys(device_token: str) -> SubscriptionKeys:
+    """
+    Keys for a subscription, derived once per key rotation period.
+
+    Raises:
+        ValueError: If the device token is not a push subscription
+    """
+    period = int(time.time() // config.WEBPUSH_KEY_ROTATION_SECONDS)
+    return _subscription_keys(device_token, period)
+
+
+@lru_cache(maxsize=4096)
+def _subscription_keys(device_token: str, period: int) -> SubscriptionKeys:
+    try:
+        subscription = json.loads(device_token)
+        endpoint = subscription["endpoint"]
+        user_public_key = b64url_decode(subscription["keys"]["p256dh"])
+        auth_secret = b64url_decode(subscription["keys"]["auth"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Device token is not a Web Push subscription: {str(e)}")
+
+    user_key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), user_public_key)
+    local_key = ec.generate_private_key(ec.SECP256R1())
+    local_public_key = _public_bytes(local_key)
+    shared_secret = local_key.exchange(ec.ECDH(), user_key)
+    ikm = _hkdf(
+        auth_secret,
+        shared_secret,
+        b"WebPush: info\x00" + user_public_key + local_public_key,
+        32,
+    )
+    parts = urlsplit(endpoint)
+    return SubscriptionKeys(endpoint, f"{parts.scheme}://{parts.netloc}", local_public_key, ikm)
+
+
+def encrypt(keys: SubscriptionKeys, plaintext: bytes) -> bytes:
+    """
+    Encrypt a message as a single aes128gcm record (header included).
+
+    Raises:
+        ValueError: If the message does not fit in one record
+    """
+    if len(plaintext) > MAX_PLAINTEXT_SIZE:
+        raise ValueError(
+            f"Web Push message of {len(plaintext)} bytes exceeds the "
+            f"{MAX_PLAINTEXT_SIZE}-byte record"
+        )
+    salt = os.urandom(16)
+    prk = hmac.new(salt, keys.ikm, hashlib.sha256).digest()
+    cek = hmac.new(prk, b"Content-Encoding: aes128gcm\x00\x01", hashlib.sha256).digest()[:16]
+    nonce = hmac.new(prk, b"Content-Encoding: nonce\x00\x01", hashlib.sha256).digest()[:12]
+    # 0x02 marks the last (only) record
+    ciphertext = AESGCM(cek).encrypt(nonce, plaintext + b"\x02", None)
+    header = salt + struct.pack("!IB", RECORD_SIZE, len(keys.local_public_key))
+    return header + keys.local_public_key + ciphertext
+
+
+def encode_payload(payload: Dict[str, Any]) -> Optional[bytes]:
+    """
+    JSON-encode a push message, cutting its body short to fit in one record.
+
+    Returns:
+        The encoded message, or None if it does not fit even with an empty body
+    """
+    encoded = json.dumps(payload).encode("utf-8")
+    if len(encoded) <= MAX_PLAINTEXT_SIZE:
+        return encoded
+
+    def cut(length: int) -> bytes:
+        return json.dumps({**payload, "body": body[:length] + "\u2026"}).encode("utf-8")
+
+    body = payload.get("body") or ""
+    if len(cut(0)) > MAX_PLAINTEXT_SIZE:
+        return None
+    logger.warning(
+        f"Web Push message is {len(encoded) - MAX_PLAINTEXT_SIZE} bytes over the "
+        f"{RECORD_SIZE}-byte record, cutting its body short"
+    )
+    # Escaping makes a character take 1 to 12 bytes, so search for the longest prefix that fits
+    low, high = 0, len(body)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(cut(middle)) <= MAX_PLAINTEXT_SIZE:
+            low = middle
+        else:
+            high = middle - 1
+    return cut(low)
+
+
+@lru_cache(maxsize=32)
+def _vapid_key(private_key: str) -> Tuple[ec.EllipticCurvePrivateKey, str]:
+    # PEM, or the raw base64url private scalar most VAPID key generators print
+    if private_key.lstrip().startswith("-----BEGIN"):
+        key = serialization.load_pem_private_key(private_key.encode("utf-8"), password=None)
+    else:
+        key = ec.derive_private_key(
+            int.from_bytes(b64url_decode(private_key.strip()), "big"), ec.SECP256R1()
+        )
+    return key, b64url_encode(_public_bytes(key))
+
+
+def vapid_authorization(origin: str, private_key: str, subject: str) -> str:
+    """``Authorization`` header value for a push-service origin, signed once per period."""
+    period = int(time.time() // VAPID_REFRESH_SECONDS)
+    return _vapid_authorization(origin, private_key, subject, period)
+
+
+@lru_cache(maxsize=256)
+def _vapid_authorization(origin: str, private_key: str, subject: str, period: int) -> str:
+    key, public_key = _vapid_key(private_key)
+    token = jwt.encode(
+        {"aud": origin, "exp": int(time.time()) + VAPID_TOKEN_SECONDS, "sub": subject},
+        key,
+        algorithm="ES256",
+    )
+    return f"vapid t={token}, k={public_key}"
+
+
+def close_clients() -> None:
+    """Close all pooled push-service connections."""
+    _clients.close()
+
+
+class WebPushHandler(NotificationHandler):
+    """Handler for Web Push notifications to PWA devices (VAPID, aes128gcm)."""
+
+    channel_type = "webpush"
+    # Push services answer 404 or 410 for expired subscriptions
+    device_gone_status_codes = frozenset({404, 410})
+
+    def send(self, config: Dict[str, Any], message: str, **kwargs) -> bool:
+        """Send an encrypted push message to a PWA's push subscription."""
+        try:
+            device_token = kwargs.get("device_token")
+            vapid_private_key = config.get("vapid_private_key")
+            vapid_subject = config.get("vapid_subject")
+
+            if not all([device_token, vapid_private_key, vapid_subject]):
+                logger.error("Web Push configuration incomplete")
+                return False
+
+            keys = subscription_keys(device_token)
+            payload = {
+                "title": kwargs.get("title", "Airflow Notification"),
+                "body": message,
+                "data": kwargs.get("data", {}),
+            }
+
+            content = encode_payload(payload)
+            if content is None:
+                logger.error(
+                    f"Web Push message data does not fit in a {RECORD_SIZE}-byte record, not sending"
+                )
+                return False
+
+            headers = {
+                "Authorization": vapid_authorization(
+                    keys.origin, vapid_private_key, vapid_subject
+                ),
+                "Content-Encoding": "aes128gcm",
+                "Content-Type": "application/octet-stream",
+                "TTL": str(config.get("ttl", 86400)),
+                "Urgency": config.get("urgency", "high"),
+            }
+
+            response = _clients.request(
+                keys.origin,
+                "POST",
+                keys.endpoint,
+                content=encrypt(keys, content),
+                headers=headers,
+            )
+            self._record_status_code(response.status_code)
+
+            if response.status_code in [200, 201, 202]:
+                logger.info("Web Push notification sent successfully")
+                return True
+            elif response.status_code in self.device_gone_status_codes:
+                logger.warning(f"Web Push subscription expired: {response.status_code}")
+                return False
+            else:
+                logger.error(f"Web Push failed: {response.status_code} - {response.text}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Error sending Web Push notification: {str(e)}")
+            return False
@@ -0,0 +1,294 @@
+"""Compact, immutable event representation with a versioned binary encoding.
+
+``NotificationEvent`` replaces the loose dicts built by the listeners. It
+stores dates as pendulum datetimes, the type Airflow hands the listeners,
+instead of strings (dates given as strings or stdlib datetimes are converted,
+and so are dates decoded from the sidecar socket or the outbox, so an event
+renders the same whichever way it travelled), interns the strings that repeat
+across events (DAG and task ids, states, hostnames) and uses ``__slots__``, so
+queued events stay small. It is also a read-only ``Mapping`` whose items match
+the dicts the listeners used to build (dates rendered with ``str()``),
+so ``template.render(**event)``, ``event.get("dag_id")`` and existing templates
+keep working unchanged.
+
+``encode_event``/``decode_event`` turn an event type and event into a compact
+struct-based byte string (used for the sidecar socket and for pickling
+between worker processes). The first byte is the format version so the
+encoding can evolve without breaking mixed-version deployments. Strings
+longer than 65535 bytes are truncated at the last whole UTF-8 character.
+"""
+
+import calendar
+import struct
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import pendulum
+
+from airflow_notification_plugin.models import EventType
+
+ENCODING_VERSION = 1
+
+_STR, _INT, _FLOAT, _DATE, _BOOL = range(5)
+
+# (field, type, interned) in encoding order; never reorder within a version
+FIELDS = (
+    ("dag_id", _STR, True),
+    ("task_id", _STR, True),
+    ("run_id", _STR, False),
+    ("map_index", _INT, False),
+    ("execution_date", _DATE, False),
+    ("state", _STR, True),
+    ("try_number", _INT, False),
+    ("max_tries", _INT, False),
+    ("start_date", _DATE, False),
+    ("end_date", _DATE, False),
+    ("duration", _FLOAT, False),
+    ("hostname", _STR, True),
+    ("log_url", _STR, False),
+    ("external_trigger", _BOOL, False),
+)
+FIELD_NAMES = tuple(name for name, _, _ in FIELDS)
+
+# Keys of the mapping view, as produced by _extract_task_event_data / _extract_dag_event_data
+TASK_KEYS = (
+    "dag_id", "task_id", "run_id", "map_index", "execution_date", "state", "try_number",
+    "max_tries", "start_date", "end_date", "duration", "hostname", "log_url",
+)
+DAG_KEYS = (
+    "dag_id", "run_id", "execution_date", "state", "start_date", "end_date", "external_trigger",
+)
+
+_KINDS = ("task", "dag")
+_EVENT_TYPES = tuple(EventType)
+_NO_EVENT_TYPE = 255
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_HEADER = struct.Struct("!BBBH")  # version, event type, kind, presence bitmap
+_LENGTH = struct.Struct("!H")
+_MAX_STR_BYTES = 0xFFFF
+_VALUE = {
+    _INT: struct.Struct("!q"),
+    _FLOAT: struct.Struct("!d"),
+    _DATE: struct.Struct("!q"),  # microseconds since the epoch, UTC
+    _BOOL: struct.Struct("!?"),
+}
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, pendulum.DateTime):
+        return value
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    # Naive datetimes are taken as UTC, as Airflow stores them
+    return pendulum.instance(value)
+
+
+def _encode_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    if len(raw) > _MAX_STR_BYTES:
+        # Drop the partial character the cut may leave at the end
+        raw = raw[:_MAX_STR_BYTES].decode("utf-8", "ignore").encode("utf-8")
+    return raw
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # Integer arithmetic on the UTC fields: pendulum's subtraction yields an Interval
+    return calendar.timegm(value.utctimetuple()) * 1000000 + value.microsecond
+
+
+def _plain(value: Any) -> Any:
+    # Airflow state enums are str subclasses; store the plain value
+    return getattr(value, "value", value)
+
+
+class NotificationEvent(Mapping):
+    """Immutable event data for one task or DAG run event."""
+
+    __slots__ = ("kind",) + FIELD_NAMES
+
+    def __init__(self, kind: str = "task", **fields):
+        if kind not in _KINDS:
+            raise ValueError(f"Invalid event kind: {kind}")
+        object.__setattr__(self, "kind", kind)
+        for name, field_type, interned in FIELDS:
+            value = fields.pop(name, None)
+            if value is not None:
+                if field_type == _DATE:
+                    value = _to_datetime(value)
+                elif field_type == _STR:
+                    value = str(_plain(value))
+                    if interned:
+                        value = sys.intern(value)
+            object.__setattr__(self, name, value)
+        if fields:
+            raise TypeError(f"Unknown event fields: {sorted(fields)}")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NotificationEvent is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("NotificationEvent is immutable")
+
+    @classmethod
+    def from_task_instance(cls, task_instance) -> "NotificationEvent":
+        """Build a task event from an Airflow ``TaskInstance``."""
+        return cls(
+            "task",
+            dag_id=task_instance.dag_id,
+            task_id=task_instance.task_id,
+            run_id=getattr(task_instance, "run_id", None),
+            map_index=getattr(task_instance, "map_index", -1),
+            execution_date=task_instance.execution_date,
+            state=task_instance.state,
+            try_number=task_instance.try_number,
+            max_tries=task_instance.max_tries,
+            start_date=task_instance.start_date,
+            end_date=task_instance.end_date,
+            duration=task_instance.duration,
+            hostname=task_instance.hostname,
+            log_url=task_instance.log_url if hasattr(task_instance, "log_url") else None,
+        )
+
+    @classmethod
+    def from_dag_run(cls, dag_run) -> "NotificationEvent":
+        """Build a DAG event from an Airflow ``DagRun``."""
+        return cls(
+            "dag",
+            dag_id=dag_run.dag_id,
+            run_id=dag_run.run_id,
+            execution_date=dag_run.execution_date,
+            state=dag_run.state,
+            start_date=dag_run.start_date,
+            end_date=dag_run.end_date,
+            external_trigger=dag_run.external_trigger,
+        )
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "NotificationEvent":
+        """Build an event from a listener-style dict; unknown keys are dropped."""
+        if isinstance(data, NotificationEvent):
+            return data
+        kind = "task" if "task_id" in data else "dag"
+        return cls(kind, **{name: data[name] for name in FIELD_NAMES if name in data})
+
+    def replace(self, **changes) -> "NotificationEvent":
+        """Return a copy with some fields changed."""
+        fields = {name: getattr(self, name) for name in FIELD_NAMES}
+        fields.update(changes)
+        return NotificationEvent(self.kind, **fields)
+
+    # Mapping view -------------------------------------------------------
+
+    def _keys(self) -> Tuple[str, ...]:
+        return TASK_KEYS if self.kind == "task" else DAG_KEYS
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        value = getattr(self, key)
+        if isinstance(value, datetime):
+            return str(value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A plain dict copy of the mapping view."""
+        return {key: self[key] for key in self._keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, NotificationEvent):
+            return self.kind == other.kind and all(
+                getattr(self, name) == getattr(other, name) for name in FIELD_NAMES
+            )
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"<NotificationEvent(kind='{self.kind}', dag='{self.dag_id}', task='{self.task_id}')>"
+        )
+
+    def __reduce__(self):
+        # Pickle (e.g. to worker processes) through the compact encoding
+        return (_decode_body, (encode_event(None, self),))
+
+
+def encode_event(event_type: Optional[EventType], event: NotificationEvent) -> bytes:
+    """Encode an event type and event into the versioned binary format."""
+    present = 0
+    parts = []
+    for index, (name, field_type, _) in enumerate(FIELDS):
+        value = getattr(event, name)
+        if value is None:
+            continue
+        present |= 1 << index
+        if field_type == _STR:
+            raw = _encode_str(value)
+            parts.append(_LENGTH.pack(len(raw)))
+            parts.append(raw)
+        elif field_type == _DATE:
+            parts.append(_VALUE[_DATE].pack(_to_micros(value)))
+        else:
+            parts.append(_VALUE[field_type].pack(value))
+
+    type_code = _NO_EVENT_TYPE if event_type is None else _EVENT_TYPES.index(event_type)
+    header = _HEADER.pack(ENCODING_VERSION, type_code, _KINDS.index(event.kind), present)
+    return header + b"".join(parts)
+
+
+def decode_event(data: bytes) -> Tuple[Optional[EventType], NotificationEvent]:
+    """
+    Decode bytes produced by ``encode_event``.
+
+    Raises:
+        ValueError: If the data is truncated or uses an unsupported version
+    """
+    try:
+        version, type_code, kind_code, present = _HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise ValueError(f"Truncated event: {str(e)}")
+    if version != ENCODING_VERSION:
+        raise ValueError(f"Unsupported event encoding version: {version}")
+
+    offset = _HEADER.size
+    fields = {}
+    try:
+        for index, (name, field_type, _) in enumerate(FIELDS):
+            if not present & (1 << index):
+                continue
+            if field_type == _STR:
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                if offset + length > len(data):
+                    raise ValueError(f"Malformed event: truncated {name}")
+                fields[name] = data[offset:offset + length].decode("utf-8")
+                offset += length
+            else:
+                codec = _VALUE[field_type]
+                (value,) = codec.unpack_from(data, offset)
+                offset += codec.size
+                if field_type == _DATE:
+                    value = pendulum.instance(_EPOCH + timedelta(microseconds=value))
+                fields[name] = value
+        event_type = None if type_code == _NO_EVENT_TYPE else _EVENT_TYPES[type_code]
+        return event_type, NotificationEvent(_KINDS[kind_code], **fields)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed event: {str(e)}")
+
+
+def _decode_body(data: bytes) -> NotificationEvent:
+    return decode_event(data)[1]
@@ -4,9 +4,14 @@ import logging
 from typing import Optional
 from airflow.listeners import hookimpl
 from airflow.models import TaskInstance, DagRun
+from airflow.utils.state import TaskInstanceState
 
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.events import NotificationEvent
 from airflow_notification_plugin.models import EventType
 from airflow_notification_plugin.dispatchers import dispatcher
+from airflow_notification_plugin.sla import clear_deadline, register_deadline
+from airflow_notification_plugin.transport import flush, publish
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +20,10 @@ logger = logging.getLogger(__name__)
 def on_task_instance_success(previous_state, task_instance: TaskInstance, session):
     """Listener for task success events."""
     try:
+        if config.SLA_TRACKING_ENABLED:
+            clear_deadline(task_instance)
         event_data = _extract_task_event_data(task_instance)
-        dispatcher.dispatch(EventType.TASK_SUCCESS, event_data)
+        _emit(EventType.TASK_SUCCESS, event_data)
     except Exception as e:
         logger.error(f"Error in on_task_instance_success listener: {str(e)}")
 
@@ -25,20 +32,25 @@ def on_task_instance_success(previous_state, task_instance: TaskInstance, sessio
 def on_task_instance_failed(previous_state, task_instance: TaskInstance, session):
     """Listener for task failure events."""
     try:
+        if config.SLA_TRACKING_ENABLED and task_instance.state == TaskInstanceState.FAILED:
+            # No retry follows, so the task can no longer meet its SLA
+            clear_deadline(task_instance)
         event_data = _extract_task_event_data(task_instance)
-        dispatcher.dispatch(EventType.TASK_FAILED, event_data)
+        _emit(EventType.TASK_FAILED, event_data)
     except Exception as e:
         logger.error(f"Error in on_task_instance_failed listener: {str(e)}")
 
 
 @hookimpl
 def on_task_instance_running(previous_state, task_instance: TaskInstance, session):
-    """Listener for task running events (for retry detection)."""
+    """Listener for task running events (for retry detection and SLA deadlines)."""
     try:
+        if config.SLA_TRACKING_ENABLED:
+            register_deadline(task_instance)
         # Check if this is a retry
         if task_instance.try_number > 1:
             event_data = _extract_task_event_data(task_instance)
-            dispatcher.dispatch(EventType.TASK_RETRY, event_data)
+            _emit(EventType.TASK_RETRY, event_data)
     except Exception as e:
         logger.error(f"Error in on_task_instance_running listener: {str(e)}")
 
@@ -48,7 +60,7 @@ def on_dag_run_success(dag_run: DagRun, msg: str):
     """Listener for DAG run success events."""
     try:
         event_data = _extract_dag_event_data(dag_run)
-        dispatcher.dispatch(EventType.DAG_SUCCESS, event_data)
+        _emit(EventType.DAG_SUCCESS, event_data)
     except Exception as e:
         logger.error(f"Error in on_dag_run_success listener: {str(e)}")
 
@@ -58,36 +70,24 @@ def on_dag_run_failed(dag_run: DagRun, msg: str):
     """Listener for DAG run failure events."""
     try:
         event_data = _extract_dag_event_data(dag_run)
-        dispatcher.dispatch(EventType.DAG_FAILED, event_data)
+        _emit(EventType.DAG_FAILED, event_data)
     except Exception as e:
         logger.error(f"Error in on_dag_run_failed listener: {str(e)}")
 
 
-def _extract_task_event_data(task_instance: TaskInstance) -> dict:
+def _emit(event_type: EventType, event_data: NotificationEvent) -> None:
+    """Hand the event to the configured transport, dispatching in-process as a fallback."""
+    if not publish(event_type, event_data):
+        dispatcher.dispatch(event_type, event_data)
+    # Nothing may stay buffered: task processes exit without running atexit handlers
+    flush()
+
+
+def _extract_task_event_data(task_instance: TaskInstance) -> NotificationEvent:
     """Extract event data from a TaskInstance."""
-    return {
-        "dag_id": task_instance.dag_id,
-        "task_id": task_instance.task_id,
-        "execution_date": str(task_instance.execution_date),
-        "state": task_instance.state,
-        "try_number": task_instance.try_number,
-        "max_tries": task_instance.max_tries,
-        "start_date": str(task_instance.start_date) if task_instance.start_date else None,
-        "end_date": str(task_instance.end_date) if task_instance.end_date else None,
-        "duration": task_instance.duration,
-        "hostname": task_instance.hostname,
-        "log_url": task_instance.log_url if hasattr(task_instance, 'log_url') else None,
-    }
-
-
-def _extract_dag_event_data(dag_run: DagRun) -> dict:
+    return NotificationEvent.from_task_instance(task_instance)
+
+
+def _extract_dag_event_data(dag_run: DagRun) -> NotificationEvent:
     """Extract event data from a DagRun."""
-    return {
-        "dag_id": dag_run.dag_id,
-        "run_id": dag_run.run_id,
-        "execution_date": str(dag_run.execution_date),
-        "state": dag_run.state,
-        "start_date": str(dag_run.start_date) if dag_run.start_date else None,
-        "end_date": str(dag_run.end_date) if dag_run.end_date else None,
-        "external_trigger": dag_run.external_trigger,
-    }
+    return NotificationEvent.from_dag_run(dag_run)
@@ -0,0 +1,406 @@
+"""Event-storm load generator and historical replay for capacity planning.
+
+Events are either synthesized (DAG runs with tasks that succeed, retry or
+fail) or replayed from Airflow's ``task_instance`` and ``dag_run`` tables, and
+fed into a ``NotificationDispatcher`` in timestamp order at N× speed. Event
+data has exactly the shape produced by the listeners, so routing and
+templates behave as they would in production.
+
+Run ``python -m airflow_notification_plugin.loadgen --help`` for options.
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+from airflow_notification_plugin.events import NotificationEvent
+from airflow_notification_plugin.models import EventType
+
+logger = logging.getLogger(__name__)
+
+
+class LoadEvent(NamedTuple):
+    """An event to dispatch at a point in (simulated) time."""
+    at: datetime
+    event_type: EventType
+    data: NotificationEvent
+
+
+def _task_event(dag_id, task_id, run_id, execution_date, state, try_number, max_tries,
+                start, end, hostname) -> NotificationEvent:
+    """Build a task event like ``_extract_task_event_data``."""
+    return NotificationEvent(
+        "task",
+        dag_id=dag_id,
+        task_id=task_id,
+        run_id=run_id,
+        map_index=-1,
+        execution_date=execution_date,
+        state=state,
+        try_number=try_number,
+        max_tries=max_tries,
+        start_date=start,
+        end_date=end,
+        duration=(end - start).total_seconds() if start and end else None,
+        hostname=hostname,
+    )
+
+
+def _dag_event(dag_id, run_id, execution_date, state, start, end) -> NotificationEvent:
+    """Build a DAG event like ``_extract_dag_event_data``."""
+    return NotificationEvent(
+        "dag",
+        dag_id=dag_id,
+        run_id=run_id,
+        execution_date=execution_date,
+        state=state,
+        start_date=start,
+        end_date=end,
+        external_trigger=False,
+    )
+
+
+def synthesize_events(
+    dags: int = 20,
+    tasks_per_dag: int = 10,
+    runs_per_dag: int = 1,
+    failure_rate: float = 0.02,
+    retry_rate: float = 0.05,
+    max_tries: int = 2,
+    window_minutes: float = 60.0,
+    backfill: bool = False,
+    dag_prefix: str = "etl_dag",
+    workers: int = 8,
+    seed: Optional[int] = None,
+    start: Optional[datetime] = None,
+) -> List[LoadEvent]:
+    """
+    Synthesize task and DAG events for a set of DAG runs.
+
+    Runs are spread uniformly over ``window_minutes``, or all start at once
+    with ``backfill``. Tasks in a run execute one after another; each try
+    fails with ``retry_rate`` (a retry event follows while tries remain) and a
+    task fails permanently with ``failure_rate``, which fails its DAG run.
+
+    Returns:
+        List[LoadEvent]: Events sorted by time
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    events: List[LoadEvent] = []
+
+    for d in range(dags):
+        dag_id = f"{dag_prefix}_{d:04d}"
+        for r in range(runs_per_dag):
+            offset = 0.0 if backfill else rng.uniform(0, window_minutes * 60)
+            run_start = start + timedelta(seconds=offset)
+            execution_date = start - timedelta(days=runs_per_dag - r)
+            run_id = f"scheduled__{execution_date.isoformat()}"
+            clock = run_start
+            dag_state = "success"
+
+            for t in range(tasks_per_dag):
+                task_id = f"task_{t:03d}"
+                hostname = f"worker-{rng.randrange(workers)}"
+                try_number = 1
+                while True:
+                    task_start = clock
+                    clock = clock + timedelta(seconds=rng.expovariate(1 / 30.0))
+                    if try_number > 1:
+                        events.append(LoadEvent(task_start, EventType.TASK_RETRY, _task_event(
+                            dag_id, task_id, run_id, execution_date, "running",
+                            try_number, max_tries, task_start, None, hostname,
+                        )))
+                    if rng.random() < retry_rate and try_number <= max_tries:
+                        try_number += 1
+                        continue
+                    failed = rng.random() < failure_rate
+                    state = "failed" if failed else "success"
+                    event_type = EventType.TASK_FAILED if failed else EventType.TASK_SUCCESS
+                    events.append(LoadEvent(clock, event_type, _task_event(
+                        dag_id, task_id, run_id, execution_date, state,
+                        try_number, max_tries, task_start, clock, hostname,
+                    )))
+                    break
+                if failed:
+                    dag_state = "failed"
+                    break
+
+            dag_event = EventType.DAG_FAILED if dag_state == "failed" else EventType.DAG_SUCCESS
+            events.append(LoadEvent(clock, dag_event, _dag_event(
+                dag_id, run_id, execution_date, dag_state, run_start, clock
+            )))
+
+    events.sort(key=lambda e: e.at)
+    return events
+
+
+def replay_events(
+    session,
+    since: datetime,
+    until: Optional[datetime] = None,
+    dag_ids: Optional[Iterable[str]] = None,
+) -> List[LoadEvent]:
+    """
+    Rebuild the listener events of finished task instances and DAG runs.
+
+    Only final states survive in the metadata DB, so a task with
+    ``try_number > 1`` contributes one retry event at its start date, followed
+    by its success/failure event at its end date.
+
+    Returns:
+        List[LoadEvent]: Events sorted by time
+    """
+    from airflow.models import DagRun, TaskInstance
+    from airflow_notification_plugin.listeners import (
+        _extract_dag_event_data,
+        _extract_task_event_data,
+    )
+
+    until = until or datetime.now(timezone.utc)
+    task_states = {"success": EventType.TASK_SUCCESS, "failed": EventType.TASK_FAILED}
+    dag_states = {"success": EventType.DAG_SUCCESS, "failed": EventType.DAG_FAILED}
+    events: List[LoadEvent] = []
+
+    task_query = session.query(TaskInstance).filter(
+        TaskInstance.end_date >= since,
+        TaskInstance.end_date < until,
+        TaskInstance.state.in_(list(task_states)),
+    )
+    dag_query = session.query(DagRun).filter(
+        DagRun.end_date >= since,
+        DagRun.end_date < until,
+        DagRun.state.in_(list(dag_states)),
+    )
+    if dag_ids:
+        dag_ids = list(dag_ids)
+        task_query = task_query.filter(TaskInstance.dag_id.in_(dag_ids))
+        dag_query = dag_query.filter(DagRun.dag_id.in_(dag_ids))
+
+    for ti in task_query.yield_per(1000):
+        data = _extract_task_event_data(ti)
+        if ti.try_number and ti.try_number > 1 and ti.start_date:
+            events.append(LoadEvent(ti.start_date, EventType.TASK_RETRY, data.replace(state="running")))
+        events.append(LoadEvent(ti.end_date, task_states[ti.state], data))
+
+    for dag_run in dag_query.yield_per(1000):
+        events.append(LoadEvent(dag_run.end_date, dag_states[dag_run.state], _extract_dag_event_data(dag_run)))
+
+    events.sort(key=lambda e: e.at)
+    return events
+
+
+class LoadReport:
+    """Aggregates routing fan-out and per-channel notification rates."""
+
+    def __init__(self, rate_limit_per_minute: int):
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.events = Counter()
+        self.fanout: List[int] = []
+        self.deliveries = Counter()
+        self.failures = Counter()
+        self.per_minute = defaultdict(Counter)
+        self.dispatch_seconds = 0.0
+
+    def record_event(self, event_type: EventType, subscriptions: int) -> None:
+        self.events[event_type.value] += 1
+        self.fanout.append(subscriptions)
+
+    def record_delivery(self, channel: str, at: datetime, success: bool) -> None:
+        self.deliveries[channel] += 1
+        if not success:
+            self.failures[channel] += 1
+        self.per_minute[channel][at.replace(second=0, microsecond=0)] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        total_events = sum(self.events.values())
+        channels = {}
+        for channel, minutes in self.per_minute.items():
+            over = {m: n for m, n in minutes.items() if n > self.rate_limit_per_minute}
+            channels[channel] = {
+                "notifications": self.deliveries[channel],
+                "failures": self.failures[channel],
+                "peak_per_minute": max(minutes.values()),
+                "avg_per_active_minute": round(self.deliveries[channel] / len(minutes), 2),
+                "minutes_over_rate_limit": len(over),
+                "notifications_over_rate_limit": sum(n - self.rate_limit_per_minute for n in over.values()),
+            }
+        return {
+            "events": total_events,
+            "events_by_type": dict(self.events),
+            "fanout": {
+                "routed_events": sum(1 for n in self.fanout if n),
+                "avg_subscriptions_per_event": round(sum(self.fanout) / total_events, 3) if total_events else 0,
+                "max_subscriptions_per_event": max(self.fanout, default=0),
+            },
+            "notifications": sum(self.deliveries.values()),
+            "rate_limit_per_minute": self.rate_limit_per_minute,
+            "channels": channels,
+            "dispatch_seconds": round(self.dispatch_seconds, 3),
+            "events_per_second": round(total_events / self.dispatch_seconds, 2) if self.dispatch_seconds else None,
+        }
+
+
+class LoadTestDispatcher(NotificationDispatcher):
+    """Dispatcher that reports fan-out and deliveries; ``dry_run`` skips handler sends."""
+
+    def __init__(self, report: LoadReport, dry_run: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.report = report
+        self.dry_run = dry_run
+        self.current_time: Optional[datetime] = None
+        self._current_fanout = 0
+
+    def dispatch(self, event_type: EventType, event_data: Mapping[str, Any]) -> None:
+        self._current_fanout = 0
+        super().dispatch(event_type, event_data)
+        self.report.record_event(event_type, self._current_fanout)
+
+    def _get_subscriptions(self, session, event_type, dag_id):
+        subscriptions = super()._get_subscriptions(session, event_type, dag_id)
+        self._current_fanout = len(subscriptions)
+        return subscriptions
+
+    def _deliver(self, handler, config, message, kwargs, subscription, event_type, event_data,
+                 device_id=None, attempt=1):
+        if self.dry_run:
+            success = True
+        else:
+            success = super()._deliver(
+                handler, config, message, kwargs, subscription, event_type, event_data, device_id,
+                attempt,
+            )
+        channel = subscription.channel
+        self.report.record_delivery(f"{channel.channel_type.value}:{channel.name}", self.current_time, success)
+        return success
+
+
+def run_load(events: Iterable[LoadEvent], dispatcher: LoadTestDispatcher, speed: float = 0.0) -> LoadReport:
+    """
+    Feed events to the dispatcher in order.
+
+    With ``speed`` > 0 the gaps between event timestamps are replayed divided
+    by ``speed`` (e.g. 60 replays an hour in a minute); 0 dispatches as fast
+    as possible.
+    """
+    first_at = None
+    wall_start = time.monotonic()
+
+    for event in events:
+        if speed > 0:
+            if first_at is None:
+                first_at = event.at
+            due = wall_start + (event.at - first_at).total_seconds() / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        dispatcher.current_time = event.at
+        started = time.perf_counter()
+        dispatcher.dispatch(event.event_type, event.data)
+        dispatcher.report.dispatch_seconds += time.perf_counter() - started
+
+    return dispatcher.report
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _format_report(summary: Dict[str, Any]) -> str:
+    lines = [
+        f"Events: {summary['events']} {summary['events_by_type']}",
+        f"Routed events: {summary['fanout']['routed_events']}, "
+        f"avg fan-out {summary['fanout']['avg_subscriptions_per_event']}, "
+        f"max fan-out {summary['fanout']['max_subscriptions_per_event']}",
+        f"Notifications: {summary['notifications']} "
+        f"(rate limit {summary['rate_limit_per_minute']}/min per channel)",
+    ]
+    for channel, stats in sorted(summary["channels"].items()):
+        lines.append(
+            f"  {channel}: {stats['notifications']} sent, {stats['failures']} failed, "
+            f"peak {stats['peak_per_minute']}/min, avg {stats['avg_per_active_minute']}/min, "
+            f"{stats['minutes_over_rate_limit']} min over limit "
+            f"({stats['notifications_over_rate_limit']} excess)"
+        )
+    lines.append(
+        f"Dispatch time: {summary['dispatch_seconds']}s ({summary['events_per_second']} events/s)"
+    )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m airflow_notification_plugin.loadgen",
+        description="Generate or replay Airflow events through the notification dispatcher.",
+    )
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Replay speed multiplier; 0 dispatches as fast as possible (default)")
+    parser.add_argument("--send", action="store_true",
+                        help="Actually call channel handlers (default is a dry run)")
+    parser.add_argument("--rate-limit", type=int, default=config.MAX_NOTIFICATIONS_PER_MINUTE,
+                        help="Per-channel notifications/minute used to project violations")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    synth = sub.add_parser("synthesize", help="Synthesize an event storm")
+    synth.add_argument("--dags", type=int, default=20)
+    synth.add_argument("--tasks-per-dag", type=int, default=10)
+    synth.add_argument("--runs-per-dag", type=int, default=1)
+    synth.add_argument("--failure-rate", type=float, default=0.02)
+    synth.add_argument("--retry-rate", type=float, default=0.05)
+    synth.add_argument("--max-tries", type=int, default=2)
+    synth.add_argument("--window-minutes", type=float, default=60.0)
+    synth.add_argument("--backfill", action="store_true", help="Start every run at the same time")
+    synth.add_argument("--dag-prefix", default="etl_dag",
+                       help="DAG ids are <prefix>_0000, <prefix>_0001, ...")
+    synth.add_argument("--seed", type=int)
+
+    replay = sub.add_parser("replay", help="Replay historical task_instance/dag_run rows")
+    replay.add_argument("--since", type=_parse_datetime, required=True, help="ISO start time")
+    replay.add_argument("--until", type=_parse_datetime, help="ISO end time (default: now)")
+    replay.add_argument("--dag-id", action="append", dest="dag_ids", help="Limit to DAG id (repeatable)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=config.LOG_LEVEL)
+
+    if args.mode == "synthesize":
+        events = synthesize_events(
+            dags=args.dags,
+            tasks_per_dag=args.tasks_per_dag,
+            runs_per_dag=args.runs_per_dag,
+            failure_rate=args.failure_rate,
+            retry_rate=args.retry_rate,
+            max_tries=args.max_tries,
+            window_minutes=args.window_minutes,
+            backfill=args.backfill,
+            dag_prefix=args.dag_prefix,
+            seed=args.seed,
+        )
+    else:
+        from airflow.settings import Session as AirflowSession
+
+        session = AirflowSession()
+        try:
+            events = replay_events(session, args.since, args.until, args.dag_ids)
+        finally:
+            session.close()
+
+    report = LoadReport(args.rate_limit)
+    dispatcher = LoadTestDispatcher(report, dry_run=not args.send)
+    run_load(events, dispatcher, speed=args.speed)
+
+    summary = report.summary()
+    print(json.dumps(summary, indent=2, default=str) if args.json else _format_report(summary))
+    return 0
@@ -0,0 +1,7 @@
+"""Entry point for ``python -m airflow_notification_plugin.loadgen``."""
+
+import sys
+
+from airflow_notification_plugin.loadgen import main
+
+sys.exit(main())
@@ -0,0 +1,293 @@
+"""Prometheus metrics for the notification dispatch pipeline.
+
+Metrics are only collected when ``prometheus_client`` is installed; otherwise
+every metric is a no-op so the dispatch path never depends on it.
+
+Airflow runs tasks in many processes, so when ``PROMETHEUS_MULTIPROC_DIR`` is
+set ``prometheus_client`` writes samples to per-process files in that directory
+and ``get_registry()`` aggregates them with a ``MultiProcessCollector``. The
+webserver serves the aggregate on the ``/metrics`` blueprint endpoint, and
+workers without an HTTP server can use the textfile exporter instead, which
+writes the same aggregate and therefore also needs ``PROMETHEUS_MULTIPROC_DIR``.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from airflow_notification_plugin.config import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+        write_to_textfile,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without the extra installed
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Latency buckets in seconds, from a cached template render up to a slow HTTP timeout
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def _counter(name: str, documentation: str, labelnames):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, documentation, labelnames)
+
+
+def _histogram(name: str, documentation: str, labelnames):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Histogram(name, documentation, labelnames, buckets=LATENCY_BUCKETS)
+
+
+def _gauge(name: str, documentation: str, labelnames):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    # Summed across live processes in multiprocess mode
+    return Gauge(name, documentation, labelnames, multiprocess_mode="livesum")
+
+
+# NotificationDispatcher.dispatch
+DISPATCH_TOTAL = _counter(
+    "notification_dispatch_total",
+    "Events passed to the dispatcher",
+    ["event_type", "outcome"],
+)
+DISPATCH_SECONDS = _histogram(
+    "notification_dispatch_seconds",
+    "Time to dispatch one event to all of its subscriptions",
+    ["event_type", "outcome"],
+)
+
+# DagSubscription lookup inside dispatch
+SUBSCRIPTION_QUERY_SECONDS = _histogram(
+    "notification_subscription_query_seconds",
+    "Time to resolve the subscriptions of one event",
+    ["event_type", "outcome"],
+)
+
+# Subscriptions skipped by their filter_expression
+FILTERED_TOTAL = _counter(
+    "notification_filtered_total",
+    "Subscriptions whose filter expression rejected the event",
+    ["event_type"],
+)
+
+# Template rendering inside _send_notification
+RENDER_SECONDS = _histogram(
+    "notification_render_seconds",
+    "Time to resolve and render a notification template",
+    ["event_type", "channel_type", "outcome"],
+)
+
+# NotificationDispatcher._send_notification
+NOTIFICATION_TOTAL = _counter(
+    "notification_send_total",
+    "Notifications processed per subscription",
+    ["event_type", "channel_type", "outcome"],
+)
+NOTIFICATION_SECONDS = _histogram(
+    "notification_send_seconds",
+    "Time to process one subscription, including rendering and all handler calls",
+    ["event_type", "channel_type", "outcome"],
+)
+
+# NotificationHandler.send
+HANDLER_TOTAL = _counter(
+    "notification_handler_send_total",
+    "Calls to a channel handler",
+    ["channel_type", "outcome"],
+)
+HANDLER_SECONDS = _histogram(
+    "notification_handler_send_seconds",
+    "Time spent in a single channel handler call",
+    ["channel_type", "outcome"],
+)
+
+
+# Priority lanes of the dispatch worker (dispatchers.lanes)
+LANE_DEPTH = _gauge(
+    "notification_lane_depth",
+    "Sends waiting in each priority lane",
+    ["lane"],
+)
+LANE_WAIT_SECONDS = _histogram(
+    "notification_lane_wait_seconds",
+    "Time a send waited in its priority lane",
+    ["lane"],
+)
+
+SHED_TOTAL = _counter(
+    "notification_shed_total",
+    "Events or queued sends shed because the lanes were full",
+    ["event_type", "reason"],
+)
+
+
+class Timer:
+    """Measures elapsed time; ``outcome`` may be set before the block exits."""
+
+    __slots__ = ("started", "outcome")
+
+    def __init__(self, outcome: str):
+        self.started = time.perf_counter()
+        self.outcome = outcome
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timed(counter, histogram, outcome: str = "ok", **labels):
+    """
+    Count and time a block of code.
+
+    The yielded ``Timer`` lets the block change the outcome label; an exception
+    escaping the block is recorded with outcome ``error`` and re-raised.
+    """
+    timer = Timer(outcome)
+    try:
+        yield timer
+    except Exception:
+        timer.outcome = "error"
+        raise
+    finally:
+        elapsed = timer.elapsed()
+        if counter is not None:
+            counter.labels(outcome=timer.outcome, **labels).inc()
+        if histogram is not None:
+            histogram.labels(outcome=timer.outcome, **labels).observe(elapsed)
+
+
+def get_registry():
+    """Return the registry to expose, aggregating per-process files in multiprocess mode."""
+    if not PROMETHEUS_AVAILABLE:
+        return None
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def generate_metrics() -> bytes:
+    """Render all metrics in the Prometheus text exposition format."""
+    registry = get_registry()
+    if registry is None:
+        return b""
+    return generate_latest(registry)
+
+
+def write_textfile(path: Optional[str] = None) -> bool:
+    """
+    Write the current metrics to a file for node_exporter's textfile collector.
+
+    ``write_to_textfile`` writes to a temporary file and renames it, so the
+    collector never reads a partial file.
+    """
+    path = path or config.METRICS_TEXTFILE_PATH
+    registry = get_registry()
+    if not path or registry is None:
+        return False
+    try:
+        write_to_textfile(path, registry)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing metrics textfile {path}: {str(e)}")
+        return False
+
+
+class TextfileExporter:
+    """Background thread that periodically rewrites the metrics textfile."""
+
+    def __init__(self, path: Optional[str] = None, interval_seconds: Optional[int] = None):
+        self.path = path or config.METRICS_TEXTFILE_PATH
+        self.interval_seconds = interval_seconds or config.METRICS_TEXTFILE_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or not self.path:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="notification-metrics-textfile", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds)
+            self._thread = None
+        write_textfile(self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            write_textfile(self.path)
+
+
+_textfile_exporter: Optional[TextfileExporter] = None
+_textfile_checked = False
+_textfile_lock = threading.Lock()
+
+
+def ensure_textfile_exporter() -> None:
+    """
+    Start the process-wide textfile exporter once, if a textfile path is configured.
+
+    Every process rewrites the same file, so it must hold the aggregate of all
+    processes: the exporter only starts with ``PROMETHEUS_MULTIPROC_DIR`` set.
+    Otherwise each write would replace the other processes' counts with this
+    process's own.
+    """
+    global _textfile_exporter, _textfile_checked
+    if _textfile_checked or not config.METRICS_TEXTFILE_PATH:
+        return
+    with _textfile_lock:
+        if _textfile_checked:
+            return
+        _textfile_checked = True
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            logger.warning(
+                "NOTIFICATION_METRICS_TEXTFILE needs PROMETHEUS_MULTIPROC_DIR to aggregate "
+                "the metrics of all processes; not writing the textfile"
+            )
+            return
+        _textfile_exporter = TextfileExporter()
+        _textfile_exporter.start()
@@ -1,7 +1,10 @@
 """Database models for the notification plugin."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import (
+    DDL, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Float, Index,
+    UniqueConstraint, event
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -17,6 +20,11 @@ class ChannelType(enum.Enum):
     YOUDU = "youdu"
     FCM = "fcm"
     APNS = "apns"
+    WEBPUSH = "webpush"
+    EMAIL = "email"
+    WEBHOOK = "webhook"
+    # Delivered by the third-party handler named in the channel config's "handler" key
+    CUSTOM = "custom"
 
 
 class EventType(enum.Enum):
@@ -31,9 +39,33 @@ class EventType(enum.Enum):
 
 class PlatformType(enum.Enum):
     """Client platform types."""
-    PWA = "pwa"
+    PWA = "pwa"  # FCM registration token of a PWA
     IOS = "ios"
     ANDROID = "android"
+    WEBPUSH = "webpush"  # Web Push subscription (PushSubscription JSON) of a PWA
+
+
+class MatchType(enum.Enum):
+    """How a subscription's dag_id is matched against DAG ids."""
+    EXACT = "exact"
+    GLOB = "glob"
+    REGEX = "regex"  # anchored: the whole DAG id must match
+    TAG = "tag"  # DAGs carrying this tag
+    OWNER = "owner"  # DAGs with this owner
+
+
+class NotificationPriority(enum.Enum):
+    """Priority lanes for queued sends, highest first."""
+    CRITICAL = "critical"
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class DeliveryStatus(enum.Enum):
+    """Outcome of a single delivery attempt."""
+    SENT = "sent"
+    FAILED = "failed"
 
 
 class NotificationChannel(Base):
@@ -60,12 +92,26 @@ class DagSubscription(Base):
     """Model for DAG event subscriptions."""
     
     __tablename__ = "dag_subscription"
+    # varchar_pattern_ops (PostgreSQL) lets the admin views' prefix search use the indexes
+    __table_args__ = (
+        Index("ix_dag_subscription_user_id", "user_id",
+              postgresql_ops={"user_id": "varchar_pattern_ops"}),
+        Index("ix_dag_subscription_dag_id", "dag_id",
+              postgresql_ops={"dag_id": "varchar_pattern_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String(100), nullable=False)
-    dag_id = Column(String(250), nullable=False)
+    dag_id = Column(String(250), nullable=False)  # DAG id, pattern, tag or owner per match_type
+    match_type = Column(
+        Enum(MatchType), nullable=False, default=MatchType.EXACT, server_default=MatchType.EXACT.name
+    )
     event_type = Column(Enum(EventType), nullable=False)
     channel_id = Column(Integer, ForeignKey("notification_channel.id"), nullable=False)
+    priority = Column(Enum(NotificationPriority), nullable=True)  # None: the event type's default
+    filter_expression = Column(Text, nullable=True)  # see dispatchers.filters
+    # Template overriding the event/channel (and DAG) template; see dispatchers.templates
+    template_id = Column(Integer, ForeignKey("notification_template.id"), nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -86,6 +132,7 @@ class NotificationTemplate(Base):
     name = Column(String(100), nullable=False, unique=True)
     event_type = Column(Enum(EventType), nullable=False)
     channel_type = Column(Enum(ChannelType), nullable=False)
+    dag_id = Column(String(250), nullable=True)  # None: all DAGs; else overrides for this DAG
     template_content = Column(Text, nullable=False)  # Jinja2 template
     description = Column(Text)
     is_active = Column(Boolean, default=True)
@@ -100,6 +147,10 @@ class DeviceRegistration(Base):
     """Model for client device registrations."""
     
     __tablename__ = "device_registration"
+    __table_args__ = (
+        Index("ix_device_registration_user_id", "user_id",
+              postgresql_ops={"user_id": "varchar_pattern_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     device_token = Column(String(500), nullable=False, unique=True)
@@ -112,3 +163,134 @@ class DeviceRegistration(Base):
     
     def __repr__(self):
         return f"<DeviceRegistration(user='{self.user_id}', platform='{self.platform_type.value}')>"
+
+
+# The unique index on device_token already serves prefix search elsewhere; PostgreSQL
+# needs a pattern_ops index for LIKE 'prefix%' unless the database uses the C collation
+event.listen(
+    DeviceRegistration.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_device_registration_device_token_prefix "
+        "ON device_registration (device_token varchar_pattern_ops)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+class NotificationDelivery(Base):
+    """Model for the delivery log, one row per delivery attempt.
+
+    Rows are written in batches by ``DeliveryLogBuffer``; subscription, channel
+    and device ids are plain columns (not foreign keys) so that deleting a
+    subscription never blocks on, or cascades into, its delivery history.
+    """
+    
+    __tablename__ = "notification_delivery"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(Enum(EventType), nullable=False)
+    dag_id = Column(String(250), nullable=False)
+    task_id = Column(String(250))
+    run_id = Column(String(250))
+    execution_date = Column(String(50))
+    subscription_id = Column(Integer)
+    channel_id = Column(Integer)
+    channel_type = Column(Enum(ChannelType))
+    device_id = Column(Integer)
+    status = Column(Enum(DeliveryStatus), nullable=False)
+    http_status = Column(Integer)
+    latency_ms = Column(Float)
+    attempt = Column(Integer, default=1)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<NotificationDelivery(dag='{self.dag_id}', status='{self.status.value}')>"
+
+
+class UserContact(Base):
+    """Model for the contact details of a subscription user_id.
+    
+    Channels that address people rather than devices or webhooks (SMS,
+    email, Youdu) look the subscriber up here by ``user_id``.
+    """
+    
+    __tablename__ = "notification_user_contact"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(100), nullable=False, unique=True)
+    phone_number = Column(String(50))
+    email = Column(String(255))
+    youdu_id = Column(String(100))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserContact(user='{self.user_id}')>"
+
+
+class NotificationOutbox(Base):
+    """Model for events queued for a standalone dispatch worker.
+
+    Listeners insert one row per event when ``NOTIFICATION_TRANSPORT=outbox``;
+    workers claim rows by setting ``claimed_at``/``claimed_by`` and delete them
+    once dispatched. A claim older than the lease is treated as abandoned;
+    ``attempts`` counts the claims, so the delivery log shows resends.
+    """
+    
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(Enum(EventType), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON-encoded event data
+    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, index=True)
+    claimed_by = Column(String(250))
+    attempts = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, event='{self.event_type.value}')>"
+
+
+class SlaDeadline(Base):
+    """Model for outstanding task SLA deadlines.
+
+    Listeners insert a row when a task with an ``sla`` starts running and
+    delete it when the task succeeds; the SLA tracker emits ``SLA_MISS`` for
+    rows still present at their deadline and deletes them.
+    """
+    
+    __tablename__ = "notification_sla_deadline"
+    __table_args__ = (
+        UniqueConstraint("dag_id", "task_id", "run_id", "map_index", name="uq_sla_deadline_ti"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dag_id = Column(String(250), nullable=False)
+    task_id = Column(String(250), nullable=False)
+    run_id = Column(String(250), nullable=False)
+    map_index = Column(Integer, nullable=False, default=-1)
+    execution_date = Column(DateTime)
+    deadline = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<SlaDeadline(dag='{self.dag_id}', task='{self.task_id}', deadline='{self.deadline}')>"
+
+
+class NotificationMeta(Base):
+    """Model for per-table change generations.
+
+    Admin edits bump the generation of the table they changed (and of the
+    ``*`` row, so pollers read a single row); dispatchers invalidate their
+    caches of a table when its generation moves. See ``changes``.
+    """
+    
+    __tablename__ = "notification_meta"
+    
+    table_name = Column(String(100), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<NotificationMeta(table='{self.table_name}', generation={self.generation})>"
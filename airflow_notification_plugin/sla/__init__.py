@@ -0,0 +1,304 @@
+"""Task SLA-miss detection with a deadline heap.
+
+When a task whose operator sets ``sla`` starts running, the listener records
+its deadline (the end of the DAG run's data interval, or the logical date,
+plus ``sla``) in ``notification_sla_deadline``; when it succeeds (or fails
+without a retry left) the row is deleted. ``SlaTracker`` keeps the outstanding deadlines in a min-heap, so
+finding due ones is a peek at the smallest deadline instead of a periodic scan
+of ``task_instance``. It only reads rows created since its last poll. Due
+entries whose row still exists are emitted as one batch of ``SLA_MISS`` events
+and deleted in a single statement; entries of tasks that succeeded meanwhile
+are simply dropped.
+
+The tracker runs in the dispatch worker. When several workers run, only the
+one holding a database advisory lock (``pg_try_advisory_lock`` on PostgreSQL,
+``GET_LOCK`` on MySQL) tracks deadlines; the others take over if it dies.
+The owner checks on every poll that its lock connection still holds the lock,
+so after losing the connection it stops tracking (and tries to take the lock
+again) instead of running alongside the worker that took over.
+Other databases have no advisory locks, so every tracker considers itself the
+owner there; run a single worker in that case.
+
+Airflow 2 has no DAG-level SLA, so only task SLAs are tracked.
+"""
+
+import heapq
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.events import NotificationEvent
+from airflow_notification_plugin.models import EventType, SlaDeadline
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "airflow_notification_sla_tracker"
+# Rows created up to this long before the last poll are re-read, to tolerate
+# clock skew between listeners and transactions that commit late
+LOAD_OVERLAP = timedelta(seconds=60)
+
+
+def _default_session_factory() -> Callable:
+    from airflow.settings import Session as AirflowSession
+
+    return AirflowSession
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Plugin tables store naive UTC datetimes
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def task_deadline(task_instance) -> Optional[datetime]:
+    """SLA deadline of a task instance (naive UTC), or None if its task has no SLA."""
+    sla = getattr(getattr(task_instance, "task", None), "sla", None)
+    if not isinstance(sla, timedelta):
+        return None
+    dag_run = getattr(task_instance, "dag_run", None)
+    start = getattr(dag_run, "data_interval_end", None) or task_instance.execution_date
+    return _naive_utc(start + sla)
+
+
+def register_deadline(task_instance, session_factory: Optional[Callable] = None) -> bool:
+    """
+    Record the SLA deadline of a running task instance.
+
+    Returns:
+        bool: True if a deadline was recorded (or already existed)
+    """
+    deadline = task_deadline(task_instance)
+    if deadline is None:
+        return False
+
+    session = (session_factory or _default_session_factory())()
+    try:
+        session.add(SlaDeadline(
+            dag_id=task_instance.dag_id,
+            task_id=task_instance.task_id,
+            run_id=task_instance.run_id,
+            map_index=getattr(task_instance, "map_index", -1),
+            execution_date=_naive_utc(task_instance.execution_date),
+            deadline=deadline,
+        ))
+        session.commit()
+        return True
+    except IntegrityError:
+        # Retries run again under the same key; keep the original deadline
+        session.rollback()
+        return True
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error recording SLA deadline: {str(e)}")
+        return False
+    finally:
+        session.close()
+
+
+def clear_deadline(task_instance, session_factory: Optional[Callable] = None) -> None:
+    """Forget the SLA deadline of a task instance that succeeded or finally failed."""
+    if task_deadline(task_instance) is None:
+        return
+
+    session = (session_factory or _default_session_factory())()
+    try:
+        session.query(SlaDeadline).filter(
+            SlaDeadline.dag_id == task_instance.dag_id,
+            SlaDeadline.task_id == task_instance.task_id,
+            SlaDeadline.run_id == task_instance.run_id,
+            SlaDeadline.map_index == getattr(task_instance, "map_index", -1),
+        ).delete(synchronize_session=False)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error clearing SLA deadline: {str(e)}")
+    finally:
+        session.close()
+
+
+class AdvisoryLock:
+    """Session-level database advisory lock held on a dedicated connection."""
+
+    def __init__(self, engine, name: str = LOCK_NAME):
+        self.engine = engine
+        self.name = name
+        # pg_try_advisory_lock takes a bigint key
+        self.key = zlib.crc32(name.encode("utf-8"))
+        self._connection = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    def acquire(self) -> bool:
+        """Take the lock without waiting, or check that it is still held. Returns True if it is held."""
+        if self._connection is not None:
+            if self._still_held():
+                return True
+            logger.warning(f"Lost advisory lock {self.name}, trying to take it again")
+            self.release()
+        dialect = self.engine.dialect.name
+        connection = self.engine.connect()
+        try:
+            if dialect == "postgresql":
+                acquired = connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+                ).scalar()
+            elif dialect == "mysql":
+                acquired = connection.execute(
+                    text("SELECT GET_LOCK(:name, 0)"), {"name": self.name}
+                ).scalar() == 1
+            else:
+                acquired = True
+        except Exception as e:
+            logger.error(f"Error acquiring advisory lock {self.name}: {str(e)}")
+            acquired = False
+
+        if acquired:
+            self._connection = connection
+        else:
+            connection.close()
+        return bool(acquired)
+
+    def _still_held(self) -> bool:
+        # The server releases session-level locks when the connection drops
+        dialect = self.engine.dialect.name
+        try:
+            if dialect == "postgresql":
+                # A bigint key shows up as classid (high half) and objid (low half)
+                return bool(self._connection.execute(
+                    text(
+                        "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory'"
+                        " AND pid = pg_backend_pid() AND classid = 0 AND objid = :key"
+                        " AND objsubid = 1 AND granted)"
+                    ),
+                    {"key": self.key},
+                ).scalar())
+            elif dialect == "mysql":
+                return self._connection.execute(
+                    text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"), {"name": self.name}
+                ).scalar() == 1
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.error(f"Error checking advisory lock {self.name}: {str(e)}")
+            return False
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        # Closing the connection releases session-level locks
+        try:
+            self._connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing advisory lock connection: {str(e)}")
+        finally:
+            self._connection = None
+
+
+class SlaTracker:
+    """Min-heap of outstanding SLA deadlines; ``poll`` returns the misses that are due."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        check_interval: Optional[float] = None,
+        lock: Optional[AdvisoryLock] = None,
+    ):
+        self._session_factory = session_factory or _default_session_factory()
+        self.check_interval = (
+            config.SLA_CHECK_INTERVAL if check_interval is None else check_interval
+        )
+        self._lock = lock
+        self._heap: List[Tuple[datetime, int]] = []
+        self._known: Set[int] = set()
+        self._loaded_until: Optional[datetime] = None
+        self._checked_at: Optional[float] = None
+
+    def _ensure_owner(self, session) -> bool:
+        if self._lock is None:
+            self._lock = AdvisoryLock(session.get_bind())
+        was_owner = self._lock.held
+        if self._lock.acquire():
+            if not was_owner:
+                logger.info("This worker now tracks SLA deadlines")
+            return True
+        if was_owner:
+            logger.warning("This worker no longer tracks SLA deadlines")
+        return False
+
+    def poll(self) -> List[Tuple[EventType, NotificationEvent]]:
+        """Emit due SLA misses, at most once per ``check_interval`` seconds."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return []
+        self._checked_at = now
+
+        session = self._session_factory()
+        try:
+            if not self._ensure_owner(session):
+                return []
+            self._load(session)
+            return self._emit_due(session, datetime.utcnow())
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error checking SLA deadlines: {str(e)}")
+            return []
+        finally:
+            session.close()
+
+    def _load(self, session) -> None:
+        """Push deadlines recorded since the last load onto the heap."""
+        loaded_until = datetime.utcnow()
+        query = session.query(SlaDeadline.id, SlaDeadline.deadline)
+        if self._loaded_until is not None:
+            query = query.filter(SlaDeadline.created_at >= self._loaded_until - LOAD_OVERLAP)
+        for deadline_id, deadline in query.all():
+            if deadline_id not in self._known:
+                self._known.add(deadline_id)
+                heapq.heappush(self._heap, (deadline, deadline_id))
+        self._loaded_until = loaded_until
+
+    def _emit_due(self, session, now: datetime) -> List[Tuple[EventType, NotificationEvent]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, deadline_id = heapq.heappop(self._heap)
+            self._known.discard(deadline_id)
+            due.append(deadline_id)
+        if not due:
+            return []
+
+        # Rows of tasks that succeeded in time are gone; the rest are misses
+        rows = session.query(SlaDeadline).filter(SlaDeadline.id.in_(due)).all()
+        if not rows:
+            return []
+        # Build the events before committing, which expires the deleted rows
+        misses = [
+            (EventType.SLA_MISS, NotificationEvent(
+                "task",
+                dag_id=row.dag_id,
+                task_id=row.task_id,
+                run_id=row.run_id,
+                map_index=row.map_index,
+                execution_date=row.execution_date,
+            ))
+            for row in rows
+        ]
+        session.query(SlaDeadline).filter(
+            SlaDeadline.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        session.commit()
+
+        logger.info(f"Emitting {len(misses)} SLA misses")
+        return misses
+
+    def close(self) -> None:
+        if self._lock is not None:
+            self._lock.release()
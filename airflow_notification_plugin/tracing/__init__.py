@@ -0,0 +1,139 @@
+"""Lightweight tracing hooks for the notification dispatch pipeline.
+
+The dispatcher opens a span for each stage (dispatch, subscription lookup,
+rendering, handler send and per-device send). By default the tracer is a
+no-op that hands out one shared span object, so tracing costs a method call
+per stage. Set ``NOTIFICATION_TRACING=opentelemetry`` (or call ``set_tracer``)
+to export spans through OpenTelemetry, using whatever tracer provider and
+exporter the process has configured.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from airflow_notification_plugin.config import config
+
+logger = logging.getLogger(__name__)
+
+# Event fields that identify the Airflow task instance / DAG run, attached to
+# the dispatch span so traces can be correlated with Airflow task logs
+CORRELATION_FIELDS = (
+    "dag_id",
+    "task_id",
+    "run_id",
+    "map_index",
+    "try_number",
+    "execution_date",
+    "hostname",
+)
+
+
+class Span:
+    """A no-op span; also the interface implemented by tracer adapters."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed without an exception (e.g. a handler returned False)."""
+        pass
+
+
+class Tracer:
+    """No-op tracer. Subclasses return real spans from ``start_span``."""
+
+    # Lets callers skip building span attributes when nothing is recorded
+    enabled = False
+
+    _noop_span = Span()
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Start a span used as a context manager; nested spans become children."""
+        return self._noop_span
+
+
+class OpenTelemetrySpan(Span):
+    """Adapter around an OpenTelemetry span started as the current span."""
+
+    __slots__ = ("_manager", "_span")
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._span = None
+
+    def __enter__(self):
+        self._span = self._manager.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # start_as_current_span records the exception and sets the error status
+        return self._manager.__exit__(exc_type, exc, tb)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self._span.set_attribute(key, value)
+
+    def set_error(self, message: str) -> None:
+        from opentelemetry.trace import Status, StatusCode
+
+        self._span.set_status(Status(StatusCode.ERROR, message))
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer adapter that emits spans through the OpenTelemetry API."""
+
+    enabled = True
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._tracer = tracer or trace.get_tracer("airflow_notification_plugin")
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        if attributes:
+            # OpenTelemetry rejects None attribute values
+            attributes = {k: v for k, v in attributes.items() if v is not None}
+        return OpenTelemetrySpan(self._tracer.start_as_current_span(name, attributes=attributes))
+
+
+def correlation_attributes(event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the task instance / DAG run identifiers out of an event, prefixed ``airflow.``."""
+    return {
+        f"airflow.{field}": str(event_data[field]) if field == "execution_date" else event_data[field]
+        for field in CORRELATION_FIELDS
+        if event_data.get(field) is not None
+    }
+
+
+def _create_tracer() -> Tracer:
+    backend = config.TRACING_BACKEND
+    if backend == "opentelemetry":
+        try:
+            return OpenTelemetryTracer()
+        except ImportError:
+            logger.warning("opentelemetry-api is not installed, tracing disabled")
+    elif backend not in ("", "none"):
+        logger.warning(f"Unknown tracing backend: {backend}, tracing disabled")
+    return Tracer()
+
+
+_tracer: Tracer = _create_tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """Replace the process-wide tracer, e.g. with a custom adapter."""
+    global _tracer
+    _tracer = tracer
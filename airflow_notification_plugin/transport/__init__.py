@@ -0,0 +1,92 @@
+"""Transports that hand listener events to the dispatch pipeline.
+
+With the default ``sync`` transport the listeners call
+``dispatcher.dispatch`` in the Airflow process that observed the event. The
+``outbox`` transport only inserts the event into ``notification_outbox`` and
+leaves routing and delivery to the standalone dispatch worker
+(``python -m airflow_notification_plugin.worker``). The ``socket`` transport
+skips the database entirely and sends the event to a node-local worker over a
+Unix domain socket (see ``transport.sidecar``).
+"""
+
+import json
+import logging
+from typing import Any, Callable, Mapping, Optional
+
+from airflow.settings import Session as AirflowSession
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.events import FIELD_NAMES, NotificationEvent
+from airflow_notification_plugin.models import EventType, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event_data(event_data: Mapping[str, Any]) -> str:
+    """Serialize event data as JSON for queuing; non-JSON values are stringified."""
+    return json.dumps(dict(event_data), default=str)
+
+
+def decode_event_data(payload: str) -> Mapping[str, Any]:
+    """
+    Inverse of ``encode_event_data``.
+
+    Listener events come back as ``NotificationEvent``; other payloads as dicts.
+    """
+    data = json.loads(payload)
+    if isinstance(data, dict) and "dag_id" in data and set(data) <= set(FIELD_NAMES):
+        return NotificationEvent.from_mapping(data)
+    return data
+
+
+def write_outbox(
+    event_type: EventType,
+    event_data: Mapping[str, Any],
+    session_factory: Optional[Callable] = None,
+) -> bool:
+    """
+    Queue an event in the outbox table.
+
+    Returns:
+        bool: True if the row was committed
+    """
+    session = (session_factory or AirflowSession)()
+    try:
+        payload = encode_event_data(event_data)
+        session.add(NotificationOutbox(event_type=event_type, payload=payload))
+        session.commit()
+        return True
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error writing event to notification outbox: {str(e)}")
+        return False
+    finally:
+        session.close()
+
+
+def publish(event_type: EventType, event_data: Mapping[str, Any]) -> bool:
+    """
+    Hand an event to the configured asynchronous transport.
+
+    Returns:
+        bool: True if the event was accepted; False means the caller should
+        dispatch synchronously (``sync`` transport or transport failure)
+    """
+    transport = config.TRANSPORT
+    if transport == "outbox":
+        return write_outbox(event_type, event_data)
+    if transport == "socket":
+        from airflow_notification_plugin.transport.sidecar import get_client
+
+        return get_client().send(event_type, event_data)
+    if transport != "sync":
+        logger.warning(f"Unknown notification transport: {transport}, dispatching synchronously")
+    return False
+
+
+def flush() -> None:
+    """Hand over events the transport still buffers; called after each listener event."""
+    if config.TRANSPORT == "socket":
+        from airflow_notification_plugin.transport.sidecar import flush_client
+
+        flush_client()
@@ -0,0 +1,161 @@
+"""Fire-and-forget client for the node-local dispatch sidecar.
+
+Task processes send each event as one datagram to the Unix socket of a
+dispatch worker running on the same node with ``--source socket``; the
+sidecar batches, routes and delivers. Sending never blocks the task: if the
+socket's receive queue is full the datagram waits in a small bounded buffer
+and is retried on the next send, and if the sidecar is not running (or the
+buffer is full) the caller falls back to dispatching synchronously.
+
+The listeners call ``flush_client`` after every event: Airflow task processes
+exit through ``os._exit``, which skips ``atexit``, so a datagram that still
+cannot be sent then is dispatched synchronously instead of staying buffered.
+"""
+
+import atexit
+import json
+import logging
+import socket
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Mapping, Optional, Tuple
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.events import NotificationEvent, encode_event
+from airflow_notification_plugin.models import EventType
+
+logger = logging.getLogger(__name__)
+
+# Must not exceed the sidecar's receive size (worker.sources.MAX_DATAGRAM_SIZE)
+MAX_DATAGRAM_SIZE = 65536
+
+
+def encode_datagram(event_type: EventType, event_data: Mapping[str, Any]) -> bytes:
+    """
+    Encode an event in the format read by ``UnixSocketSource``.
+
+    ``NotificationEvent`` uses the compact binary encoding; other mappings fall
+    back to JSON (the decoder tells them apart by the first byte).
+    """
+    if isinstance(event_data, NotificationEvent):
+        return encode_event(event_type, event_data)
+    return json.dumps(
+        {"event_type": event_type.value, "event_data": dict(event_data)}, default=str
+    ).encode("utf-8")
+
+
+class SidecarClient:
+    """Non-blocking datagram sender with a bounded retry buffer."""
+
+    def __init__(self, path: Optional[str] = None, buffer_size: Optional[int] = None):
+        self.path = path or config.WORKER_SOCKET_PATH
+        self.buffer_size = buffer_size or config.SIDECAR_BUFFER_SIZE
+        self._buffer: Deque[Tuple[bytes, EventType, Mapping[str, Any]]] = deque()
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+
+    def _get_socket(self) -> socket.socket:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+        return self._socket
+
+    def _send(self, datagram: bytes) -> bool:
+        """Try one non-blocking send; False if the sidecar's queue is full."""
+        try:
+            self._get_socket().sendto(datagram, self.path)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _drain_buffer(self) -> bool:
+        """Resend buffered datagrams in order; True once the buffer is empty."""
+        while self._buffer:
+            if not self._send(self._buffer[0][0]):
+                return False
+            self._buffer.popleft()
+        return True
+
+    def send(self, event_type: EventType, event_data: Mapping[str, Any]) -> bool:
+        """
+        Hand an event to the sidecar without blocking.
+
+        Returns:
+            bool: True if the event was sent or buffered; False if the sidecar
+            is unavailable or the buffer is full, and the caller must dispatch
+        """
+        datagram = encode_datagram(event_type, event_data)
+        if len(datagram) > MAX_DATAGRAM_SIZE:
+            logger.warning(f"Event of {len(datagram)} bytes is too large for the sidecar socket")
+            return False
+
+        with self._lock:
+            try:
+                if self._drain_buffer() and self._send(datagram):
+                    return True
+            except OSError as e:
+                # No socket file or nobody bound to it: the sidecar is not running
+                logger.debug(f"Notification sidecar unavailable at {self.path}: {str(e)}")
+                return False
+
+            if len(self._buffer) >= self.buffer_size:
+                logger.warning("Notification sidecar buffer is full")
+                return False
+            self._buffer.append((datagram, event_type, event_data))
+            return True
+
+    def flush(self, fallback: Optional[Callable[[EventType, Mapping[str, Any]], None]] = None) -> int:
+        """
+        Send whatever is still buffered, e.g. before the process exits.
+
+        Events that still cannot be sent are passed to ``fallback``.
+
+        Returns:
+            int: Number of events handed to the fallback
+        """
+        with self._lock:
+            try:
+                if self._drain_buffer():
+                    return 0
+            except OSError:
+                pass
+            remaining, self._buffer = list(self._buffer), deque()
+
+        if fallback is not None:
+            for _, event_type, event_data in remaining:
+                fallback(event_type, event_data)
+        return len(remaining)
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+_client: Optional[SidecarClient] = None
+_client_lock = threading.Lock()
+
+
+def flush_client() -> int:
+    """
+    Send what the process-wide client still buffers, dispatching the rest in-process.
+
+    Returns:
+        int: Number of events dispatched in-process
+    """
+    from airflow_notification_plugin.dispatchers import dispatcher
+
+    if _client is None:
+        return 0
+    return _client.flush(fallback=dispatcher.dispatch)
+
+
+def get_client() -> SidecarClient:
+    """Return the process-wide sidecar client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SidecarClient()
+                atexit.register(flush_client)
+    return _client
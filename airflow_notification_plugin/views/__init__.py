@@ -1,7 +1,13 @@
 """Flask-Admin views for notification plugin management."""
 
+from typing import Optional
+
+from flask import g, request
+from flask_admin.actions import action
 from flask_admin.contrib.sqla import ModelView
 from flask_admin import expose
+from jinja2 import Template
+from sqlalchemy import func, or_, text
 from wtforms import TextAreaField
 from wtforms.widgets import TextArea
 
@@ -10,10 +16,167 @@ from airflow_notification_plugin.models import (
     DagSubscription,
     NotificationTemplate,
     DeviceRegistration,
+    UserContact,
+)
+from airflow_notification_plugin.changes import notify_change
+from airflow_notification_plugin.dispatchers.filters import compile_filter
+from airflow_notification_plugin.dispatchers.matching import validate_pattern
+from airflow_notification_plugin.views.bulk import (
+    ActivatableModelView,
+    BulkActionsModelView,
+    ChannelReassignModelView,
 )
 
 
-class NotificationChannelView(ModelView):
+class ChangeNotifyingModelView(BulkActionsModelView):
+    """Model view whose edits are announced to running dispatchers (see ``changes``)."""
+    
+    def after_model_change(self, form, model, is_created):
+        notify_change(self.session, self.model.__tablename__)
+    
+    def after_model_delete(self, model):
+        notify_change(self.session, self.model.__tablename__)
+    
+    def after_bulk_change(self, *tables):
+        notify_change(self.session, *tables)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def estimated_row_count(session, table_name: str) -> Optional[int]:
+    """Row count of a table from the database's statistics, or None if unavailable."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = "SELECT CAST(reltuples AS BIGINT) FROM pg_class WHERE oid = to_regclass(:table)"
+    elif dialect == "mysql":
+        statement = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :table"
+        )
+    else:
+        return None
+    estimate = session.execute(text(statement), {"table": table_name}).scalar()
+    # PostgreSQL reports -1 (0 before version 14) for tables never analyzed
+    return int(estimate) if estimate and estimate > 0 else None
+
+
+class LargeTableModelView(ModelView):
+    """
+    List view for tables too large for OFFSET paging, COUNT(*) and LIKE '%term%'.
+    
+    - Search matches the start of the searchable columns (``LIKE 'term%'``),
+      which can use their indexes.
+    - The row count is exact up to ``exact_count_limit`` rows. Beyond that,
+      unfiltered lists show the table's estimated row count; filtered lists
+      show a next/previous pager.
+    - In the default order (by id), the next and previous page links carry the
+      last or first id of the current page and seek from it instead of using
+      OFFSET.
+    """
+    
+    column_default_sort = "id"
+    exact_count_limit = 10000
+    
+    def search_placeholder(self):
+        placeholder = super(LargeTableModelView, self).search_placeholder()
+        return f"{placeholder} (starts with)" if placeholder else placeholder
+    
+    def _apply_search(self, query, count_query, joins, count_joins, search):
+        for term in search.split():
+            pattern = f"{_escape_like(term)}%"
+            filters = []
+            count_filters = []
+            for field, path in self._search_fields:
+                query, joins, alias = self._apply_path_joins(query, joins, path, inner_join=False)
+                column = field if alias is None else getattr(alias, field.key)
+                filters.append(column.like(pattern, escape="\\"))
+                if count_query is not None:
+                    count_query, count_joins, count_alias = self._apply_path_joins(
+                        count_query, count_joins, path, inner_join=False
+                    )
+                    column = field if count_alias is None else getattr(count_alias, field.key)
+                    count_filters.append(column.like(pattern, escape="\\"))
+            query = query.filter(or_(*filters))
+            if count_query is not None:
+                count_query = count_query.filter(or_(*count_filters))
+        return query, count_query, joins, count_joins
+    
+    def get_count_query(self):
+        # Counted by get_list from the filtered query, with a bound
+        return None
+    
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        _, query = super(LargeTableModelView, self).get_list(
+            page, sort_column, sort_desc, search, filters, execute=False, page_size=page_size
+        )
+        if page_size is None:
+            page_size = self.page_size
+        unpaged = query.limit(None).offset(None)
+        count = None
+        if not self.simple_list_pager:
+            count = self._count(unpaged, filtered=bool(search or filters))
+        
+        seek = self._seek(page, sort_column) if page_size else None
+        if seek is not None:
+            direction, key = seek
+            if direction == "after":
+                query = unpaged.filter(self.model.id > key).order_by(None).order_by(self.model.id)
+            else:
+                query = unpaged.filter(self.model.id < key).order_by(None).order_by(
+                    self.model.id.desc()
+                )
+            query = query.limit(page_size)
+        if not execute:
+            return count, query
+        
+        data = query.all()
+        if seek is not None and seek[0] == "before":
+            data.reverse()
+        if data:
+            g.setdefault("notification_list_bounds", {})[self.endpoint] = (
+                page, data[0].id, data[-1].id
+            )
+        return count, data
+    
+    def _count(self, query, filtered: bool) -> Optional[int]:
+        ids = query.order_by(None).enable_eagerloads(False).with_entities(self.model.id)
+        count = self.session.query(func.count()).select_from(
+            ids.limit(self.exact_count_limit + 1).subquery()
+        ).scalar()
+        if count <= self.exact_count_limit:
+            return count
+        if filtered:
+            return None
+        estimate = estimated_row_count(self.session, self.model.__tablename__)
+        return max(estimate, count) if estimate is not None else None
+    
+    def _seek(self, page, sort_column):
+        """("after" | "before", id) to seek from for this page, if it was linked with one."""
+        if not page or sort_column is not None:
+            return None
+        for direction in ("after", "before"):
+            key = request.args.get(direction, type=int)
+            if key is not None:
+                return direction, key
+        return None
+    
+    def _get_list_url(self, view_args):
+        view_args = view_args.clone()
+        view_args.extra_args.pop("after", None)
+        view_args.extra_args.pop("before", None)
+        bounds = g.get("notification_list_bounds", {}).get(self.endpoint)
+        if bounds is not None and view_args.sort is None and view_args.page:
+            page, first_id, last_id = bounds
+            if view_args.page == page + 1:
+                view_args.extra_args["after"] = last_id
+            elif view_args.page == page - 1:
+                view_args.extra_args["before"] = first_id
+        return super(LargeTableModelView, self)._get_list_url(view_args)
+
+
+class NotificationChannelView(ChangeNotifyingModelView, ChannelReassignModelView):
     """Admin view for managing notification channels."""
     
     can_create = True
@@ -48,27 +211,68 @@ class NotificationChannelView(ModelView):
             category="Notification Hub",
             **kwargs
         )
+    
+    reassign_text = "Move subscriptions to {name}"
+    
+    def subscriptions_of(self, ids):
+        return DagSubscription.channel_id.in_([int(channel_id) for channel_id in ids])
+    
+    @action("activate_subscriptions", "Activate subscriptions")
+    def action_activate_subscriptions(self, ids):
+        self.bulk_update(
+            DagSubscription,
+            self.subscriptions_of(ids),
+            {DagSubscription.is_active: True},
+            "subscriptions activated",
+        )
+    
+    @action(
+        "deactivate_subscriptions",
+        "Deactivate subscriptions",
+        "Deactivate every subscription of the selected channels?",
+    )
+    def action_deactivate_subscriptions(self, ids):
+        self.bulk_update(
+            DagSubscription,
+            self.subscriptions_of(ids),
+            {DagSubscription.is_active: False},
+            "subscriptions deactivated",
+        )
 
 
-class DagSubscriptionView(ModelView):
+class DagSubscriptionView(
+    ChangeNotifyingModelView, ActivatableModelView, ChannelReassignModelView, LargeTableModelView
+):
     """Admin view for managing DAG subscriptions."""
     
     can_create = True
     can_edit = True
     can_delete = True
     
-    column_list = ["id", "user_id", "dag_id", "event_type", "channel", "is_active"]
+    column_list = [
+        "id", "user_id", "dag_id", "match_type", "event_type", "channel", "priority", "is_active"
+    ]
+    column_select_related_list = ["channel"]
     column_searchable_list = ["user_id", "dag_id"]
-    column_filters = ["event_type", "is_active", "user_id"]
+    column_filters = ["event_type", "match_type", "priority", "is_active", "user_id"]
     column_editable_list = ["is_active"]
     
-    form_columns = ["user_id", "dag_id", "event_type", "channel_id", "is_active"]
+    form_columns = [
+        "user_id", "dag_id", "match_type", "event_type", "channel_id", "priority",
+        "filter_expression", "template_id", "is_active",
+    ]
     
     column_descriptions = {
         "user_id": "User identifier who will receive notifications",
-        "dag_id": "DAG ID to monitor",
+        "dag_id": "DAG ID to monitor, or a pattern, tag or owner depending on the match type",
+        "match_type": "exact DAG id, glob (e.g. etl_finance_*), anchored regex, DAG tag or owner",
         "event_type": "Type of event to trigger notification",
         "channel_id": "Notification channel to use",
+        "priority": "Send priority lane; leave empty to use the event type's default",
+        "filter_expression": (
+            "Optional condition on the event, e.g. duration > 1800 or glob(hostname, 'pool-a-*')"
+        ),
+        "template_id": "Template to use instead of the DAG's or channel type's template (optional)",
         "is_active": "Whether this subscription is active",
     }
     
@@ -80,21 +284,29 @@ class DagSubscriptionView(ModelView):
             category="Notification Hub",
             **kwargs
         )
+    
+    def on_model_change(self, form, model, is_created):
+        validate_pattern(model.match_type, model.dag_id)
+        if model.filter_expression:
+            compile_filter(model.filter_expression)
 
 
-class NotificationTemplateView(ModelView):
+class NotificationTemplateView(ChangeNotifyingModelView):
     """Admin view for managing notification templates."""
     
     can_create = True
     can_edit = True
     can_delete = True
     
-    column_list = ["id", "name", "event_type", "channel_type", "is_active"]
-    column_searchable_list = ["name"]
-    column_filters = ["event_type", "channel_type", "is_active"]
+    column_list = ["id", "name", "event_type", "channel_type", "dag_id", "is_active"]
+    column_searchable_list = ["name", "dag_id"]
+    column_filters = ["event_type", "channel_type", "dag_id", "is_active"]
     column_editable_list = ["is_active"]
     
-    form_columns = ["name", "event_type", "channel_type", "template_content", "description", "is_active"]
+    form_columns = [
+        "name", "event_type", "channel_type", "dag_id", "template_content", "description",
+        "is_active",
+    ]
     form_args = {
         "template_content": {
             "widget": TextArea(),
@@ -106,6 +318,7 @@ class NotificationTemplateView(ModelView):
         "name": "Unique name for this template",
         "event_type": "Event type this template is for",
         "channel_type": "Channel type this template is for",
+        "dag_id": "Only use this template for this DAG (overrides the template for all DAGs)",
         "template_content": "Jinja2 template content",
     }
     
@@ -117,9 +330,13 @@ class NotificationTemplateView(ModelView):
             category="Notification Hub",
             **kwargs
         )
+    
+    def on_model_change(self, form, model, is_created):
+        # Reject syntax errors here; dispatchers skip templates that do not compile
+        Template(model.template_content)
 
 
-class DeviceRegistrationView(ModelView):
+class DeviceRegistrationView(ActivatableModelView, LargeTableModelView):
     """Admin view for managing device registrations."""
     
     can_create = False  # Devices register via API
@@ -135,7 +352,7 @@ class DeviceRegistrationView(ModelView):
     
     column_descriptions = {
         "device_token": "Device token for push notifications",
-        "platform_type": "Platform type (PWA, iOS, Android)",
+        "platform_type": "Platform type (PWA, iOS, Android, Web Push)",
         "user_id": "User who owns this device",
         "is_active": "Whether this device is active",
     }
@@ -148,3 +365,32 @@ class DeviceRegistrationView(ModelView):
             category="Notification Hub",
             **kwargs
         )
+
+
+class UserContactView(ChangeNotifyingModelView):
+    """Admin view for managing user contact details."""
+    
+    can_create = True
+    can_edit = True
+    can_delete = True
+    
+    column_list = ["id", "user_id", "phone_number", "email", "youdu_id", "updated_at"]
+    column_searchable_list = ["user_id", "phone_number", "email"]
+    
+    form_columns = ["user_id", "phone_number", "email", "youdu_id"]
+    
+    column_descriptions = {
+        "user_id": "User identifier, as used in subscriptions",
+        "phone_number": "Phone number for SMS notifications",
+        "email": "Email address (defaults to the user_id if it is an address)",
+        "youdu_id": "Youdu account (defaults to the user_id)",
+    }
+    
+    def __init__(self, session, **kwargs):
+        super(UserContactView, self).__init__(
+            UserContact,
+            session,
+            name="User Contacts",
+            category="Notification Hub",
+            **kwargs
+        )
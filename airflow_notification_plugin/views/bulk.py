@@ -0,0 +1,191 @@
+"""Set-based bulk actions for the admin views.
+
+Every action runs a single UPDATE or DELETE, without loading the rows:
+
+- over the selected rows, or
+- for the "all matching" actions, over every row matching the list's current
+  search and filters (Flask-Admin only submits an action with at least one
+  row selected; the selection is ignored).
+
+Subclasses are told which tables changed through ``after_bulk_change``.
+"""
+
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from flask import flash, redirect, request
+from flask_admin.actions import action
+from flask_admin.babel import lazy_gettext
+from flask_admin.contrib.sqla import ModelView
+from flask_admin.helpers import flash_errors, get_redirect_target
+from sqlalchemy import select
+
+from airflow_notification_plugin.models import DagSubscription, NotificationChannel
+
+# Prefix of the generated "reassign to channel <id>" action names
+REASSIGN_ACTION_PREFIX = "reassign_channel_"
+
+MATCHING_CONFIRMATION = (
+    "This changes every row matching the current search and filters, not only the selected ones. "
+    "Continue?"
+)
+
+
+class BulkActionsModelView(ModelView):
+    """Model view whose delete and bulk actions run one statement over the affected rows."""
+    
+    fast_mass_delete = True
+    
+    def after_bulk_change(self, *tables: str) -> None:
+        """Called after a bulk action changed ``tables``."""
+    
+    def is_action_allowed(self, name):
+        if name != "delete" and not self.can_edit:
+            return False
+        return super(BulkActionsModelView, self).is_action_allowed(name)
+    
+    @action(
+        "delete",
+        lazy_gettext("Delete"),
+        lazy_gettext("Are you sure you want to delete selected records?"),
+    )
+    def action_delete(self, ids):
+        super(BulkActionsModelView, self).action_delete(ids)
+        self.after_bulk_change(self.model.__tablename__)
+    
+    def selected(self, ids: List[str]):
+        """Criterion for the rows selected in the list."""
+        return self.model.id.in_([int(row_id) for row_id in ids])
+    
+    def matching(self):
+        """Criterion for every row matching the list's search and filters; None if unfiltered."""
+        search, filters = self._list_filters(request.form.get("url") or "")
+        if not search and not filters:
+            flash("Search or filter the list before changing all matching rows.", "error")
+            return None
+        # The base class's query: unpaged, and not counted when get_count_query is None
+        _, query = ModelView.get_list(
+            self, 0, None, False, search, filters, execute=False, page_size=0
+        )
+        ids = query.order_by(None).enable_eagerloads(False).with_entities(self.model.id)
+        # A derived table, which MySQL accepts in an UPDATE of the same table
+        return self.model.id.in_(select(ids.subquery().c.id))
+    
+    def _list_filters(self, url: str) -> Tuple[Optional[str], list]:
+        """Search and filters of a list URL, as parsed by ``_get_list_filter_args``."""
+        args = parse_qsl(urlsplit(url).query)
+        search = dict(args).get("search") or None
+        filters = []
+        for arg, value in args:
+            if not arg.startswith("flt") or "_" not in arg:
+                continue
+            position, key = arg[3:].split("_", 1)
+            if key in (self._filter_args or {}):
+                index, flt = self._filter_args[key]
+                if flt.validate(value):
+                    filters.append((position, (index, str(flt.name), value)))
+        return search, [flt for _, flt in sorted(filters, key=lambda item: item[0])]
+    
+    def bulk_update(self, model, criterion, values, description: str) -> Optional[int]:
+        """
+        Update the ``model`` rows matching ``criterion`` in one statement.
+    
+        Returns:
+            Optional[int]: Rows updated, or None if the update failed
+        """
+        if criterion is None:
+            return None
+        try:
+            count = self.session.query(model).filter(criterion).update(
+                values, synchronize_session=False
+            )
+            self.session.commit()
+        except Exception as ex:
+            self.session.rollback()
+            if not self.handle_view_exception(ex):
+                raise
+            flash(f"Failed to update records. {str(ex)}", "error")
+            return None
+        self.after_bulk_change(model.__tablename__)
+        flash(f"{count} {description}.", "success")
+        return count
+
+
+class ActivatableModelView(BulkActionsModelView):
+    """Bulk activation and deactivation of the selected or all matching rows."""
+    
+    @action("activate", "Activate")
+    def action_activate(self, ids):
+        self.bulk_update(
+            self.model, self.selected(ids), {self.model.is_active: True}, "records activated"
+        )
+    
+    @action("deactivate", "Deactivate")
+    def action_deactivate(self, ids):
+        self.bulk_update(
+            self.model, self.selected(ids), {self.model.is_active: False}, "records deactivated"
+        )
+    
+    @action("activate_matching", "Activate all matching", MATCHING_CONFIRMATION)
+    def action_activate_matching(self, ids):
+        self.bulk_update(
+            self.model, self.matching(), {self.model.is_active: True}, "records activated"
+        )
+    
+    @action("deactivate_matching", "Deactivate all matching", MATCHING_CONFIRMATION)
+    def action_deactivate_matching(self, ids):
+        self.bulk_update(
+            self.model, self.matching(), {self.model.is_active: False}, "records deactivated"
+        )
+
+
+class ChannelReassignModelView(BulkActionsModelView):
+    """Adds a "reassign to <channel>" action for each channel."""
+    
+    reassign_text = "Reassign to {name}"
+    
+    def subscriptions_of(self, ids: List[str]):
+        """
+        Criterion for the subscriptions that the selected rows stand for.
+    
+        The selected rows themselves by default, for views of ``DagSubscription``;
+        views of other models map their rows to subscriptions.
+        """
+        return self.selected(ids)
+    
+    def get_actions_list(self):
+        actions, confirmations = super(ChannelReassignModelView, self).get_actions_list()
+        if self.can_edit:
+            for channel_id, name in self.session.query(
+                NotificationChannel.id, NotificationChannel.name
+            ).order_by(NotificationChannel.name):
+                actions.append(
+                    (f"{REASSIGN_ACTION_PREFIX}{channel_id}", self.reassign_text.format(name=name))
+                )
+        return actions, confirmations
+    
+    def handle_action(self, return_view=None):
+        action_name = request.form.get("action") or ""
+        if not action_name.startswith(REASSIGN_ACTION_PREFIX):
+            return super(ChannelReassignModelView, self).handle_action(return_view)
+    
+        form = self.action_form()
+        if not self.can_edit:
+            flash("Permission denied.", "error")
+        elif self.validate_form(form):
+            channel_id = action_name[len(REASSIGN_ACTION_PREFIX):]
+            channel = None
+            if channel_id.isdigit():
+                channel = self.session.query(NotificationChannel).get(int(channel_id))
+            if channel is None:
+                flash("The channel no longer exists.", "error")
+            else:
+                self.bulk_update(
+                    DagSubscription,
+                    self.subscriptions_of(request.form.getlist("rowid")),
+                    {DagSubscription.channel_id: channel.id},
+                    "subscriptions reassigned",
+                )
+        else:
+            flash_errors(form, message="Failed to perform action. %(error)s")
+        return redirect(get_redirect_target() or self.get_url(".index_view"))
@@ -0,0 +1,706 @@
+"""Standalone, horizontally scalable dispatch worker.
+
+The worker daemon takes events from an ``EventSource`` (the outbox table, a
+Unix socket or an in-memory queue) and fans batches out to a process pool.
+Each pool process runs routing and rendering with its own
+``NotificationDispatcher`` and hands handler calls to per-process sender
+threads fed from the priority lanes, so many HTTP sends are in flight at once. Capacity is sized with the
+number of processes and the per-process send concurrency, independently of
+the Airflow executor.
+
+On SIGTERM/SIGINT the worker stops taking new events, waits up to the drain
+timeout for in-flight batches and acknowledges them before exiting.
+``/healthz`` and ``/readyz`` probes are served on the probe port.
+
+Run ``python -m airflow_notification_plugin.worker --help`` for options.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from airflow.settings import Session as AirflowSession
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers import batching
+from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+from airflow_notification_plugin.dispatchers.lanes import (
+    LaneScheduler,
+    OverflowPolicy,
+    priority_rank,
+    resolve_overflow_policy,
+    resolve_priority,
+)
+from airflow_notification_plugin.dispatchers.routing import SharedRouting
+from airflow_notification_plugin import metrics
+from airflow_notification_plugin.metrics import SHED_TOTAL, Timer
+from airflow_notification_plugin.models import EventType, NotificationPriority
+from airflow_notification_plugin.sla import SlaTracker
+from airflow_notification_plugin.transport import write_outbox
+from airflow_notification_plugin.worker.sources import (
+    EventSource,
+    InMemorySource,
+    OutboxSource,
+    QueuedEvent,
+    UnixSocketSource,
+    create_source,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DispatchWorker",
+    "EventSource",
+    "InMemorySource",
+    "OutboxSource",
+    "UnixSocketSource",
+    "create_source",
+    "main",
+]
+
+
+class SendJob(NamedTuple):
+    """A queued handler call; ``event_type`` and ``dag_id`` are kept for shedding logs."""
+    future: Future
+    fn: Callable
+    args: Tuple
+    event_type: Optional[EventType] = None
+    dag_id: Optional[str] = None
+
+
+class LaneSender:
+    """
+    Per-process pool of threads running blocking handler sends concurrently.
+
+    Handlers are synchronous (``requests``), so each of ``concurrency``
+    threads blocks on the ``LaneScheduler`` for the next send and runs it;
+    callers get a ``Future`` back. Sends therefore start in priority-lane
+    order rather than in submission order. A send that returns a ``Future``
+    itself (a batched webhook) completes when that one does, without holding
+    a thread.
+    """
+
+    def __init__(self, concurrency: int, scheduler: Optional[LaneScheduler] = None):
+        self._scheduler = scheduler if scheduler is not None else LaneScheduler()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"notification-send-{n}", daemon=True)
+            for n in range(concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self) -> None:
+        while True:
+            # Returns None only once the scheduler is closed and drained
+            job = self._scheduler.get()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = job.fn(*job.args)
+            except Exception as e:
+                job.future.set_exception(e)
+                continue
+            if isinstance(result, Future):
+                _chain(result, job.future)
+            else:
+                job.future.set_result(result)
+
+    @property
+    def scheduler(self) -> LaneScheduler:
+        return self._scheduler
+
+    def submit(self, fn, *args, priority: NotificationPriority = NotificationPriority.NORMAL,
+               channel_key=None, event_type: Optional[EventType] = None,
+               dag_id: Optional[str] = None) -> Future:
+        future = Future()
+        self._scheduler.put(SendJob(future, fn, args, event_type, dag_id), priority, channel_key)
+        return future
+
+    def close(self) -> None:
+        """Run the sends still queued, then stop the threads."""
+        self._scheduler.close()
+        for thread in self._threads:
+            thread.join()
+
+
+class WorkerDispatcher(NotificationDispatcher):
+    """Dispatcher that queues handler calls on a ``LaneSender`` instead of blocking."""
+
+    flush_after_dispatch = False
+    long_lived = True
+
+    def __init__(self, sender: LaneSender, **kwargs):
+        if kwargs.get("delivery_log") is None:
+            # A long-running process: rows are also flushed by age in the background
+            kwargs["delivery_log"] = DeliveryLogBuffer(
+                kwargs.get("session_factory"), flush_in_background=True
+            )
+        super().__init__(**kwargs)
+        self._sender = sender
+        self._pending: List[Future] = []
+        self._queued: Optional[List[Tuple[Optional[int], Future]]] = None
+        self._completions: List[Future] = []
+
+    def _admit(self, event_type: EventType, event_data: Mapping[str, Any], sends: int) -> bool:
+        """
+        Apply the event type's overflow policy unless all of its sends fit in the lanes.
+
+        Returns:
+            bool: True if the event's sends may be queued
+        """
+        scheduler = self._sender.scheduler
+        if scheduler.has_room(sends):
+            return True
+
+        policy = resolve_overflow_policy(event_type)
+        if policy == OverflowPolicy.BLOCK:
+            if scheduler.wait_for_room(config.OVERFLOW_BLOCK_SECONDS, sends):
+                return True
+        elif policy == OverflowPolicy.DROP:
+            evicted = scheduler.evict_below(resolve_priority(event_type), sends)
+            for lane, job in evicted:
+                job.future.set_result(False)
+                self._shed(job.event_type, job.dag_id, "evicted", f"{lane.value} lane send")
+            if evicted:
+                return True
+        elif policy == OverflowPolicy.SPILL:
+            if write_outbox(event_type, event_data, self._session_factory):
+                self._shed(event_type, event_data.get("dag_id"), "spilled", "event to the outbox")
+                return False
+
+        self._shed(event_type, event_data.get("dag_id"), "dropped", "event")
+        return False
+
+    def _shed(self, event_type: Optional[EventType], dag_id: Optional[str], reason: str,
+              what: str) -> None:
+        event_name = event_type.value if event_type else "unknown"
+        SHED_TOTAL.labels(event_type=event_name, reason=reason).inc()
+        logger.warning(
+            f"Notification lanes full ({self._sender.scheduler.capacity} sends): "
+            f"{reason} {event_name} {what} for DAG {dag_id}"
+        )
+
+    def _send_notification(self, session, subscription, event_type, event_data) -> None:
+        """
+        Like the base class, but a subscription whose sends were queued is
+        logged and counted in the metrics once all of them have completed.
+        """
+        channel = subscription.channel
+        labels = {
+            "event_type": event_type.value,
+            "channel_type": channel.channel_type.value if channel else "unknown",
+        }
+        timer = Timer("error")
+        self._queued = None
+        try:
+            timer.outcome = self._process_subscription(
+                session, subscription, channel, event_type, event_data
+            )
+        except Exception as e:
+            logger.error(f"Error sending notification: {str(e)}")
+        queued, self._queued = self._queued, None
+
+        if timer.outcome != "queued" or queued is None:
+            _observe_send(timer, timer.outcome, labels)
+            return
+
+        send_outcome = super()._send_outcome
+
+        def record() -> None:
+            outcome = send_outcome(
+                channel, [(device_id, _send_result(send)) for device_id, send in queued]
+            )
+            _observe_send(timer, outcome, labels)
+
+        self._completions.append(_when_done([send for _, send in queued], record))
+
+    def _deliver(self, handler, config, message, kwargs, subscription, event_type, event_data,
+                 device_id=None, attempt=1):
+        """
+        Queue the send and return its ``Future``.
+
+        The base class's ``_deliver`` runs on the sender, so the delivery log
+        row is written when the send completes.
+        """
+        # kwargs is reused across devices by the caller, so send a copy
+        future = self._sender.submit(
+            super()._deliver,
+            handler, config, message, dict(kwargs), subscription, event_type, event_data, device_id,
+            attempt,
+            priority=resolve_priority(event_type, subscription),
+            channel_key=subscription.channel_id,
+            event_type=event_type,
+            dag_id=event_data.get("dag_id"),
+        )
+        self._pending.append(future)
+        return future
+
+    def _send_outcome(self, channel, results) -> str:
+        """Keep the queued sends for ``_send_notification``; their results are not known yet."""
+        self._queued = list(results)
+        return "queued"
+
+    def take_sends(self) -> Tuple[List[Future], List[Future]]:
+        """
+        Hand over the sends queued since the last call.
+
+        Returns:
+            The sends, and the futures of the callbacks recording their outcomes
+        """
+        sends, self._pending = self._pending, []
+        recorded, self._completions = self._completions, []
+        return sends, recorded
+
+    def wait_for_sends(self) -> int:
+        """Block until all queued sends finish. Returns the number that failed."""
+        sends, recorded = self.take_sends()
+        failed = _count_failed(sends)
+        # Outcomes are recorded by callbacks that run after the sends' results are set
+        wait(recorded)
+        return failed
+
+
+def _count_failed(sends: List[Future]) -> int:
+    """Wait for ``sends`` and count the failed ones, logging those that raised."""
+    failed = 0
+    for send in sends:
+        try:
+            if not send.result():
+                failed += 1
+        except Exception as e:
+            logger.error(f"Error in queued send: {str(e)}")
+            failed += 1
+    return failed
+
+
+def _chain(source: Future, target: Future) -> None:
+    """Complete ``target`` like ``source`` once it is done."""
+    def copy(done: Future) -> None:
+        error = done.exception()
+        if error is not None:
+            target.set_exception(error)
+        else:
+            target.set_result(done.result())
+
+    source.add_done_callback(copy)
+
+
+def _send_result(send: Future) -> bool:
+    """Whether a queued send succeeded; one that raised is logged by ``_count_failed``."""
+    try:
+        return bool(send.result())
+    except Exception:
+        return False
+
+
+def _when_done(futures: List[Future], callback: Callable[[], None]) -> Future:
+    """Run ``callback`` once all ``futures`` are done; the returned future is set after it."""
+    done = Future()
+    if not futures:
+        callback()
+        done.set_result(None)
+        return done
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def completed(_) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            callback()
+        finally:
+            done.set_result(None)
+
+    for future in futures:
+        future.add_done_callback(completed)
+    return done
+
+
+def _observe_send(timer: Timer, outcome: str, labels: Dict[str, str]) -> None:
+    """Record a subscription's outcome, as ``timed`` does for the base dispatcher."""
+    metrics.NOTIFICATION_TOTAL.labels(outcome=outcome, **labels).inc()
+    metrics.NOTIFICATION_SECONDS.labels(outcome=outcome, **labels).observe(timer.elapsed())
+
+
+# Per-process dispatcher and completion queue, set up by the pool initializer
+_process_dispatcher: Optional[WorkerDispatcher] = None
+_completed = None
+
+
+def _reset_inherited_connections() -> None:
+    """Drop DB connections inherited from the parent process over fork."""
+    from airflow import settings
+
+    if settings.engine is None:
+        return
+    try:
+        settings.engine.dispose(close=False)
+    except TypeError:  # SQLAlchemy < 1.4.33
+        settings.engine.dispose()
+
+
+def _init_process(send_concurrency: int, dispatcher_kwargs: Optional[Dict[str, Any]] = None,
+                  pooled: bool = True, completed=None) -> None:
+    """Set up the dispatcher of a pool process (or of the main process when inline)."""
+    global _process_dispatcher, _completed
+    if pooled:
+        # The parent coordinates shutdown and drains the pool
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        _reset_inherited_connections()
+    _process_dispatcher = WorkerDispatcher(LaneSender(send_concurrency), **(dispatcher_kwargs or {}))
+    _completed = completed
+    # Sends of one message to many recipients may now share a provider call
+    batching.concurrent_senders = send_concurrency > 1
+
+
+def _dispatch_batch(batch_id: int, events: List[Tuple[EventType, Mapping[str, Any], int]]) -> int:
+    """
+    Route and render a batch of ``(event type, event data, attempt)`` events and
+    queue their sends in the current process.
+
+    Returns once the sends are queued, so the process can take the next batch
+    while they run. When all of them are done, ``(batch_id, failed sends)`` is
+    put on the completion queue read by the parent.
+
+    Returns:
+        int: Number of sends queued
+    """
+    # Route higher-priority events first so their sends are queued first
+    events = sorted(events, key=lambda event: priority_rank(resolve_priority(event[0])))
+    for event_type, event_data, attempt in events:
+        _process_dispatcher.dispatch(event_type, event_data, attempt)
+    sends, recorded = _process_dispatcher.take_sends()
+
+    def completed() -> None:
+        failed = _count_failed(sends)
+        # Pool processes exit without running atexit handlers, so flush per batch
+        _process_dispatcher.flush()
+        _completed.put((batch_id, failed))
+
+    _when_done(sends + recorded, completed)
+    return len(sends)
+
+
+class ProbeServer:
+    """Serves ``/healthz`` (main loop alive) and ``/readyz`` (accepting events)."""
+
+    def __init__(self, worker: "DispatchWorker", port: int):
+        self._worker = worker
+        self._server = ThreadingHTTPServer(("0.0.0.0", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="notification-probes", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        worker = self._worker
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/healthz":
+                    ok = worker.is_healthy()
+                elif self.path == "/readyz":
+                    ok = worker.is_ready()
+                else:
+                    self.send_error(404)
+                    return
+                body = json.dumps({"status": "ok" if ok else "unavailable", **worker.status()}).encode()
+                self.send_response(200 if ok else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class DispatchWorker:
+    """
+    Dispatch daemon consuming an event source with a process pool.
+
+    Args:
+        source: Where events come from
+        processes: Pool size; 0 dispatches in the main process (tests, debugging)
+        send_concurrency: Concurrent handler sends per process
+        batch_size: Maximum events handed to a process at once; a process queues a
+            batch's sends and takes the next batch while they run
+        poll_interval: Seconds to wait for events before re-checking for shutdown
+        drain_timeout: Seconds to wait for in-flight batches on shutdown
+        probe_port: Port for health/readiness probes; 0 picks a free port, None disables
+        dispatcher_kwargs: Extra arguments for each process's dispatcher
+        sla_tracker: Tracker whose due SLA misses are dispatched with the events
+    """
+
+    def __init__(
+        self,
+        source: EventSource,
+        processes: Optional[int] = None,
+        send_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        drain_timeout: Optional[int] = None,
+        probe_port: Optional[int] = None,
+        dispatcher_kwargs: Optional[Dict[str, Any]] = None,
+        sla_tracker: Optional[SlaTracker] = None,
+    ):
+        self.source = source
+        self.sla_tracker = sla_tracker
+        self.processes = config.WORKER_PROCESSES if processes is None else processes
+        self.send_concurrency = send_concurrency or config.WORKER_SEND_CONCURRENCY
+        self.batch_size = batch_size or config.WORKER_BATCH_SIZE
+        self.poll_interval = poll_interval or config.WORKER_POLL_INTERVAL
+        self.drain_timeout = config.WORKER_DRAIN_TIMEOUT if drain_timeout is None else drain_timeout
+        self.dispatcher_kwargs = dispatcher_kwargs
+        # Claim events until every process's lanes could be full (each event queues
+        # at least one send); overflow beyond that is handled by the overflow policies.
+        # Draining that many can take longer than an outbox lease, so the leases of
+        # in-flight events are renewed while they wait (see _renew_leases)
+        lane_capacity = config.LANE_CAPACITY or self.batch_size * 2
+        self.max_inflight = max(1, self.processes) * max(lane_capacity, self.batch_size * 2)
+        # Task processes only read the routing snapshot, so the worker keeps it fresh
+        # even while no events arrive
+        kwargs = dispatcher_kwargs or {}
+        routing_snapshot_path = kwargs.get("routing_snapshot_path")
+        if routing_snapshot_path is None:
+            routing_snapshot_path = config.ROUTING_SNAPSHOT_PATH
+        self._routing = SharedRouting(routing_snapshot_path) if routing_snapshot_path else None
+        self._session_factory = kwargs.get("session_factory") or AirflowSession
+
+        self._stopping = threading.Event()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._completed = None
+        # Batches by id until all of their sends are done, and the calls queuing them
+        self._inflight: Dict[int, List[QueuedEvent]] = {}
+        self._inflight_events = 0
+        self._queuing: Dict[Future, int] = {}
+        self._next_batch_id = 0
+        self._heartbeat = time.monotonic()
+        self._renewed_at = time.monotonic()
+        self._started = False
+        self._probe = ProbeServer(self, probe_port) if probe_port is not None else None
+        self.dispatched = 0
+        self.failed_sends = 0
+
+    def stop(self, *args) -> None:
+        """Stop taking new events and drain; safe to call from a signal handler."""
+        if not self._stopping.is_set():
+            logger.info("Dispatch worker stopping, draining in-flight events")
+        self._stopping.set()
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() - self._heartbeat < max(30.0, self.poll_interval * 10)
+
+    def is_ready(self) -> bool:
+        return self._started and not self._stopping.is_set() and self.source.ready
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "inflight_batches": len(self._inflight),
+            "inflight_events": self._inflight_events,
+            "dispatched": self.dispatched,
+            "failed_sends": self.failed_sends,
+            "draining": self._stopping.is_set(),
+        }
+
+    def run(self) -> None:
+        """Run until ``stop()`` is called or a termination signal arrives."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        if self.processes > 0:
+            self._completed = multiprocessing.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_process,
+                initargs=(self.send_concurrency, self.dispatcher_kwargs, True, self._completed),
+            )
+        else:
+            self._completed = queue.Queue()
+            _init_process(self.send_concurrency, self.dispatcher_kwargs, False, self._completed)
+
+        if self._probe:
+            self._probe.start()
+        self._started = True
+        logger.info(
+            f"Dispatch worker started: {self.processes} processes, "
+            f"{self.send_concurrency} concurrent sends per process"
+        )
+
+        try:
+            while not self._stopping.is_set():
+                self._heartbeat = time.monotonic()
+                self._renew_leases()
+                self._refresh_routing()
+                room = self.max_inflight - self._inflight_events
+                if room <= 0:
+                    self._collect(timeout=self.poll_interval)
+                    continue
+
+                batch = self.source.get_batch(min(self.batch_size, room), self.poll_interval)
+                if self.sla_tracker is not None:
+                    batch.extend(QueuedEvent(*miss) for miss in self.sla_tracker.poll())
+                if batch:
+                    self._submit(batch)
+                self._collect(timeout=0)
+        finally:
+            self._drain()
+            if self.sla_tracker is not None:
+                self.sla_tracker.close()
+
+    def _submit(self, batch: List[QueuedEvent]) -> None:
+        batch_id = self._next_batch_id
+        self._next_batch_id += 1
+        self._inflight[batch_id] = batch
+        self._inflight_events += len(batch)
+
+        events = [(event.event_type, event.event_data, event.attempt) for event in batch]
+        if self._pool is None:
+            future = Future()
+            try:
+                future.set_result(_dispatch_batch(batch_id, events))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._pool.submit(_dispatch_batch, batch_id, events)
+        self._queuing[future] = batch_id
+
+    def _collect(self, timeout: float) -> None:
+        if not self._inflight:
+            return
+        for future in [future for future in self._queuing if future.done()]:
+            batch_id = self._queuing.pop(future)
+            if future.exception() is not None:
+                # Not acknowledged: the outbox lease expires and the batch is retried
+                batch = self._finish(batch_id)
+                logger.error(
+                    f"Error dispatching batch of {len(batch)} events: {str(future.exception())}"
+                )
+
+        completions = []
+        try:
+            completions.append(self._completed.get(timeout=timeout) if timeout > 0
+                               else self._completed.get_nowait())
+            while True:
+                completions.append(self._completed.get_nowait())
+        except queue.Empty:
+            pass
+        for batch_id, failed in completions:
+            batch = self._finish(batch_id)
+            if batch is None:
+                continue
+            self.failed_sends += failed
+            self.source.ack(batch)
+            self.dispatched += len(batch)
+
+    def _renew_leases(self) -> None:
+        # Renew well before the lease runs out, so a batch claimed just after one
+        # renewal is still renewed in time by the next
+        lease = self.source.lease_seconds
+        if not lease or not self._inflight or time.monotonic() - self._renewed_at < lease / 3:
+            return
+        self._renewed_at = time.monotonic()
+        self.source.renew([event for batch in self._inflight.values() for event in batch])
+
+    def _refresh_routing(self) -> None:
+        if self._routing is None:
+            return
+        session = self._session_factory()
+        try:
+            # Rebuilds the file only when it is due
+            self._routing.current(session)
+        finally:
+            session.close()
+
+    def _finish(self, batch_id: int) -> Optional[List[QueuedEvent]]:
+        batch = self._inflight.pop(batch_id, None)
+        if batch is not None:
+            self._inflight_events -= len(batch)
+        return batch
+
+    def _drain(self) -> None:
+        deadline = time.monotonic() + self.drain_timeout
+        while self._inflight and time.monotonic() < deadline:
+            self._renew_leases()
+            self._collect(timeout=min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        if self._inflight:
+            logger.warning(f"Drain timeout reached with {len(self._inflight)} batches in flight")
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=not self._inflight)
+        elif _process_dispatcher is not None:
+            _process_dispatcher.flush()
+        self.source.close()
+        if self._probe:
+            self._probe.stop()
+        self._started = False
+        logger.info(f"Dispatch worker stopped after {self.dispatched} events")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m airflow_notification_plugin.worker",
+        description="Run the standalone notification dispatch worker.",
+    )
+    parser.add_argument("--source", choices=["outbox", "socket"], default="outbox",
+                        help="Event source (default: outbox)")
+    parser.add_argument("--socket-path", default=config.WORKER_SOCKET_PATH,
+                        help="Unix socket path for the socket source")
+    parser.add_argument("--processes", type=int, default=config.WORKER_PROCESSES)
+    parser.add_argument("--send-concurrency", type=int, default=config.WORKER_SEND_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=config.WORKER_BATCH_SIZE)
+    parser.add_argument("--drain-timeout", type=int, default=config.WORKER_DRAIN_TIMEOUT)
+    parser.add_argument("--probe-port", type=int, default=config.WORKER_PROBE_PORT,
+                        help="Port for /healthz and /readyz; negative disables")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=config.LOG_LEVEL)
+
+    if args.source == "socket":
+        source = UnixSocketSource(args.socket_path)
+    else:
+        source = OutboxSource()
+
+    worker = DispatchWorker(
+        source,
+        processes=args.processes,
+        send_concurrency=args.send_concurrency,
+        batch_size=args.batch_size,
+        drain_timeout=args.drain_timeout,
+        probe_port=args.probe_port if args.probe_port >= 0 else None,
+        sla_tracker=SlaTracker() if config.SLA_TRACKING_ENABLED else None,
+    )
+    worker.run()
+    return 0
@@ -0,0 +1,7 @@
+"""Entry point for ``python -m airflow_notification_plugin.worker``."""
+
+import sys
+
+from airflow_notification_plugin.worker import main
+
+sys.exit(main())
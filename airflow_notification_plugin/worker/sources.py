@@ -0,0 +1,280 @@
+"""Event sources consumed by the standalone dispatch worker."""
+
+import json
+import logging
+import os
+import queue
+import socket
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy import case, or_
+
+from airflow_notification_plugin.config import config
+from airflow_notification_plugin.dispatchers.lanes import priority_rank, resolve_priority
+from airflow_notification_plugin.events import decode_event
+from airflow_notification_plugin.models import EventType, NotificationOutbox
+from airflow_notification_plugin.transport import decode_event_data
+
+logger = logging.getLogger(__name__)
+
+# Largest datagram accepted on the Unix socket (see transport.sidecar)
+MAX_DATAGRAM_SIZE = 65536
+# Outbox ids per UPDATE when renewing leases, to keep IN lists bounded
+RENEW_CHUNK_SIZE = 500
+
+
+class QueuedEvent(NamedTuple):
+    """An event taken from a source; ``token`` identifies it for ``ack``.
+
+    ``attempt`` is 1 the first time an event is dispatched and counts up when
+    a source hands it out again (an outbox row whose lease ran out).
+    """
+    event_type: EventType
+    event_data: Mapping[str, Any]
+    token: Any = None
+    attempt: int = 1
+
+
+class EventSource(ABC):
+    """Abstract base class for worker event sources."""
+
+    # Whether the source is ready to serve events (used by the readiness probe)
+    ready = True
+
+    # Seconds after which an unacknowledged event is handed out again; None if never
+    lease_seconds: Optional[float] = None
+
+    @abstractmethod
+    def get_batch(self, max_items: int, timeout: float) -> List[QueuedEvent]:
+        """
+        Wait up to ``timeout`` seconds for events and return at most ``max_items``.
+
+        Returns an empty list if nothing arrived in time.
+        """
+        pass
+
+    def ack(self, events: List[QueuedEvent]) -> None:
+        """Mark events as dispatched. Sources without redelivery ignore this."""
+        pass
+
+    def renew(self, events: List[QueuedEvent]) -> None:
+        """Extend the leases of events still being dispatched. Sources without leases ignore this."""
+        pass
+
+    def close(self) -> None:
+        """Release the source's resources."""
+        pass
+
+
+class InMemorySource(EventSource):
+    """Source backed by a ``queue.Queue``, for tests and embedding."""
+
+    def __init__(self, maxsize: int = 0):
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event_type: EventType, event_data: Mapping[str, Any]) -> None:
+        self._queue.put(QueuedEvent(event_type, event_data))
+
+    def get_batch(self, max_items: int, timeout: float) -> List[QueuedEvent]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+
+class UnixSocketSource(EventSource):
+    """
+    Source receiving fire-and-forget datagrams on a Unix domain socket.
+
+    Each datagram is either a binary ``NotificationEvent`` (see
+    ``events.encode_event``) or a JSON object
+    ``{"event_type": "...", "event_data": {...}}``.
+    Events are lost if the worker dies before dispatching them; use the outbox
+    source where that matters.
+
+    Whoever can write to the socket can have alerts sent with the channels'
+    credentials, so it is made accessible to its owner only (mode 0600), and
+    a missing parent directory is created with mode 0700.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.WORKER_SOCKET_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        os.chmod(self.path, 0o600)
+
+    def get_batch(self, max_items: int, timeout: float) -> List[QueuedEvent]:
+        batch = []
+        self._socket.settimeout(timeout)
+        try:
+            while len(batch) < max_items:
+                event = self._decode(self._socket.recv(MAX_DATAGRAM_SIZE))
+                if event is not None:
+                    batch.append(event)
+                # Only the first receive waits; then drain what is already queued
+                self._socket.setblocking(False)
+        except (socket.timeout, BlockingIOError):
+            pass
+        return batch
+
+    def _decode(self, datagram: bytes) -> Optional[QueuedEvent]:
+        try:
+            if datagram[:1] != b"{":
+                event_type, event = decode_event(datagram)
+                return QueuedEvent(event_type, event)
+            message = json.loads(datagram)
+            return QueuedEvent(EventType(message["event_type"]), message["event_data"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding malformed event datagram: {str(e)}")
+            return None
+
+    def close(self) -> None:
+        self._socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class OutboxSource(EventSource):
+    """
+    Source polling the ``notification_outbox`` table.
+
+    Rows are claimed in batches with ``SELECT ... FOR UPDATE SKIP LOCKED``
+    (where the database supports it) so several workers can share one outbox,
+    and deleted on ``ack``. Claims older than ``lease_seconds`` are considered
+    abandoned by a crashed worker and are claimed again, so the worker
+    ``renew``s the claims of rows still queued in its lanes well before then.
+
+    Rows are claimed by the priority lane of their event type, then oldest
+    first, so a failure alert does not wait behind a backlog of successes;
+    rows older than ``NOTIFICATION_LANE_MAX_WAIT`` go first whatever their lane.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+    ):
+        if session_factory is None:
+            from airflow.settings import Session as AirflowSession
+            session_factory = AirflowSession
+        self._session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or config.OUTBOX_LEASE_SECONDS
+
+    def get_batch(self, max_items: int, timeout: float) -> List[QueuedEvent]:
+        batch = self._claim(max_items)
+        if not batch:
+            time.sleep(timeout)
+        return batch
+
+    def _claim(self, max_items: int) -> List[QueuedEvent]:
+        session = self._session_factory()
+        try:
+            now = datetime.utcnow()
+            rows = session.query(NotificationOutbox).filter(
+                or_(
+                    NotificationOutbox.claimed_at.is_(None),
+                    NotificationOutbox.claimed_at < now - timedelta(seconds=self.lease_seconds),
+                )
+            ).order_by(
+                self._priority(now), NotificationOutbox.id
+            ).limit(max_items).with_for_update(skip_locked=True).all()
+
+            batch = []
+            for row in rows:
+                row.claimed_at = now
+                row.claimed_by = self.worker_id
+                row.attempts = (row.attempts or 0) + 1
+                try:
+                    batch.append(QueuedEvent(
+                        row.event_type, decode_event_data(row.payload), row.id, row.attempts
+                    ))
+                except ValueError:
+                    logger.error(f"Discarding outbox row {row.id} with invalid payload")
+                    session.delete(row)
+            session.commit()
+            return batch
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming outbox events: {str(e)}")
+            return []
+        finally:
+            session.close()
+
+    def _priority(self, now: datetime):
+        """Sort key of outbox rows: overdue rows, then by lane, highest first."""
+        overdue = NotificationOutbox.created_at < now - timedelta(seconds=config.LANE_MAX_WAIT_SECONDS)
+        ranks = [
+            (NotificationOutbox.event_type == event_type, priority_rank(resolve_priority(event_type)))
+            for event_type in EventType
+        ]
+        return case((overdue, -1), *ranks)
+
+    def renew(self, events: List[QueuedEvent]) -> None:
+        ids = [event.token for event in events if event.token is not None]
+        if not ids:
+            return
+        session = self._session_factory()
+        try:
+            renewed = 0
+            now = datetime.utcnow()
+            for start in range(0, len(ids), RENEW_CHUNK_SIZE):
+                # Rows another worker claimed meanwhile are no longer ours to renew
+                renewed += session.query(NotificationOutbox).filter(
+                    NotificationOutbox.id.in_(ids[start:start + RENEW_CHUNK_SIZE]),
+                    NotificationOutbox.claimed_by == self.worker_id,
+                ).update({NotificationOutbox.claimed_at: now}, synchronize_session=False)
+            session.commit()
+            if renewed < len(ids):
+                logger.warning(
+                    f"{len(ids) - renewed} in-flight outbox events were claimed by another worker"
+                )
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error renewing outbox leases: {str(e)}")
+        finally:
+            session.close()
+
+    def ack(self, events: List[QueuedEvent]) -> None:
+        # Events added by the worker itself (e.g. SLA misses) have no outbox row
+        ids = [event.token for event in events if event.token is not None]
+        if not ids:
+            return
+        session = self._session_factory()
+        try:
+            session.query(NotificationOutbox).filter(
+                NotificationOutbox.id.in_(ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error acknowledging outbox events: {str(e)}")
+        finally:
+            session.close()
+
+
+def create_source(kind: str, **kwargs) -> EventSource:
+    """Create a source by name: ``outbox``, ``socket`` or ``memory``."""
+    sources = {
+        "outbox": OutboxSource,
+        "socket": UnixSocketSource,
+        "memory": InMemorySource,
+    }
+    if kind not in sources:
+        raise ValueError(f"Unknown event source: {kind}. Must be one of: {sorted(sources)}")
+    return sources[kind](**kwargs)
@@ -0,0 +1,133 @@
+"""Fixtures for the dispatcher benchmarks: stub HTTP server and seeded SQLite database."""
+
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.stub_server import StubServer
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """Stub provider API; latency and error rate come from the environment."""
+    server = StubServer(
+        latency_ms=float(os.getenv("BENCH_STUB_LATENCY_MS", "0")),
+        error_rate=float(os.getenv("BENCH_STUB_ERROR_RATE", "0")),
+    ).start()
+    yield server
+    server.stop()
+
+
+class QueryCounter:
+    """Counts SQL statements executed through an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+class SeededDatabase:
+    """SQLite database seeded with channels, subscriptions, templates, devices and contacts.
+
+    ``sms_subscriptions`` is the number of subscriptions on SMS channels, i.e.
+    the SMS requests the stub should see per event.
+    """
+
+    def __init__(self, path, stub_url, subscriptions, channels, templates, devices):
+        from airflow_notification_plugin.models import Base
+
+        self.engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(self.engine)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.dag_id = "bench_dag"
+        self.sms_subscriptions = 0
+        self._seed(stub_url, subscriptions, channels, templates, devices)
+        self.queries = QueryCounter(self.engine)
+
+    def _seed(self, stub_url, subscriptions, channels, templates, devices):
+        from airflow_notification_plugin.models import (
+            ChannelType,
+            DagSubscription,
+            DeviceRegistration,
+            EventType,
+            NotificationChannel,
+            NotificationTemplate,
+            PlatformType,
+            UserContact,
+        )
+
+        channel_configs = [
+            (ChannelType.SLACK, {"webhook_url": f"{stub_url}/slack"}),
+            (ChannelType.YOUDU, {"webhook_url": f"{stub_url}/youdu", "app_id": "bench"}),
+            (ChannelType.FCM, {"server_key": "bench", "fcm_url": f"{stub_url}/fcm"}),
+            (ChannelType.SMS, {"api_url": f"{stub_url}/sms", "api_key": "bench"}),
+        ]
+
+        session = self.session_factory()
+        channel_rows = []
+        for i in range(channels):
+            channel_type, channel_config = channel_configs[i % len(channel_configs)]
+            channel = NotificationChannel(
+                name=f"bench_{channel_type.value}_{i}",
+                channel_type=channel_type,
+                config=json.dumps(channel_config),
+            )
+            session.add(channel)
+            channel_rows.append(channel)
+        session.flush()
+
+        event_types = list(EventType)
+        combos = [(e, c) for c in ChannelType for e in event_types]
+        for i in range(templates):
+            event_type, channel_type = combos[i % len(combos)]
+            session.add(NotificationTemplate(
+                name=f"bench_template_{i}",
+                event_type=event_type,
+                channel_type=channel_type,
+                template_content="[{{ state }}] {{ dag_id }}.{{ task_id }} try {{ try_number }}",
+            ))
+
+        for i in range(subscriptions):
+            user_id = f"user{i}@example.com"
+            channel = channel_rows[i % len(channel_rows)]
+            session.add(DagSubscription(
+                user_id=user_id,
+                dag_id=self.dag_id,
+                event_type=EventType.TASK_FAILED,
+                channel_id=channel.id,
+            ))
+            if channel.channel_type == ChannelType.SMS:
+                self.sms_subscriptions += 1
+            # SMS sends are rejected without a phone number from the contact directory
+            session.add(UserContact(user_id=user_id, phone_number=f"+1555{i:07d}", email=user_id))
+            for d in range(devices):
+                session.add(DeviceRegistration(
+                    device_token=f"token-{i}-{d}",
+                    platform_type=PlatformType.ANDROID if d % 2 else PlatformType.PWA,
+                    user_id=user_id,
+                ))
+
+        session.commit()
+        session.close()
+
+    def event_data(self, n: int = 0) -> dict:
+        return {
+            "dag_id": self.dag_id,
+            "task_id": f"task_{n % 50}",
+            "run_id": "scheduled__2024-01-01T00:00:00+00:00",
+            "execution_date": "2024-01-01 00:00:00+00:00",
+            "state": "failed",
+            "try_number": 1,
+            "max_tries": 3,
+            "duration": 12.5,
+            "hostname": "worker-1",
+        }
+
+    def close(self):
+        self.engine.dispose()
@@ -0,0 +1,94 @@
+"""Local HTTP server standing in for the Slack, Youdu, SMS and FCM APIs."""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Success response body per provider path
+RESPONSES = {
+    "/slack": (200, b"ok", "text/plain"),
+    "/youdu": (200, b'{"errcode": 0}', "application/json"),
+    "/sms": (201, b'{"status": "queued"}', "application/json"),
+    "/fcm": (200, b'{"success": 1, "failure": 0}', "application/json"),
+}
+
+
+class StubServer:
+    """
+    Threaded HTTP stub with configurable latency and error injection.
+
+    ``latency_ms`` delays every response and ``error_rate`` (0.0 - 1.0) makes
+    that fraction of requests fail with HTTP 500. Both can be changed while the
+    server is running. Request counts per path are kept in ``requests``.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                stub._count(self.path)
+
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000.0)
+
+                if self.path not in RESPONSES:
+                    status, body, content_type = 404, b"not found", "text/plain"
+                elif stub._should_fail():
+                    status, body, content_type = 500, json.dumps({"error": "injected"}).encode(), "application/json"
+                else:
+                    status, body, content_type = RESPONSES[self.path]
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -37,9 +37,22 @@ setup(
         "jinja2>=2.11.0",
     ],
     extras_require={
+        "metrics": [
+            "prometheus-client>=0.12.0",
+        ],
+        "apns": [
+            "httpx[http2]>=0.23.0",
+            "PyJWT>=2.0.0",
+            "cryptography>=3.4",
+        ],
+        "tracing": [
+            "opentelemetry-api>=1.0.0",
+        ],
         "dev": [
             "pytest>=6.0.0",
             "pytest-cov>=2.10.0",
+            "pytest-benchmark>=3.4.0",
+            "aiosmtpd>=1.4.0",
             "black>=21.0",
             "flake8>=3.8.0",
         ],
@@ -48,6 +61,19 @@ setup(
         "airflow.plugins": [
             "notification_hub = airflow_notification_plugin:AirflowNotificationPlugin",
         ],
+        "console_scripts": [
+            "airflow-notification-worker = airflow_notification_plugin.worker:main",
+        ],
+        "airflow_notification_plugin.handlers": [
+            "slack = airflow_notification_plugin.dispatchers.handlers:SlackHandler",
+            "sms = airflow_notification_plugin.dispatchers.handlers:SMSHandler",
+            "youdu = airflow_notification_plugin.dispatchers.handlers:YouduHandler",
+            "fcm = airflow_notification_plugin.dispatchers.handlers:FCMHandler",
+            "apns = airflow_notification_plugin.dispatchers.apns:APNSHandler",
+            "webpush = airflow_notification_plugin.dispatchers.webpush:WebPushHandler",
+            "email = airflow_notification_plugin.dispatchers.smtp:EmailHandler",
+            "webhook = airflow_notification_plugin.dispatchers.webhook:WebhookHandler",
+        ],
     },
     include_package_data=True,
     package_data={
@@ -0,0 +1,16 @@
+"""Shared fixtures for the notification plugin tests."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Session factory bound to a fresh SQLite database with all plugin tables."""
+    from airflow_notification_plugin.models import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'notifications.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
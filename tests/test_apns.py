@@ -0,0 +1,197 @@
+"""Tests for the HTTP/2 APNS handler against a local HTTP/2 stub server."""
+
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+h2_connection = pytest.importorskip("h2.connection")
+import h2.config  # noqa: E402
+import h2.events  # noqa: E402
+
+GONE_TOKEN = "gone"
+
+
+class APNsStub:
+    """
+    Cleartext HTTP/2 server answering like APNs.
+
+    Every request gets 200 except device token ``gone``, which gets
+    410 Unregistered. Connections and request headers are recorded.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._socket.getsockname()
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock) -> None:
+        conn = h2_connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        headers = {}
+        with sock:
+            while True:
+                data = sock.recv(65535)
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers[event.stream_id] = {
+                            _text(name): _text(value) for name, value in event.headers
+                        }
+                    elif isinstance(event, h2.events.DataReceived):
+                        conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id
+                        )
+                    elif isinstance(event, h2.events.StreamEnded):
+                        self._respond(conn, event.stream_id, headers.pop(event.stream_id))
+                sock.sendall(conn.data_to_send())
+
+    def _respond(self, conn, stream_id, headers) -> None:
+        with self._lock:
+            self.requests.append(headers)
+        if headers[":path"].endswith("/" + GONE_TOKEN):
+            status, body = "410", json.dumps({"reason": "Unregistered"}).encode()
+        else:
+            status, body = "200", b""
+        conn.send_headers(stream_id, [(":status", status), ("apns-id", str(stream_id))])
+        conn.send_data(stream_id, body, end_stream=True)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@pytest.fixture
+def stub():
+    from airflow_notification_plugin.dispatchers import apns
+
+    server = APNsStub()
+    yield server
+    apns.close_clients()
+    server.close()
+
+
+@pytest.fixture
+def signing_key():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return key, pem
+
+
+def _channel_config(stub, pem):
+    return {
+        "team_id": "TEAM123456",
+        "key_id": "KEY1234567",
+        "private_key": pem,
+        "bundle_id": "com.example.airflow",
+        "apns_url": stub.url,
+    }
+
+
+def test_apns_sends_are_multiplexed_over_one_connection(stub, signing_key):
+    """Concurrent sends share one HTTP/2 connection and one cached provider token."""
+    import jwt
+
+    from airflow_notification_plugin.dispatchers.apns import APNSHandler
+
+    key, pem = signing_key
+    handler = APNSHandler()
+    channel_config = _channel_config(stub, pem)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(
+            lambda i: handler.send(channel_config, "Task failed", device_token=f"device{i}"),
+            range(100),
+        ))
+
+    assert all(results)
+    assert stub.connections == 1
+    assert len(stub.requests) == 100
+    tokens = {headers["authorization"] for headers in stub.requests}
+    assert len(tokens) == 1
+    token = tokens.pop().split(" ", 1)[1]
+    assert jwt.get_unverified_header(token)["kid"] == "KEY1234567"
+    claims = jwt.decode(token, key.public_key(), algorithms=["ES256"])
+    assert claims["iss"] == "TEAM123456"
+    assert stub.requests[0]["apns-topic"] == "com.example.airflow"
+
+
+def test_unregistered_apns_device_is_deactivated(session_factory, stub, signing_key, monkeypatch):
+    """A 410 Unregistered response deactivates the device registration."""
+    from airflow_notification_plugin.dispatchers import apns, handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        DeviceRegistration,
+        EventType,
+        NotificationChannel,
+        PlatformType,
+    )
+
+    monkeypatch.setitem(handlers.HANDLERS, "apns", apns.APNSHandler())
+    session = session_factory()
+    channel = NotificationChannel(
+        name="ios-push",
+        channel_type=ChannelType.APNS,
+        config=json.dumps(_channel_config(stub, signing_key[1])),
+    )
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="user@example.com",
+        dag_id="example_dag",
+        event_type=EventType.TASK_FAILED,
+        channel_id=channel.id,
+    ))
+    for token in ("active", GONE_TOKEN):
+        session.add(DeviceRegistration(
+            device_token=token, platform_type=PlatformType.IOS, user_id="user@example.com"
+        ))
+    session.commit()
+    session.close()
+
+    dispatcher = NotificationDispatcher(
+        session_factory, delivery_log=DeliveryLogBuffer(session_factory, enabled=False)
+    )
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "example_dag", "task_id": "load"})
+
+    session = session_factory()
+    active = {device.device_token: device.is_active for device in session.query(DeviceRegistration)}
+    session.close()
+    assert active == {"active": True, GONE_TOKEN: False}
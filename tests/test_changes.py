@@ -0,0 +1,139 @@
+"""Tests for change notifications and cache invalidation."""
+
+import json
+
+
+def test_polling_watcher_reports_each_change_once(session_factory):
+    """Callbacks run for the tables bumped since the previous check."""
+    from airflow_notification_plugin.changes import ChangeWatcher, notify_change
+
+    watcher = ChangeWatcher(check_seconds=0, listener="poll")
+    invalidated = []
+    watcher.subscribe("dag_subscription", lambda: invalidated.append("dag_subscription"))
+    watcher.subscribe("notification_template", lambda: invalidated.append("template"))
+
+    session = session_factory()
+    assert watcher.check(session) == set()
+
+    assert notify_change(session_factory(), "dag_subscription")
+    assert watcher.check(session) == {"dag_subscription"}
+    assert watcher.check(session) == set()
+    session.close()
+
+    assert invalidated == ["dag_subscription"]
+
+
+def test_only_long_lived_processes_listen(session_factory):
+    """Task processes poll; a listener whose connection fails is closed before polling."""
+    import os
+    from airflow_notification_plugin.changes import (
+        ChangeWatcher,
+        NotifyListener,
+        PollingListener,
+        create_listener,
+    )
+
+    class UnusedSession:
+        def get_bind(self):
+            raise AssertionError("a task process must not open a LISTEN connection")
+
+    assert isinstance(create_listener(UnusedSession(), "auto", long_lived=False), PollingListener)
+    assert isinstance(create_listener(UnusedSession(), "notify", long_lived=False), PollingListener)
+
+    class BrokenConnection:
+        closed = False
+
+        def poll(self):
+            raise OSError("server closed the connection unexpectedly")
+
+        def close(self):
+            self.closed = True
+
+    listener = NotifyListener.__new__(NotifyListener)
+    listener._connection = connection = BrokenConnection()
+    watcher = ChangeWatcher(check_seconds=0, long_lived=True)
+    watcher._pid, watcher._listener = os.getpid(), listener
+    session = session_factory()
+    assert watcher.check(session) == set()
+    session.close()
+
+    assert connection.closed
+    assert isinstance(watcher._listener, PollingListener)
+
+
+def test_dispatcher_drops_snapshot_after_admin_edit(session_factory, tmp_path, monkeypatch):
+    """A deactivated subscription stops receiving notifications before the snapshot expires."""
+    from airflow_notification_plugin.changes import notify_change
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    sent = []
+
+    class RecordingHandler(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            sent.append(kwargs["user_id"])
+            return True
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", RecordingHandler())
+    session = session_factory()
+    channel = NotificationChannel(name="alerts", channel_type=ChannelType.SLACK, config="{}")
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="alice", dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id
+    ))
+    session.commit()
+    # Built by the dispatch worker; the task process's dispatcher only reads it
+    path = str(tmp_path / "routing.snap")
+    SharedRouting(path).current(session)
+
+    dispatcher = NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path=path,
+    )
+    dispatcher._changes.check_seconds = 0
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+    assert dispatcher._routing.snapshot is not None
+
+    session.query(DagSubscription).update({DagSubscription.is_active: False})
+    session.commit()
+    notify_change(session, DagSubscription.__tablename__)
+    session.close()
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert sent == ["alice"]
+
+
+def test_bump_creates_and_increments_rows_in_one_statement(session_factory):
+    """Each generation is upserted, so first edits racing each other cannot collide on insert."""
+    from sqlalchemy import event
+    from airflow_notification_plugin.changes import bump
+    from airflow_notification_plugin.models import NotificationMeta
+
+    session = session_factory()
+    statements = []
+    event.listen(
+        session.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    for _ in range(2):
+        bump(session, "notification_channel")
+        session.commit()
+
+    assert len(statements) == 4
+    assert all("ON CONFLICT (table_name) DO UPDATE" in statement for statement in statements)
+    generations = dict(session.query(NotificationMeta.table_name, NotificationMeta.generation))
+    assert generations == {"*": 2, "notification_channel": 2}
+    session.close()
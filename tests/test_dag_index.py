@@ -0,0 +1,91 @@
+"""Tests for tag and owner subscriptions."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def dag_tables(session_factory):
+    from airflow.models import DagModel, DagTag
+
+    engine = session_factory.kw["bind"]
+    DagModel.__table__.create(engine)
+    DagTag.__table__.create(engine)
+    return session_factory
+
+
+def _add_dag(session, dag_id, tags=(), owners="airflow", parsed=None):
+    from airflow.models import DagModel, DagTag
+
+    session.merge(DagModel(
+        dag_id=dag_id, owners=owners, is_active=True, last_parsed_time=parsed or datetime.now(timezone.utc)
+    ))
+    session.query(DagTag).filter(DagTag.dag_id == dag_id).delete()
+    for tag in tags:
+        session.add(DagTag(dag_id=dag_id, name=tag))
+    session.commit()
+
+
+def test_selector_index_follows_dag_parsing(dag_tables):
+    """Tag and owner subscriptions resolve through the index and pick up re-parsed DAGs."""
+    from airflow_notification_plugin.dispatchers.dag_index import SelectorIndex
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        MatchType,
+        NotificationChannel,
+    )
+
+    session = dag_tables()
+    channel = NotificationChannel(name="ops", channel_type=ChannelType.SLACK, config=json.dumps({}))
+    session.add(channel)
+    session.flush()
+    by_tag = DagSubscription(user_id="ops", dag_id="tier1", match_type=MatchType.TAG,
+                             event_type=EventType.DAG_FAILED, channel_id=channel.id)
+    by_owner = DagSubscription(user_id="ops", dag_id="finance", match_type=MatchType.OWNER,
+                               event_type=EventType.DAG_FAILED, channel_id=channel.id)
+    session.add_all([by_tag, by_owner])
+    session.commit()
+
+    first_parse = datetime.now(timezone.utc) - timedelta(minutes=5)
+    _add_dag(session, "billing", tags=["tier1"], owners="finance, airflow", parsed=first_parse)
+    _add_dag(session, "reports", tags=["tier2"], parsed=first_parse)
+
+    index = SelectorIndex(refresh_seconds=60, dag_refresh_seconds=0)
+    assert index.match(session, EventType.DAG_FAILED, "billing") == tuple(
+        sorted([by_tag.id, by_owner.id])
+    )
+    assert index.match(session, EventType.DAG_FAILED, "reports") == ()
+    assert index.match(session, EventType.TASK_FAILED, "billing") == ()
+
+    # reports is re-parsed with the tier1 tag
+    _add_dag(session, "reports", tags=["tier1"])
+    assert index.match(session, EventType.DAG_FAILED, "reports") == (by_tag.id,)
+    session.close()
+
+
+def test_deleted_and_deactivated_dags_leave_the_index(dag_tables):
+    """DAGs removed or deactivated without being re-parsed stop matching on the next refresh."""
+    from airflow.models import DagModel
+    from airflow_notification_plugin.dispatchers.dag_index import DagMetadataIndex
+
+    session = dag_tables()
+    for dag_id in ("billing", "reports", "payroll"):
+        _add_dag(session, dag_id, tags=["tier1"])
+
+    index = DagMetadataIndex()
+    assert index.refresh(session) == {"billing", "reports", "payroll"}
+
+    session.query(DagModel).filter(DagModel.dag_id == "reports").update({DagModel.is_active: False})
+    session.query(DagModel).filter(DagModel.dag_id == "payroll").delete()
+    session.commit()
+
+    # billing may be re-read too: it was parsed at the watermark
+    assert {"reports", "payroll"} <= index.refresh(session)
+    assert index.tags("billing") == frozenset({"tier1"})
+    assert index.tags("reports") == frozenset()
+    assert index.owners("payroll") == frozenset()
+    session.close()
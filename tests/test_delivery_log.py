@@ -0,0 +1,104 @@
+"""Tests for the buffered delivery log and its retention job."""
+
+from datetime import datetime, timedelta
+
+
+def _row(**overrides):
+    from airflow_notification_plugin.models import EventType, DeliveryStatus
+
+    row = {
+        "event_type": EventType.TASK_FAILED,
+        "dag_id": "example_dag",
+        "task_id": "example_task",
+        "status": DeliveryStatus.SENT,
+        "http_status": 200,
+        "latency_ms": 12.5,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_buffer_flushes_on_batch_size(session_factory):
+    """Rows stay in memory until the batch is full, then land in one insert."""
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.models import NotificationDelivery
+
+    buffer = DeliveryLogBuffer(session_factory, batch_size=3, flush_interval_ms=60000, enabled=True)
+    buffer.record(**_row())
+    buffer.record(**_row())
+
+    session = session_factory()
+    assert buffer.pending() == 2
+    assert session.query(NotificationDelivery).count() == 0
+
+    buffer.record(**_row())
+    assert buffer.pending() == 0
+    assert session.query(NotificationDelivery).count() == 3
+    assert session.query(NotificationDelivery).first().attempt == 1
+    session.close()
+
+
+def test_purge_deletes_in_chunks(session_factory):
+    """Only rows older than the retention window are deleted."""
+    from airflow_notification_plugin.dispatchers.delivery_log import (
+        DeliveryLogBuffer,
+        purge_delivery_log,
+    )
+    from airflow_notification_plugin.models import NotificationDelivery
+
+    old = datetime.utcnow() - timedelta(days=10)
+    buffer = DeliveryLogBuffer(session_factory, batch_size=100, enabled=True)
+    for _ in range(5):
+        buffer.record(**_row(created_at=old))
+    buffer.record(**_row())
+    buffer.flush()
+
+    deleted = purge_delivery_log(retention_days=7, chunk_size=2, session_factory=session_factory)
+
+    session = session_factory()
+    assert deleted == 5
+    assert session.query(NotificationDelivery).count() == 1
+    session.close()
+
+
+def test_dispatch_flushes_without_timer(session_factory, monkeypatch):
+    """Outside the worker rows are written by the dispatch itself, not by a timer thread."""
+    import threading
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+        NotificationDelivery,
+    )
+
+    class SentHandler(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            return True
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", SentHandler())
+    monkeypatch.setattr(threading, "Timer", None)
+    session = session_factory()
+    channel = NotificationChannel(name="alerts", channel_type=ChannelType.SLACK, config="{}")
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="alice", dag_id="example_dag", event_type=EventType.DAG_FAILED,
+        channel_id=channel.id,
+    ))
+    session.commit()
+
+    buffer = DeliveryLogBuffer(session_factory, batch_size=100, flush_interval_ms=60000, enabled=True)
+    dispatcher = NotificationDispatcher(
+        session_factory, delivery_log=buffer, routing_snapshot_path=""
+    )
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "example_dag"})
+
+    assert buffer.pending() == 0
+    assert session.query(NotificationDelivery).count() == 1
+    session.close()
@@ -0,0 +1,135 @@
+"""Tests for the notification dispatcher."""
+
+import json
+
+import pytest
+
+
+class RecordingHandler:
+    """Handler double that records every send."""
+
+    channel_type = "slack"
+
+    def __init__(self, success=True):
+        self.success = success
+        self.calls = []
+        self.last_status_code = 200
+
+    def _record_status_code(self, status_code):
+        pass
+
+    def send(self, config, message, **kwargs):
+        self.calls.append((config, message, kwargs))
+        return self.success
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    from airflow_notification_plugin.dispatchers import handlers
+
+    recording = RecordingHandler()
+    monkeypatch.setitem(handlers.HANDLERS, "slack", recording)
+    return recording
+
+
+@pytest.fixture
+def dispatcher(session_factory):
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+
+    delivery_log = DeliveryLogBuffer(session_factory, batch_size=1, enabled=True)
+    return NotificationDispatcher(session_factory, delivery_log=delivery_log)
+
+
+def _subscribe(session_factory, dag_id="example_dag", event_type=None, **fields):
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    session = session_factory()
+    channel = NotificationChannel(
+        name="alerts",
+        channel_type=ChannelType.SLACK,
+        config=json.dumps({"webhook_url": "http://localhost/hook"}),
+    )
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="user@example.com",
+        dag_id=dag_id,
+        event_type=event_type or EventType.TASK_FAILED,
+        channel_id=channel.id,
+        **fields
+    ))
+    session.commit()
+    session.close()
+
+
+def test_dispatch_renders_default_template_and_logs_delivery(session_factory, dispatcher, handler):
+    """A matching subscription is rendered, sent and recorded in the delivery log."""
+    from airflow_notification_plugin.models import EventType, NotificationDelivery, DeliveryStatus
+
+    _subscribe(session_factory)
+
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "example_dag", "task_id": "load"})
+
+    assert len(handler.calls) == 1
+    config, message, kwargs = handler.calls[0]
+    assert config == {"webhook_url": "http://localhost/hook"}
+    assert "load" in message and "example_dag" in message
+    assert kwargs["user_id"] == "user@example.com"
+
+    session = session_factory()
+    delivery = session.query(NotificationDelivery).one()
+    assert delivery.status == DeliveryStatus.SENT
+    assert delivery.http_status == 200
+    session.close()
+
+
+def test_dispatch_ignores_other_dags_and_events(session_factory, dispatcher, handler):
+    """Only subscriptions for the event's DAG and event type are notified."""
+    from airflow_notification_plugin.models import EventType
+
+    _subscribe(session_factory)
+
+    dispatcher.dispatch(EventType.TASK_SUCCESS, {"dag_id": "example_dag", "task_id": "load"})
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "other_dag", "task_id": "load"})
+
+    assert handler.calls == []
+
+
+def test_dispatch_matches_pattern_subscriptions(session_factory, dispatcher, handler):
+    """Glob subscriptions match every DAG id with the pattern."""
+    from airflow_notification_plugin.models import EventType, MatchType
+
+    _subscribe(session_factory, dag_id="etl_finance_*", match_type=MatchType.GLOB)
+
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "etl_finance_daily", "task_id": "load"})
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "etl_sales_daily", "task_id": "load"})
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "etl_finance_*", "task_id": "load"})
+
+    assert len(handler.calls) == 2
+
+
+def test_dispatch_skips_subscriptions_rejected_by_filter(session_factory, dispatcher, handler):
+    """A subscription's filter expression is applied before rendering."""
+    from airflow_notification_plugin.models import EventType
+
+    _subscribe(session_factory, filter_expression="duration > 1800")
+
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "example_dag", "duration": 60.0})
+    dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "example_dag", "duration": 3600.0})
+
+    assert len(handler.calls) == 1
+
+
+def test_each_device_platform_has_one_push_channel_type():
+    """A device is reached through exactly one push channel type, so it is never sent twice."""
+    from airflow_notification_plugin.dispatchers.dispatcher import PUSH_CHANNEL_PLATFORMS
+    from airflow_notification_plugin.models import PlatformType
+
+    platforms = [platform for served in PUSH_CHANNEL_PLATFORMS.values() for platform in served]
+    assert sorted(platforms, key=lambda p: p.value) == sorted(PlatformType, key=lambda p: p.value)
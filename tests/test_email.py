@@ -0,0 +1,150 @@
+"""Tests for the pooled SMTP email handler."""
+
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class RecordingSMTPHandler:
+    """aiosmtpd handler recording each transaction's connection, recipients and message."""
+
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.transactions = []
+        self._lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.transactions.append((session.peer, list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server():
+    from airflow_notification_plugin.dispatchers import smtp
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = RecordingSMTPHandler(refuse={"nobody@example.com"})
+    handler.port = port
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler
+    smtp.close_pools()
+    controller.stop()
+
+
+def _config(server):
+    return {
+        "host": "127.0.0.1",
+        "port": server.port,
+        "starttls": False,
+        "from_addr": "airflow@example.com",
+    }
+
+
+def test_email_reuses_pooled_connection(smtp_server):
+    """Sequential emails go over one SMTP connection; refused recipients fail alone."""
+    from airflow_notification_plugin.dispatchers import smtp
+    from airflow_notification_plugin.dispatchers.smtp import EmailHandler
+
+    handler = EmailHandler()
+    config = _config(smtp_server)
+
+    assert handler.send(config, "Task load failed", user_id="alice@example.com", dag_id="etl")
+    assert handler.send(config, "Task load retried", user_id="bob@example.com", dag_id="etl")
+    assert not handler.send(config, "Task load failed", user_id="nobody@example.com")
+    assert handler.last_status_code == 550
+
+    peers = {peer for peer, _, _ in smtp_server.transactions}
+    assert len(smtp_server.transactions) == 2 and len(peers) == 1
+    assert smtp.get_pool(config).connections_opened == 1
+    assert b"Subject: Airflow notification: etl" in smtp_server.transactions[0][2]
+
+
+def test_email_batches_recipients_of_the_same_message(smtp_server, monkeypatch):
+    """Concurrent sends of one message share SMTP transactions, each caller gets its outcome."""
+    from airflow_notification_plugin.dispatchers import smtp
+    from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+    from airflow_notification_plugin.dispatchers.smtp import EmailHandler
+
+    monkeypatch.setattr(smtp, "batcher", RecipientBatcher(wait_ms=200, concurrent=True))
+    handler = EmailHandler()
+    config = dict(_config(smtp_server), max_recipients=10)
+    recipients = [f"user{i}@example.com" for i in range(20)] + ["nobody@example.com"]
+
+    with ThreadPoolExecutor(max_workers=len(recipients)) as pool:
+        results = list(pool.map(
+            lambda recipient: handler.send(config, "DAG etl failed", user_id=recipient),
+            recipients,
+        ))
+
+    assert results == [True] * 20 + [False]
+    delivered = [rcpt for _, rcpts, _ in smtp_server.transactions for rcpt in rcpts]
+    assert sorted(delivered) == sorted(recipients[:20])
+    assert 2 <= len(smtp_server.transactions) < 5
+    assert all(b"undisclosed-recipients" in content for _, _, content in smtp_server.transactions)
+
+
+def test_idle_connections_are_recycled(smtp_server):
+    """Connections idle longer than the idle timeout are replaced."""
+    from airflow_notification_plugin.dispatchers.smtp import SMTPPool, _build_message
+
+    pool = SMTPPool("127.0.0.1", smtp_server.port, starttls=False, idle_timeout=0)
+    message = _build_message("airflow@example.com", "Test", "Hello", ["alice@example.com"])
+    pool.send_message(message, ["alice@example.com"])
+    pool.send_message(message, ["alice@example.com"])
+    pool.close()
+
+    assert pool.connections_opened == 2
+
+
+def test_release_closes_connections_left_idle_under_load():
+    """Connections at the bottom of the idle stack are closed once they time out."""
+    import time
+    from types import SimpleNamespace
+
+    from airflow_notification_plugin.dispatchers.smtp import SMTPPool
+
+    closed = []
+
+    def connection(name):
+        return SimpleNamespace(name=name, quit=lambda: closed.append(name))
+
+    pool = SMTPPool("127.0.0.1", 25, size=3, idle_timeout=60)
+    now = time.monotonic()
+    pool._idle.extend([(connection("stale"), now - 120), (connection("recent"), now - 30)])
+
+    pool._slots.acquire()
+    pool._release(connection("released"))
+
+    assert closed == ["stale"]
+    assert [connection.name for connection, _ in pool._idle] == ["recent", "released"]
+
+
+def test_batch_leader_waits_only_when_others_can_join(monkeypatch):
+    """Without concurrent senders, or with one recipient per call, a send does not wait."""
+    import time
+    from airflow_notification_plugin.dispatchers import batching
+    from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+
+    monkeypatch.setattr(batching, "concurrent_senders", False)
+    deliver = lambda recipients: {recipient: True for recipient in recipients}
+    started = time.monotonic()
+
+    assert RecipientBatcher(wait_ms=5000).send("message", "alice", deliver, max_recipients=10)
+    assert RecipientBatcher(wait_ms=5000, concurrent=True).send(
+        "message", "alice", deliver, max_recipients=1
+    )
+    assert time.monotonic() - started < 1
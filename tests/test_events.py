@@ -0,0 +1,90 @@
+"""Tests for the compact event representation."""
+
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+
+
+def _event():
+    from airflow_notification_plugin.events import NotificationEvent
+
+    return NotificationEvent(
+        "task",
+        dag_id="etl",
+        task_id="load",
+        run_id="scheduled__2024-01-01",
+        map_index=-1,
+        execution_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        state="failed",
+        try_number=2,
+        max_tries=3,
+        start_date=datetime(2024, 1, 1, 0, 5, tzinfo=timezone.utc),
+        duration=12.5,
+        hostname="worker-1",
+    )
+
+
+def test_event_mapping_view_matches_listener_dicts():
+    """The event reads like the dicts the listeners used to build."""
+    event = _event()
+
+    assert list(event) == [
+        "dag_id", "task_id", "run_id", "map_index", "execution_date", "state", "try_number",
+        "max_tries", "start_date", "end_date", "duration", "hostname", "log_url",
+    ]
+    assert event["execution_date"] == "2024-01-01 00:00:00+00:00"
+    assert event.get("end_date") is None
+    assert event.get("external_trigger", "missing") == "missing"
+    assert dict(**event)["state"] == "failed"
+    with pytest.raises(AttributeError):
+        event.state = "success"
+
+
+def test_event_binary_roundtrip():
+    """Events survive the binary encoding and pickling with interned ids."""
+    from airflow_notification_plugin.events import decode_event, encode_event
+    from airflow_notification_plugin.models import EventType
+
+    event = _event()
+    data = encode_event(EventType.TASK_FAILED, event)
+
+    event_type, decoded = decode_event(data)
+    assert event_type == EventType.TASK_FAILED
+    assert decoded == event
+    assert decoded.dag_id is event.dag_id
+    assert pickle.loads(pickle.dumps(event)) == event
+
+    with pytest.raises(ValueError):
+        decode_event(b"\x09" + data[1:])
+    with pytest.raises(ValueError):
+        decode_event(data[:-3])
+
+
+def test_decoded_dates_render_like_listener_dates():
+    """Dates come back as the pendulum datetimes the listeners pass in, and render the same."""
+    import pendulum
+    from airflow_notification_plugin.events import NotificationEvent, decode_event, encode_event
+    from airflow_notification_plugin.transport import decode_event_data, encode_event_data
+
+    event = NotificationEvent(
+        "task", dag_id="etl", execution_date=pendulum.datetime(2024, 1, 1, 0, 0, 0, 250000)
+    )
+
+    _, decoded = decode_event(encode_event(None, event))
+    queued = decode_event_data(encode_event_data(event))
+
+    for copy in (decoded, queued):
+        assert isinstance(copy.execution_date, pendulum.DateTime)
+        assert copy["execution_date"] == event["execution_date"] == "2024-01-01 00:00:00.250000+00:00"
+
+
+def test_long_strings_are_cut_at_a_character_boundary():
+    """Truncation to the 65535-byte limit never splits a multi-byte character."""
+    from airflow_notification_plugin.events import NotificationEvent, decode_event, encode_event
+
+    event = NotificationEvent("task", dag_id="etl", log_url="é" * 40000)
+
+    _, decoded = decode_event(encode_event(None, event))
+
+    assert decoded.log_url == "é" * 32767
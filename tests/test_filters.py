@@ -0,0 +1,40 @@
+"""Tests for subscription filter expressions."""
+
+import pytest
+
+
+def test_filter_expressions_evaluate_against_event_data():
+    from airflow_notification_plugin.dispatchers.filters import compile_filter
+
+    event = {"duration": 2000.0, "try_number": 3, "max_tries": 3, "hostname": "pool-a-7"}
+
+    assert compile_filter("duration > 1800")(event)
+    assert compile_filter("try_number == max_tries and not duration < 60")(event)
+    assert compile_filter("glob(hostname, 'pool-a-*') or regex(hostname, r'gpu-\\d+')")(event)
+    assert not compile_filter("hostname in ['pool-b-1', 'pool-b-2']")(event)
+    # Variables the event lacks are None
+    assert compile_filter("task_id is None")(event)
+    assert compile_filter("duration > 1800") is compile_filter("duration > 1800")
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "hostname.startswith('pool')",
+    "hostname[0] == 'p'",
+    "[x for x in hostname]",
+    "open('/etc/passwd')",
+    "undefined_name > 1",
+    "duration >",
+])
+def test_filter_expressions_reject_unsafe_syntax(expression):
+    from airflow_notification_plugin.dispatchers.filters import FilterError, compile_filter
+
+    with pytest.raises(FilterError):
+        compile_filter(expression)
+
+
+def test_broken_filters_let_notifications_through():
+    from airflow_notification_plugin.dispatchers.filters import matches_filter
+
+    assert matches_filter("duration > 1800", {"duration": None})
+    assert matches_filter("duration >", {"duration": 1})
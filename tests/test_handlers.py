@@ -0,0 +1,97 @@
+"""Tests for the lazily loaded handler registry."""
+
+import json
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from airflow_notification_plugin.dispatchers.handlers import NotificationHandler
+
+
+class PagerHandler(NotificationHandler):
+    """Stand-in for a handler shipped by another package."""
+
+    channel_type = "pager"
+    messages = []
+
+    def send(self, config, message, **kwargs):
+        self.messages.append((config["service"], message))
+        return True
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    from airflow_notification_plugin.dispatchers import handlers
+
+    monkeypatch.setattr(handlers, "HANDLERS", {})
+    monkeypatch.setattr(handlers, "_entry_points", lambda: [
+        EntryPoint("pager", f"{__name__}:PagerHandler", handlers.HANDLER_ENTRY_POINT_GROUP),
+    ])
+    handlers._handler_specs.cache_clear()
+    yield handlers
+    handlers._handler_specs.cache_clear()
+
+
+def test_handlers_are_instantiated_on_first_use(registry):
+    """Nothing is instantiated until a channel type is asked for, then the instance is reused."""
+    from airflow_notification_plugin.dispatchers.handlers import SlackHandler
+
+    assert registry.HANDLERS == {}
+
+    handler = registry.get_handler("slack")
+
+    assert isinstance(handler, SlackHandler)
+    assert registry.get_handler("SLACK") is handler
+    assert list(registry.HANDLERS) == ["slack"]
+
+
+def test_disabled_channel_is_never_imported(registry, monkeypatch):
+    """A disabled channel has no handler and its module is not imported."""
+    from airflow_notification_plugin.config import NotificationConfig
+
+    module = "airflow_notification_plugin.dispatchers.smtp"
+    monkeypatch.setattr(NotificationConfig, "ENABLE_EMAIL", False)
+    monkeypatch.delitem(sys.modules, module, raising=False)
+
+    assert registry.get_handler("email") is None
+    assert module not in sys.modules
+    assert registry.get_handler("no-such-channel") is None
+
+
+def test_custom_channel_uses_entry_point_handler(registry, monkeypatch, session_factory):
+    """A custom channel is delivered by the third-party handler its config names."""
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    session = session_factory()
+    channel = NotificationChannel(
+        name="on-call",
+        channel_type=ChannelType.CUSTOM,
+        config=json.dumps({"handler": "pager", "service": "data-platform"}),
+    )
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="alice", dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id
+    ))
+    session.commit()
+    session.close()
+
+    PagerHandler.messages = []
+    dispatcher = NotificationDispatcher(
+        session_factory, delivery_log=DeliveryLogBuffer(session_factory, enabled=False)
+    )
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert [service for service, _ in PagerHandler.messages] == ["data-platform"]
+
+    monkeypatch.setenv("NOTIFICATION_ENABLE_PAGER", "false")
+    registry.HANDLERS.clear()
+    assert registry.get_handler("pager") is None
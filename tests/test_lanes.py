@@ -0,0 +1,49 @@
+"""Tests for the priority lane scheduler."""
+
+import time
+from types import SimpleNamespace
+
+
+def test_lanes_are_weighted_and_channels_round_robin():
+    """Critical sends overtake a low-priority backlog; channels in a lane alternate."""
+    from airflow_notification_plugin.dispatchers.lanes import LaneScheduler
+    from airflow_notification_plugin.models import NotificationPriority
+
+    scheduler = LaneScheduler(
+        weights={NotificationPriority.CRITICAL: 3, NotificationPriority.LOW: 1}, max_wait=60
+    )
+    for n in range(4):
+        scheduler.put(f"low-a{n}", NotificationPriority.LOW, channel_key="a")
+    scheduler.put("low-b0", NotificationPriority.LOW, channel_key="b")
+    for n in range(3):
+        scheduler.put(f"crit{n}", NotificationPriority.CRITICAL, channel_key="a")
+
+    order = [scheduler.get(timeout=0) for _ in range(len(scheduler))]
+
+    assert order[:4] == ["crit0", "crit1", "low-a0", "crit2"]
+    assert order[4:6] == ["low-b0", "low-a1"]
+    assert scheduler.get(timeout=0) is None
+
+
+def test_overdue_sends_are_not_starved():
+    """A send waiting past max_wait is served before higher lanes."""
+    from airflow_notification_plugin.dispatchers.lanes import LaneScheduler
+    from airflow_notification_plugin.models import NotificationPriority
+
+    scheduler = LaneScheduler(max_wait=0.01)
+    scheduler.put("low", NotificationPriority.LOW)
+    time.sleep(0.02)
+    scheduler.put("critical", NotificationPriority.CRITICAL)
+
+    assert scheduler.get(timeout=0) == "low"
+    assert scheduler.stats()["critical"]["depth"] == 1
+
+
+def test_subscription_priority_overrides_event_default():
+    from airflow_notification_plugin.dispatchers.lanes import resolve_priority
+    from airflow_notification_plugin.models import EventType, NotificationPriority
+
+    assert resolve_priority(EventType.DAG_FAILED) == NotificationPriority.CRITICAL
+    assert resolve_priority(EventType.TASK_SUCCESS) == NotificationPriority.LOW
+    override = SimpleNamespace(priority=NotificationPriority.HIGH)
+    assert resolve_priority(EventType.TASK_SUCCESS, override) == NotificationPriority.HIGH
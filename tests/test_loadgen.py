@@ -0,0 +1,65 @@
+"""Tests for the load generator."""
+
+import json
+
+
+def test_synthesized_events_match_listener_shape():
+    """Synthetic events carry the same keys the listeners extract."""
+    from airflow_notification_plugin.loadgen import synthesize_events
+    from airflow_notification_plugin.models import EventType
+
+    events = synthesize_events(dags=3, tasks_per_dag=4, retry_rate=0.5, seed=7)
+
+    task_keys = {
+        "dag_id", "task_id", "run_id", "map_index", "execution_date", "state", "try_number",
+        "max_tries", "start_date", "end_date", "duration", "hostname", "log_url",
+    }
+    dag_keys = {"dag_id", "run_id", "execution_date", "state", "start_date", "end_date", "external_trigger"}
+    dag_events = {EventType.DAG_SUCCESS, EventType.DAG_FAILED}
+
+    assert [e.at for e in events] == sorted(e.at for e in events)
+    assert sum(1 for e in events if e.event_type in dag_events) == 3
+    for event in events:
+        expected = dag_keys if event.event_type in dag_events else task_keys
+        assert set(event.data) == expected
+
+
+def test_dry_run_reports_fanout_and_rate_limit(session_factory):
+    """A dry run routes events and projects rate-limit violations without sending."""
+    from airflow_notification_plugin.loadgen import (
+        LoadReport,
+        LoadTestDispatcher,
+        run_load,
+        synthesize_events,
+    )
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    session = session_factory()
+    channel = NotificationChannel(name="ops", channel_type=ChannelType.SLACK, config=json.dumps({}))
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="ops", dag_id="etl_dag_0000", event_type=EventType.TASK_SUCCESS, channel_id=channel.id
+    ))
+    session.commit()
+    session.close()
+
+    # Five runs of the subscribed DAG finishing their first task in the same storm
+    events = synthesize_events(
+        dags=2, tasks_per_dag=1, runs_per_dag=5, failure_rate=0, retry_rate=0, backfill=True, seed=3
+    )
+    dispatcher = LoadTestDispatcher(LoadReport(rate_limit_per_minute=1), session_factory=session_factory)
+    summary = run_load(events, dispatcher).summary()
+
+    channel = summary["channels"]["slack:ops"]
+    assert summary["events"] == 20
+    assert summary["notifications"] == 5
+    assert summary["fanout"]["routed_events"] == 5
+    assert channel["notifications"] == 5
+    assert channel["peak_per_minute"] > 1
+    assert channel["notifications_over_rate_limit"] >= channel["peak_per_minute"] - 1
@@ -0,0 +1,71 @@
+"""Tests for glob/regex DAG id matching."""
+
+import pytest
+
+
+def test_pattern_matcher_globs_and_regexes():
+    from airflow_notification_plugin.dispatchers.matching import PatternMatcher
+    from airflow_notification_plugin.models import MatchType
+
+    matcher = PatternMatcher([
+        (1, MatchType.GLOB, "etl_finance_*"),
+        (2, MatchType.GLOB, "etl_*_daily"),
+        (3, MatchType.GLOB, "etl_finance_daily"),
+        (4, MatchType.REGEX, r"etl_(finance|sales)_\d+"),
+        (5, MatchType.GLOB, "*"),
+    ])
+
+    assert sorted(matcher.match("etl_finance_daily")) == [1, 2, 3, 5]
+    assert sorted(matcher.match("etl_sales_42")) == [4, 5]
+    # Regexes are anchored
+    assert sorted(matcher.match("etl_sales_42_backfill")) == [5]
+    assert matcher.match("etl_finance_daily") is matcher.match("etl_finance_daily")
+
+
+def test_validate_pattern_rejects_bad_regex():
+    from airflow_notification_plugin.dispatchers.matching import validate_pattern
+    from airflow_notification_plugin.models import MatchType
+
+    validate_pattern(MatchType.GLOB, "etl_[")
+    with pytest.raises(ValueError):
+        validate_pattern(MatchType.REGEX, "etl_(")
+
+
+def test_regexes_with_group_references_match_on_their_own():
+    """Backreferences and duplicate group names do not break the combined regex."""
+    from airflow_notification_plugin.dispatchers.matching import PatternMatcher
+    from airflow_notification_plugin.models import MatchType
+
+    matcher = PatternMatcher([
+        (1, MatchType.REGEX, r"(sales)_\d+"),
+        (2, MatchType.REGEX, r"(\w+)_to_\1"),
+        (3, MatchType.REGEX, r"(?P<team>\w+)_daily"),
+        (4, MatchType.REGEX, r"(?P<team>\w+)_hourly"),
+    ])
+
+    assert matcher.match("s3_to_s3") == (2,)
+    assert matcher.match("s3_to_gcs") == ()
+    assert matcher.match("sales_1") == (1,)
+    assert matcher.match("finance_daily") == (3,)
+    assert matcher.match("finance_hourly") == (4,)
+
+
+def test_combined_regexes_report_every_matching_pattern():
+    """One DAG id matching several regexes yields all of them, with no per-regex matching."""
+    from airflow_notification_plugin.dispatchers.matching import PatternMatcher
+    from airflow_notification_plugin.models import MatchType
+
+    patterns = [(n, MatchType.REGEX, rf"team{n}_\w+") for n in range(200)]
+    patterns += [
+        ("any_sales", MatchType.REGEX, r"\w+_sales"),
+        ("team7", MatchType.REGEX, r"team7_(sales|finance)"),
+        ("pair", MatchType.REGEX, r"(\w+)_\1"),
+    ]
+    matcher = PatternMatcher(patterns)
+    # Only the backreference is tried on its own
+    matcher._regexes = [(key, None) for key, _ in matcher._regexes]
+
+    assert sorted(matcher.match("team7_sales"), key=str) == [7, "any_sales", "team7"]
+    assert matcher.match("team150_x") == (150,)
+    assert matcher.match("etl_etl") == ("pair",)
+    assert matcher.match("etl") == ()
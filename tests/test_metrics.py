@@ -0,0 +1,56 @@
+"""Tests for dispatch pipeline metrics."""
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+
+def _sample(name, **labels):
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_handler_send_is_instrumented():
+    """Every handler send is counted by channel type and outcome."""
+    from airflow_notification_plugin.dispatchers.handlers import SlackHandler
+
+    labels = {"channel_type": "slack", "outcome": "failure"}
+    before = _sample("notification_handler_send_total", **labels)
+    observed = _sample("notification_handler_send_seconds_count", **labels)
+
+    # No webhook_url configured, so the handler fails without any HTTP call
+    assert SlackHandler().send({}, "message") is False
+
+    assert _sample("notification_handler_send_total", **labels) == before + 1
+    assert _sample("notification_handler_send_seconds_count", **labels) == observed + 1
+
+
+def test_metrics_endpoint():
+    """The blueprint serves the Prometheus text format."""
+    from flask import Flask
+    from airflow_notification_plugin.api.metrics import metrics_blueprint
+
+    app = Flask(__name__)
+    app.register_blueprint(metrics_blueprint)
+
+    response = app.test_client().get("/api/v1/notification/metrics")
+
+    assert response.status_code == 200
+    assert b"notification_dispatch_total" in response.data
+
+
+def test_textfile_exporter_needs_multiprocess_dir(tmp_path, monkeypatch):
+    """Without PROMETHEUS_MULTIPROC_DIR no process overwrites the shared textfile with its own counts."""
+    from airflow_notification_plugin import metrics
+
+    path = tmp_path / "notification.prom"
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(metrics.config, "METRICS_TEXTFILE_PATH", str(path))
+    monkeypatch.setattr(metrics, "_textfile_checked", False)
+    monkeypatch.setattr(metrics, "_textfile_exporter", None)
+
+    metrics.ensure_textfile_exporter()
+
+    assert metrics._textfile_exporter is None
+    assert not path.exists()
@@ -0,0 +1,204 @@
+"""Tests for the memory-mapped routing snapshot."""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def routing_data(session_factory):
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        MatchType,
+        NotificationChannel,
+        NotificationPriority,
+        NotificationTemplate,
+    )
+
+    session = session_factory()
+    channel = NotificationChannel(
+        name="alerts", channel_type=ChannelType.SLACK, config=json.dumps({"webhook_url": "x"})
+    )
+    session.add(channel)
+    session.flush()
+    for user_id, dag_id, match_type in [
+        ("alice", "etl", MatchType.EXACT),
+        ("bob", "etl_*", MatchType.GLOB),
+        ("carol", "reporting", MatchType.EXACT),
+    ]:
+        session.add(DagSubscription(
+            user_id=user_id, dag_id=dag_id, match_type=match_type,
+            event_type=EventType.DAG_FAILED, channel_id=channel.id,
+            priority=NotificationPriority.HIGH if user_id == "alice" else None,
+        ))
+    session.add(DagSubscription(
+        user_id="dave", dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id,
+        is_active=False,
+    ))
+    session.add(NotificationTemplate(
+        name="slack-dag-failed", event_type=EventType.DAG_FAILED, channel_type=ChannelType.SLACK,
+        template_content="DAG {{ dag_id }} is down",
+    ))
+    session.commit()
+    session.close()
+
+
+def _count_statements(session):
+    from sqlalchemy import event
+
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(1))
+    return statements
+
+
+def test_snapshot_routes_exact_and_pattern_subscriptions(session_factory, routing_data, tmp_path):
+    """Active exact and glob subscriptions are found with their channel and template."""
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+    from airflow_notification_plugin.models import ChannelType, EventType, NotificationPriority
+
+    session = session_factory()
+    snapshot = SharedRouting(str(tmp_path / "routing.snap")).current(session)
+    session.close()
+
+    subscriptions = snapshot.subscriptions(snapshot.match(EventType.DAG_FAILED, "etl_daily"))
+    assert [s.user_id for s in subscriptions] == ["bob"]
+
+    subscriptions = snapshot.subscriptions(snapshot.match(EventType.DAG_FAILED, "etl"))
+    assert [s.user_id for s in subscriptions] == ["alice"]
+    assert subscriptions[0].priority == NotificationPriority.HIGH
+    assert subscriptions[0].channel.name == "alerts"
+    assert subscriptions[0].channel.channel_type == ChannelType.SLACK
+
+    assert snapshot.match(EventType.DAG_SUCCESS, "etl") == ()
+    [template] = snapshot.template_rows()
+    assert (template.name, template.event_type, template.channel_type) == (
+        "slack-dag-failed", EventType.DAG_FAILED, ChannelType.SLACK
+    )
+    assert template.template_content == "DAG {{ dag_id }} is down"
+
+
+def test_snapshot_is_shared_and_regenerated_on_change(session_factory, routing_data, tmp_path):
+    """Other processes map the file without querying; the generation moves only on changes."""
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+    from airflow_notification_plugin.models import DagSubscription, EventType
+
+    path = str(tmp_path / "routing.snap")
+    session = session_factory()
+    first = SharedRouting(path).current(session)
+
+    other = SharedRouting(path)
+    statements = _count_statements(session)
+    assert other.current(session).generation == first.generation == 1
+    assert statements == []
+
+    refresher = SharedRouting(path, refresh_seconds=0)
+    assert refresher.refresh(session)
+    assert refresher.current(session).generation == 1
+
+    session.query(DagSubscription).filter(DagSubscription.user_id == "carol").update(
+        {DagSubscription.is_active: False}
+    )
+    session.commit()
+    assert refresher.refresh(session)
+    refresher._checked_at = None
+    snapshot = refresher.current(session)
+    session.close()
+
+    assert snapshot.generation == 2
+    assert snapshot.match(EventType.DAG_FAILED, "reporting") == ()
+    # A process that mapped the old file keeps routing from it until it checks again
+    assert first.match(EventType.DAG_FAILED, "reporting") != ()
+
+
+def test_dispatcher_routes_from_snapshot(session_factory, routing_data, tmp_path, monkeypatch):
+    """With a snapshot path, dispatch renders the snapshot's template for its subscriptions."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+    from airflow_notification_plugin.models import EventType
+
+    path = str(tmp_path / "routing.snap")
+    session = session_factory()
+    SharedRouting(path).current(session)
+    session.close()
+
+    messages = []
+
+    class RecordingHandler(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            messages.append((kwargs["user_id"], message))
+            return True
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", RecordingHandler())
+    dispatcher = NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path=path,
+    )
+
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl_daily"})
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert messages == [("bob", "DAG etl_daily is down"), ("alice", "DAG etl is down")]
+    assert dispatcher._routing.snapshot.generation == 1
+
+
+def test_task_processes_only_read_the_snapshot(session_factory, routing_data, tmp_path):
+    """A reader never builds the file and routes from the database once it is out of date."""
+    import os
+    import time
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+    from airflow_notification_plugin.worker import DispatchWorker
+    from airflow_notification_plugin.worker.sources import InMemorySource
+
+    path = str(tmp_path / "routing.snap")
+    session = session_factory()
+    reader = SharedRouting(path, refresh_seconds=30, writer=False)
+    assert reader.current(session) is None
+    assert not os.path.exists(path)
+
+    # The dispatch worker keeps the file fresh between events
+    worker = DispatchWorker(InMemorySource(), processes=0, dispatcher_kwargs={
+        "session_factory": session_factory, "routing_snapshot_path": path,
+    })
+    worker._refresh_routing()
+    reader._checked_at = None
+    assert reader.current(session).generation == 1
+
+    # A writer that stopped refreshing: past twice the interval the file is not trusted
+    old = time.time() - 61
+    os.utime(path, (old, old))
+    reader._checked_at = None
+    assert reader.current(session) is None
+    worker._routing._checked_at = None
+    worker._refresh_routing()
+    reader._checked_at = None
+    assert reader.current(session).generation == 1
+
+    # An edit this process noticed also makes it distrust the file until it is rebuilt
+    reader.invalidate()
+    assert reader.current(session) is None
+    session.close()
+
+
+def test_snapshot_is_private_to_its_owner(session_factory, routing_data, tmp_path):
+    """The snapshot holds channel secrets and is created owner-only, whatever the umask."""
+    import os
+    import stat
+    from airflow_notification_plugin.dispatchers.routing import SharedRouting
+
+    path = tmp_path / "routing.snap"
+    umask = os.umask(0o022)
+    try:
+        session = session_factory()
+        SharedRouting(str(path)).current(session)
+        session.close()
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
@@ -0,0 +1,103 @@
+"""Tests for the Unix socket sidecar transport."""
+
+
+def test_sidecar_roundtrip(tmp_path):
+    """Events sent by the client arrive at the worker's socket source."""
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.transport.sidecar import SidecarClient
+    from airflow_notification_plugin.worker import UnixSocketSource
+
+    path = str(tmp_path / "notify.sock")
+    source = UnixSocketSource(path)
+    client = SidecarClient(path, buffer_size=4)
+
+    assert client.send(EventType.TASK_FAILED, {"dag_id": "etl", "task_id": "load"})
+    assert client.send(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    batch = source.get_batch(10, timeout=1)
+    assert [(e.event_type, e.event_data["dag_id"]) for e in batch] == [
+        (EventType.TASK_FAILED, "etl"),
+        (EventType.DAG_FAILED, "etl"),
+    ]
+    client.close()
+    source.close()
+
+
+def test_socket_is_private_to_the_worker_user(tmp_path):
+    """The socket and a directory created for it are not accessible to other users."""
+    import os
+    import stat
+    from airflow_notification_plugin.worker import UnixSocketSource
+
+    path = tmp_path / "run" / "notify.sock"
+    umask = os.umask(0o002)
+    try:
+        source = UnixSocketSource(str(path))
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+    source.close()
+
+
+def test_sidecar_unavailable_falls_back(tmp_path):
+    """Without a sidecar the client refuses the event so the caller dispatches it."""
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.transport.sidecar import SidecarClient
+
+    client = SidecarClient(str(tmp_path / "missing.sock"))
+
+    assert client.send(EventType.TASK_FAILED, {"dag_id": "etl"}) is False
+
+
+def test_sidecar_buffer_is_bounded(tmp_path):
+    """When the sidecar's queue is full, events are buffered up to the limit, then refused."""
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.transport.sidecar import SidecarClient
+    from airflow_notification_plugin.worker import UnixSocketSource
+
+    path = str(tmp_path / "notify.sock")
+    source = UnixSocketSource(path)
+    client = SidecarClient(path, buffer_size=3)
+
+    sent = 0
+    while client.send(EventType.TASK_SUCCESS, {"dag_id": "etl", "n": sent}):
+        sent += 1
+        assert sent < 100000
+
+    assert len(client._buffer) == 3
+
+    received = []
+    while True:
+        batch = source.get_batch(1000, timeout=0.1)
+        if not batch:
+            break
+        received.extend(batch)
+        client.flush()
+
+    assert [e.event_data["n"] for e in received] == list(range(sent))
+    client.close()
+    source.close()
+
+
+def test_listener_leaves_nothing_buffered(tmp_path, monkeypatch):
+    """Events still buffered after a listener call are dispatched in-process."""
+    from airflow_notification_plugin import listeners
+    from airflow_notification_plugin.config import config
+    from airflow_notification_plugin.dispatchers import dispatcher
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.transport import sidecar
+
+    dispatched = []
+    monkeypatch.setattr(config, "TRANSPORT", "socket")
+    monkeypatch.setattr(dispatcher, "dispatch", lambda *event: dispatched.append(event))
+    client = sidecar.SidecarClient(str(tmp_path / "missing.sock"))
+    # Left over from an earlier event, when the sidecar was busy
+    client._buffer.append((b"", EventType.TASK_SUCCESS, {"dag_id": "etl"}))
+    monkeypatch.setattr(sidecar, "_client", client)
+
+    listeners._emit(EventType.TASK_FAILED, {"dag_id": "etl"})
+
+    assert [event_type for event_type, _ in dispatched] == [EventType.TASK_FAILED, EventType.TASK_SUCCESS]
+    assert len(client._buffer) == 0
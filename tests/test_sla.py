@@ -0,0 +1,89 @@
+"""Tests for SLA-miss tracking."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+
+def _task_instance(task_id, sla, interval_end):
+    return SimpleNamespace(
+        dag_id="etl",
+        task_id=task_id,
+        run_id="scheduled__1",
+        map_index=-1,
+        execution_date=interval_end - timedelta(days=1),
+        task=SimpleNamespace(sla=sla),
+        dag_run=SimpleNamespace(data_interval_end=interval_end),
+    )
+
+
+def test_sla_tracker_emits_only_outstanding_due_deadlines(session_factory):
+    """Deadlines of tasks that succeeded are dropped; due ones are emitted once."""
+    from airflow_notification_plugin.models import EventType, SlaDeadline
+    from airflow_notification_plugin.sla import SlaTracker, clear_deadline, register_deadline
+
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    late = _task_instance("load", timedelta(minutes=10), past)
+    on_time = _task_instance("extract", timedelta(minutes=10), past)
+    future = _task_instance("report", timedelta(hours=2), past)
+    no_sla = _task_instance("cleanup", None, past)
+
+    for ti in (late, on_time, future):
+        assert register_deadline(ti, session_factory)
+    assert register_deadline(late, session_factory)  # a retry keeps the first deadline
+    assert not register_deadline(no_sla, session_factory)
+    clear_deadline(on_time, session_factory)
+
+    tracker = SlaTracker(session_factory, check_interval=0)
+    misses = tracker.poll()
+
+    assert [(event_type, event["task_id"]) for event_type, event in misses] == [
+        (EventType.SLA_MISS, "load")
+    ]
+    assert tracker.poll() == []
+    session = session_factory()
+    assert [row.task_id for row in session.query(SlaDeadline)] == ["report"]
+    session.close()
+    tracker.close()
+
+
+def test_final_failure_clears_the_deadline(monkeypatch):
+    """A task that fails for good drops its deadline; one that will be retried keeps it."""
+    from airflow.utils.state import TaskInstanceState
+    from airflow_notification_plugin import listeners
+    from airflow_notification_plugin.config import config
+
+    cleared = []
+    monkeypatch.setattr(config, "SLA_TRACKING_ENABLED", True)
+    monkeypatch.setattr(listeners, "clear_deadline", lambda ti: cleared.append(ti.task_id))
+    monkeypatch.setattr(listeners, "_extract_task_event_data", lambda ti: {"dag_id": ti.dag_id})
+    monkeypatch.setattr(listeners, "_emit", lambda event_type, event_data: None)
+
+    past = datetime.now(timezone.utc)
+    retried = _task_instance("load", timedelta(minutes=10), past)
+    retried.state = TaskInstanceState.UP_FOR_RETRY
+    failed = _task_instance("report", timedelta(minutes=10), past)
+    failed.state = TaskInstanceState.FAILED
+
+    listeners.on_task_instance_failed(None, retried, None)
+    listeners.on_task_instance_failed(None, failed, None)
+
+    assert cleared == ["report"]
+
+
+def test_lost_lock_connection_is_noticed_and_replaced(session_factory):
+    """A lock whose connection failed is no longer held, and is taken again on a new connection."""
+    from airflow_notification_plugin.sla import AdvisoryLock
+
+    def broken(*args, **kwargs):
+        raise ConnectionError("server closed the connection")
+
+    lock = AdvisoryLock(session_factory.kw["bind"])
+    assert lock.acquire()
+    lock._connection.close()
+    lock._connection = SimpleNamespace(execute=broken, close=broken)
+
+    assert lock.acquire()
+    assert lock.held
+    assert not isinstance(lock._connection, SimpleNamespace)
+    lock.release()
+    assert not lock.held
@@ -0,0 +1,148 @@
+"""Tests for SMS recipient resolution and multi-recipient sends."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+def _add_contacts(session_factory, *contacts):
+    from airflow_notification_plugin.models import UserContact
+
+    session = session_factory()
+    for user_id, phone_number in contacts:
+        session.add(UserContact(user_id=user_id, phone_number=phone_number))
+    session.commit()
+    session.close()
+
+
+def test_contact_directory_bulk_loads_and_caches(session_factory):
+    """Uncached users are loaded in bulk; cached ones are served until the TTL expires."""
+    from sqlalchemy import event
+
+    from airflow_notification_plugin.dispatchers.contacts import ContactDirectory
+
+    _add_contacts(session_factory, ("alice", "+15550001"), ("bob", "+15550002"))
+    directory = ContactDirectory(ttl_seconds=300)
+    session = session_factory()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(1))
+
+    directory.prefetch(session, ["alice", "bob", "carol"])
+    directory.prefetch(session, ["alice", "bob", "carol"])
+    session.close()
+
+    assert len(statements) == 1
+    assert directory.get("alice").phone_number == "+15550001"
+    assert directory.get("carol") is None
+
+
+def test_dispatch_resolves_phone_numbers(session_factory, monkeypatch):
+    """The SMS handler receives the subscriber's phone number from the contact directory."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    class RecordingSMSHandler(handlers.NotificationHandler):
+        channel_type = "sms"
+
+        def __init__(self):
+            self.phone_numbers = []
+
+        def send(self, config, message, **kwargs):
+            self.phone_numbers.append(kwargs.get("phone_number"))
+            return True
+
+    _add_contacts(session_factory, ("alice", "+15550001"))
+    session = session_factory()
+    channel = NotificationChannel(
+        name="sms", channel_type=ChannelType.SMS, config=json.dumps({"api_url": "http://sms"})
+    )
+    session.add(channel)
+    session.flush()
+    for user_id in ("alice", "bob"):
+        session.add(DagSubscription(
+            user_id=user_id, dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id
+        ))
+    session.commit()
+    session.close()
+
+    handler = RecordingSMSHandler()
+    dispatcher = NotificationDispatcher(
+        session_factory, delivery_log=DeliveryLogBuffer(session_factory, enabled=False)
+    )
+    monkeypatch.setitem(handlers.HANDLERS, "sms", handler)
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert sorted(handler.phone_numbers, key=str) == ["+15550001", None]
+
+
+@pytest.fixture
+def gateway():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests_seen.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield f"http://{host}:{port}/send", requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_sms_batches_recipients_of_the_same_message(gateway, monkeypatch):
+    """Concurrent sends of one message share gateway calls when max_recipients allows it."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+
+    monkeypatch.setattr(handlers, "sms_batcher", RecipientBatcher(wait_ms=200, concurrent=True))
+    url, requests_seen = gateway
+    config = {"api_url": url, "api_key": "key", "max_recipients": 50}
+    numbers = [f"+1555000{i:02d}" for i in range(30)]
+    handler = handlers.SMSHandler()
+
+    with ThreadPoolExecutor(max_workers=len(numbers)) as pool:
+        results = list(pool.map(
+            lambda number: handler.send(config, "DAG etl failed", phone_number=number), numbers
+        ))
+
+    assert all(results)
+    assert len(requests_seen) < 5
+    assert sorted(number for request in requests_seen for number in request["to"]) == numbers
+
+
+def test_sms_send_does_not_wait_without_concurrent_senders(gateway, monkeypatch):
+    """Outside the dispatch worker a multi-recipient send is made at once, alone."""
+    import time
+    from airflow_notification_plugin.dispatchers import batching, handlers
+    from airflow_notification_plugin.dispatchers.batching import RecipientBatcher
+
+    monkeypatch.setattr(batching, "concurrent_senders", False)
+    monkeypatch.setattr(handlers, "sms_batcher", RecipientBatcher(wait_ms=5000))
+    url, requests_seen = gateway
+    started = time.monotonic()
+
+    assert handlers.SMSHandler().send(
+        {"api_url": url, "api_key": "key", "max_recipients": 50}, "DAG etl failed",
+        phone_number="+155500001",
+    )
+    assert time.monotonic() - started < 1
+    assert [request["to"] for request in requests_seen] == [["+155500001"]]
@@ -0,0 +1,139 @@
+"""Tests for the precomputed template resolution table."""
+
+import pytest
+
+
+@pytest.fixture
+def templates(session_factory):
+    from airflow_notification_plugin.models import ChannelType, EventType, NotificationTemplate
+
+    session = session_factory()
+    rows = [
+        NotificationTemplate(
+            name="slack-dag-failed", event_type=EventType.DAG_FAILED,
+            channel_type=ChannelType.SLACK, template_content="DAG {{ dag_id }} is down",
+        ),
+        NotificationTemplate(
+            name="slack-etl-failed", event_type=EventType.DAG_FAILED,
+            channel_type=ChannelType.SLACK, dag_id="etl",
+            template_content="ETL is down, page the data team",
+        ),
+        NotificationTemplate(
+            name="oncall", event_type=EventType.DAG_FAILED,
+            channel_type=ChannelType.SLACK, template_content="On-call: {{ dag_id }}",
+        ),
+        NotificationTemplate(
+            name="inactive", event_type=EventType.DAG_FAILED, channel_type=ChannelType.SMS,
+            template_content="never used", is_active=False,
+        ),
+    ]
+    session.add_all(rows)
+    session.commit()
+    ids = {row.name: row.id for row in rows}
+    session.close()
+    return ids
+
+
+def test_resolution_falls_back_from_subscription_to_default(session_factory, templates):
+    """Subscription template, then the DAG's, then the channel type's, then the built-in default."""
+    from airflow_notification_plugin.dispatchers.templates import TemplateTable
+    from airflow_notification_plugin.models import ChannelType, EventType
+
+    table = TemplateTable()
+    session = session_factory()
+    table.refresh(session)
+    session.close()
+
+    def resolve(*args):
+        template = table.resolve(EventType.DAG_FAILED, *args)
+        return template.name, template.source
+
+    assert resolve(ChannelType.SLACK, "etl", templates["oncall"]) == ("oncall", "subscription")
+    assert resolve(ChannelType.SLACK, "etl") == ("slack-etl-failed", "dag")
+    # The oldest of several matching templates wins
+    assert resolve(ChannelType.SLACK, "reporting") == ("slack-dag-failed", "channel")
+    assert resolve(ChannelType.SMS, "etl") == ("default_dag_failed", "default")
+    # An unknown or inactive subscription template falls back like no template
+    assert resolve(ChannelType.SMS, None, templates["inactive"]) == ("default_dag_failed", "default")
+
+    rows = {
+        (row["event_type"], row["channel_type"]): (row["template"], row["source"])
+        for row in table.resolution("etl")
+    }
+    assert len(rows) == len(EventType) * len(ChannelType)
+    assert rows[("dag_failed", "slack")] == ("slack-etl-failed", "dag")
+    assert rows[("task_failed", "email")] == ("default_task_failed", "default")
+
+
+def test_dispatch_uses_dag_and_subscription_templates(session_factory, templates, monkeypatch):
+    """Dispatch renders the per-DAG override and a subscription's own template."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    messages = []
+
+    class RecordingHandler(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            messages.append((kwargs["user_id"], message))
+            return True
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", RecordingHandler())
+    session = session_factory()
+    channel = NotificationChannel(name="alerts", channel_type=ChannelType.SLACK, config="{}")
+    session.add(channel)
+    session.flush()
+    for user_id, dag_id, template_id in [
+        ("alice", "etl", None),
+        ("bob", "etl", templates["oncall"]),
+        ("carol", "reporting", None),
+    ]:
+        session.add(DagSubscription(
+            user_id=user_id, dag_id=dag_id, event_type=EventType.DAG_FAILED,
+            channel_id=channel.id, template_id=template_id,
+        ))
+    session.commit()
+    session.close()
+
+    dispatcher = NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path="",
+    )
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "reporting"})
+
+    assert messages == [
+        ("alice", "ETL is down, page the data team"),
+        ("bob", "On-call: etl"),
+        ("carol", "DAG reporting is down"),
+    ]
+
+
+def test_resolution_endpoint(session_factory, templates, monkeypatch):
+    """The API lists the resolution for a DAG."""
+    from flask import Flask
+    from airflow_notification_plugin.api import templates as templates_api
+
+    monkeypatch.setattr(templates_api, "AirflowSession", session_factory)
+    app = Flask(__name__)
+    app.register_blueprint(templates_api.templates_blueprint)
+
+    response = app.test_client().get("/api/v1/notification/template-resolution?dag_id=etl")
+
+    assert response.status_code == 200
+    assert response.json["dag_id"] == "etl"
+    assert {
+        "event_type": "dag_failed",
+        "channel_type": "slack",
+        "template": "slack-etl-failed",
+        "source": "dag",
+    } in response.json["resolution"]
@@ -0,0 +1,41 @@
+"""Tests for the dispatcher tracing hooks."""
+
+import pytest
+
+
+def test_noop_tracer_is_shared_and_inert():
+    """The default tracer hands out one shared span and records nothing."""
+    from airflow_notification_plugin.tracing import Tracer
+
+    tracer = Tracer()
+    with tracer.start_span("a") as first, tracer.start_span("b") as second:
+        first.set_attribute("key", "value")
+        second.set_error("boom")
+
+    assert first is second
+    assert tracer.enabled is False
+
+
+def test_opentelemetry_adapter_records_span_tree():
+    """Nested spans become children and keep task instance identifiers."""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from airflow_notification_plugin.tracing import OpenTelemetryTracer, correlation_attributes
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = OpenTelemetryTracer(provider.get_tracer(__name__))
+
+    event_data = {"dag_id": "etl", "task_id": "load", "run_id": "manual__1", "try_number": 2}
+    with tracer.start_span("notification.dispatch", correlation_attributes(event_data)):
+        with tracer.start_span("notification.render") as span:
+            span.set_error("render failed")
+
+    render, dispatch = exporter.get_finished_spans()
+    assert render.parent.span_id == dispatch.context.span_id
+    assert dispatch.attributes["airflow.task_id"] == "load"
+    assert dispatch.attributes["airflow.try_number"] == 2
+    assert not render.status.is_ok
@@ -0,0 +1,214 @@
+"""Tests for the admin list views of large tables and their bulk actions."""
+
+import re
+
+import pytest
+
+
+@pytest.fixture
+def admin_client(session_factory):
+    from flask import Flask
+    from flask_admin import Admin
+    from flask_babel import Babel
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        DeviceRegistration,
+        EventType,
+        NotificationChannel,
+        PlatformType,
+    )
+    from airflow_notification_plugin.views import (
+        DagSubscriptionView,
+        DeviceRegistrationView,
+        NotificationChannelView,
+    )
+
+    session = session_factory()
+    channels = [
+        NotificationChannel(name=f"channel-{i}", channel_type=ChannelType.SLACK, config="{}")
+        for i in range(5)
+    ]
+    session.add_all(channels)
+    session.flush()
+    for i in range(45):
+        session.add(DagSubscription(
+            user_id=f"user{i:02d}", dag_id="etl", event_type=EventType.DAG_FAILED,
+            channel_id=channels[i % 5].id,
+        ))
+    for token in ["abc123", "abd456", "xabc789", "a_c000"]:
+        session.add(DeviceRegistration(
+            device_token=token, platform_type=PlatformType.IOS, user_id="alice"
+        ))
+    session.commit()
+
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    Babel(app)
+    admin = Admin(app)
+    subscriptions = DagSubscriptionView(session)
+    subscriptions.exact_count_limit = 30
+    admin.add_view(subscriptions)
+    admin.add_view(DeviceRegistrationView(session))
+    admin.add_view(NotificationChannelView(session))
+    yield app.test_client(), session
+    session.close()
+
+
+def _users(response):
+    return re.findall(r">\s*(user\d+)\s*<", response.get_data(as_text=True))
+
+
+def _link(response, label):
+    html = response.get_data(as_text=True)
+    return re.search(rf'<a href="([^"]+)">{label}</a>', html).group(1).replace("&amp;", "&")
+
+
+def test_subscription_list_joins_channels_and_bounds_count(admin_client):
+    """One query for the rows with their channels, and a count that stops at the limit."""
+    from sqlalchemy import event
+
+    client, session = admin_client
+    statements = []
+    event.listen(
+        session.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    response = client.get("/admin/dagsubscription/")
+
+    assert response.status_code == 200
+    assert len(_users(response)) == 20
+    assert "channel-4" in response.get_data(as_text=True)
+    # The third statement lists the channels for the reassign actions
+    statements = [statement for statement in statements if "dag_subscription" in statement]
+    assert len(statements) == 2
+    assert "LIMIT" in statements[0]
+    assert "JOIN notification_channel" in statements[1]
+
+
+def test_subscription_pages_seek_by_id(admin_client):
+    """Next and previous links carry the page's boundary ids and return the same rows."""
+    from airflow_notification_plugin.models import DagSubscription
+
+    client, session = admin_client
+
+    first = client.get("/admin/dagsubscription/")
+    next_url = _link(first, "&gt;")
+    assert "after=" in next_url
+    # Rows removed from earlier pages do not shift the following ones, unlike with OFFSET
+    session.query(DagSubscription).filter(DagSubscription.user_id == "user05").delete()
+    session.commit()
+    second = client.get(next_url)
+    assert _users(second) == [f"user{i:02d}" for i in range(20, 40)]
+
+    third = client.get(_link(second, "&gt;"))
+    assert _users(third) == [f"user{i:02d}" for i in range(40, 45)]
+
+    previous_url = _link(third, "&lt;")
+    assert "before=" in previous_url
+    assert _users(client.get(previous_url)) == _users(second)
+
+
+def test_device_search_matches_prefixes_only(admin_client):
+    """Search matches the start of device tokens, with LIKE wildcards taken literally."""
+    client, _ = admin_client
+
+    html = client.get("/admin/deviceregistration/?search=abc").get_data(as_text=True)
+    assert "List (1)" in html
+
+    html = client.get("/admin/deviceregistration/?search=a_").get_data(as_text=True)
+    assert "List (1)" in html
+
+
+def test_deactivate_all_matching_runs_one_update(admin_client):
+    """The action updates every row matching the list's search, without loading rows."""
+    from sqlalchemy import event
+    from airflow_notification_plugin.models import DagSubscription, NotificationMeta
+
+    client, session = admin_client
+    statements = []
+    event.listen(
+        session.get_bind(), "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    response = client.post("/admin/dagsubscription/action/", data={
+        "action": "deactivate_matching",
+        "rowid": ["1"],
+        "url": "/admin/dagsubscription/?search=user1",
+    })
+
+    assert response.status_code == 302
+    assert [s for s in statements if s.startswith("SELECT dag_subscription.")] == []
+    assert len([s for s in statements if s.startswith("UPDATE dag_subscription")]) == 1
+    session.expire_all()
+    inactive = session.query(DagSubscription.user_id).filter(DagSubscription.is_active == False)
+    assert sorted(user_id for user_id, in inactive) == [f"user{i}" for i in range(10, 20)]
+    assert session.query(NotificationMeta).get("dag_subscription").generation == 1
+
+
+def test_matching_action_needs_a_filter(admin_client):
+    """Without a search or filter, "all matching" changes nothing."""
+    from airflow_notification_plugin.models import DeviceRegistration
+
+    client, session = admin_client
+
+    client.post("/admin/deviceregistration/action/", data={
+        "action": "deactivate_matching",
+        "rowid": ["1"],
+        "url": "/admin/deviceregistration/",
+    })
+
+    inactive = session.query(DeviceRegistration).filter(DeviceRegistration.is_active == False)
+    assert inactive.count() == 0
+
+
+def test_move_subscriptions_to_another_channel(admin_client):
+    """Subscriptions of the selected channels move to the chosen channel."""
+    from sqlalchemy import func
+    from airflow_notification_plugin.models import DagSubscription, NotificationChannel
+
+    client, session = admin_client
+    channels = {
+        name: channel_id
+        for channel_id, name in session.query(NotificationChannel.id, NotificationChannel.name)
+    }
+
+    html = client.get("/admin/notificationchannel/").get_data(as_text=True)
+    assert "Move subscriptions to channel-1" in html
+
+    client.post("/admin/notificationchannel/action/", data={
+        "action": f"reassign_channel_{channels['channel-1']}",
+        "rowid": [str(channels["channel-0"]), str(channels["channel-2"])],
+    })
+
+    session.expire_all()
+    counts = dict(
+        session.query(DagSubscription.channel_id, func.count()).group_by(DagSubscription.channel_id)
+    )
+    assert counts == {channels["channel-1"]: 27, channels["channel-3"]: 9, channels["channel-4"]: 9}
+
+
+def test_reassign_selected_subscriptions(admin_client):
+    """In the subscription list the reassign action moves the selected rows themselves."""
+    from airflow_notification_plugin.models import DagSubscription, NotificationChannel
+
+    client, session = admin_client
+    target = session.query(NotificationChannel).filter(NotificationChannel.name == "channel-3").one()
+    selected = [
+        subscription_id for subscription_id, in session.query(DagSubscription.id).filter(
+            DagSubscription.user_id.in_(["user00", "user01"])
+        )
+    ]
+
+    client.post("/admin/dagsubscription/action/", data={
+        "action": f"reassign_channel_{target.id}",
+        "rowid": [str(subscription_id) for subscription_id in selected],
+    })
+
+    session.expire_all()
+    moved = session.query(DagSubscription.user_id).filter(DagSubscription.channel_id == target.id)
+    assert sorted(user_id for user_id, in moved) == ["user00", "user01", "user03", "user08"] + [
+        f"user{i}" for i in range(13, 45, 5)
+    ]
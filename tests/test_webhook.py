@@ -0,0 +1,207 @@
+"""Tests for the generic webhook handler."""
+
+import gzip
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class WebhookStub:
+    """HTTP/1.1 endpoint recording (client port, headers, decoded envelope); ``/fail`` answers 500."""
+
+    def __init__(self):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append((self.client_address[1], dict(self.headers), body))
+                self.send_response(500 if self.path == "/fail" else 202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = WebhookStub()
+    yield server
+    server.close()
+
+
+def _envelope(headers, body):
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def test_webhook_batches_compresses_and_signs(stub):
+    """Events are posted in signed, gzipped envelopes of batch_size, the rest after the interval."""
+    from airflow_notification_plugin.dispatchers.webhook import WebhookHandler
+
+    handler = WebhookHandler()
+    config = {
+        "url": stub.url + "/events",
+        "batch_size": 10,
+        "batch_interval_ms": 50,
+        "gzip_min_bytes": 512,
+        "secret": "s3cret",
+    }
+
+    for i in range(25):
+        assert handler.send(
+            config, f"Task {i} failed",
+            user_id="bot", event_type="task_failed", event_data={"dag_id": "etl", "task_id": str(i)},
+        )
+    deadline = time.monotonic() + 5
+    while len(stub.requests) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(stub.requests) == 3
+    assert len({port for port, _, _ in stub.requests}) == 1  # keep-alive reuse
+    envelopes = [_envelope(headers, body) for _, headers, body in stub.requests]
+    assert [envelope["count"] for envelope in envelopes] == [10, 10, 5]
+    assert envelopes[0]["events"][0] == {
+        "event_type": "task_failed",
+        "user_id": "bot",
+        "message": "Task 0 failed",
+        "data": {"dag_id": "etl", "task_id": "0"},
+    }
+
+    _, headers, body = stub.requests[0]
+    assert headers["Content-Encoding"] == "gzip"
+    expected = hmac.new(
+        b"s3cret", headers["X-Notification-Timestamp"].encode() + b"." + body, hashlib.sha256
+    ).hexdigest()
+    assert headers["X-Notification-Signature"] == f"sha256={expected}"
+
+
+def test_unbatched_webhook_reports_status(stub):
+    """Without batching each send is one request and failures are reported."""
+    from airflow_notification_plugin.dispatchers.webhook import WebhookHandler
+
+    handler = WebhookHandler()
+
+    assert handler.send({"url": stub.url + "/events"}, "DAG etl failed", event_type="dag_failed")
+    assert handler.last_status_code == 202
+    assert not handler.send({"url": stub.url + "/fail"}, "DAG etl failed")
+    assert handler.last_status_code == 500
+
+    _, headers, body = stub.requests[0]
+    assert "Content-Encoding" not in headers and "X-Notification-Signature" not in headers
+    assert _envelope(headers, body)["events"][0]["message"] == "DAG etl failed"
+
+
+def test_dispatch_posts_pending_batches(stub, session_factory, monkeypatch):
+    """A dispatch ends with its batched events posted, without waiting for the interval."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.dispatchers.webhook import WebhookHandler
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    monkeypatch.setitem(handlers.HANDLERS, "webhook", WebhookHandler())
+    session = session_factory()
+    channel = NotificationChannel(
+        name="incidents", channel_type=ChannelType.WEBHOOK,
+        config=json.dumps({"url": stub.url + "/events", "batch_size": 10, "batch_interval_ms": 60000}),
+    )
+    session.add(channel)
+    session.flush()
+    for user_id in ["alice", "bob"]:
+        session.add(DagSubscription(
+            user_id=user_id, dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id,
+        ))
+    session.commit()
+    session.close()
+
+    dispatcher = NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path="",
+    )
+    dispatcher.dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert len(stub.requests) == 1
+    _, headers, body = stub.requests[0]
+    assert sorted(event["user_id"] for event in _envelope(headers, body)["events"]) == ["alice", "bob"]
+
+
+def test_batched_sends_are_logged_with_their_real_outcome(stub, session_factory, monkeypatch):
+    """Delivery log rows of batched sends are written when the batch is posted, as sent or failed."""
+    from prometheus_client import REGISTRY
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.dispatchers.webhook import WebhookHandler
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        DeliveryStatus,
+        EventType,
+        NotificationChannel,
+        NotificationDelivery,
+    )
+
+    def queued():
+        labels = {"event_type": "dag_failed", "channel_type": "webhook", "outcome": "queued"}
+        return REGISTRY.get_sample_value("notification_send_total", labels) or 0.0
+
+    monkeypatch.setitem(handlers.HANDLERS, "webhook", WebhookHandler())
+    session = session_factory()
+    for user_id, path in [("alice", "/events"), ("bob", "/fail")]:
+        channel = NotificationChannel(
+            name=user_id, channel_type=ChannelType.WEBHOOK,
+            config=json.dumps({"url": stub.url + path, "batch_size": 10, "batch_interval_ms": 60000}),
+        )
+        session.add(channel)
+        session.flush()
+        session.add(DagSubscription(
+            user_id=user_id, dag_id="etl", event_type=EventType.DAG_FAILED, channel_id=channel.id,
+        ))
+    session.commit()
+
+    before = queued()
+    NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=True),
+        routing_snapshot_path="",
+    ).dispatch(EventType.DAG_FAILED, {"dag_id": "etl"})
+
+    assert queued() == before + 2
+    rows = {
+        user_id: (status, http_status)
+        for user_id, status, http_status in session.query(
+            DagSubscription.user_id, NotificationDelivery.status, NotificationDelivery.http_status
+        ).join(NotificationDelivery, NotificationDelivery.subscription_id == DagSubscription.id)
+    }
+    assert rows == {"alice": (DeliveryStatus.SENT, None), "bob": (DeliveryStatus.FAILED, 500)}
+    session.close()
@@ -0,0 +1,173 @@
+"""Tests for the Web Push handler."""
+
+import hashlib
+import hmac
+import json
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class PushServiceStub:
+    """HTTP/1.1 push service recording requests; ``/gone`` answers 410."""
+
+    def __init__(self):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append((self.client_address[1], self.path, dict(self.headers), body))
+                self.send_response(410 if self.path == "/gone" else 201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Browser:
+    """Holds a subscription's private keys and decrypts aes128gcm messages like a browser."""
+
+    def __init__(self, endpoint):
+        import os
+
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        from airflow_notification_plugin.dispatchers.webpush import _public_bytes, b64url_encode
+
+        self.key = ec.generate_private_key(ec.SECP256R1())
+        self.auth = os.urandom(16)
+        self.public_key = _public_bytes(self.key)
+        self.device_token = json.dumps({
+            "endpoint": endpoint,
+            "keys": {"p256dh": b64url_encode(self.public_key), "auth": b64url_encode(self.auth)},
+        })
+
+    def decrypt(self, body):
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        def hkdf(salt, ikm, info, length):
+            prk = hmac.new(salt, ikm, hashlib.sha256).digest()
+            return hmac.new(prk, info + b"\x01", hashlib.sha256).digest()[:length]
+
+        salt, (record_size, id_length) = body[:16], struct.unpack("!IB", body[16:21])
+        server_key = body[21:21 + id_length]
+        shared = self.key.exchange(
+            ec.ECDH(), ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), server_key)
+        )
+        ikm = hkdf(self.auth, shared, b"WebPush: info\x00" + self.public_key + server_key, 32)
+        cek = hkdf(salt, ikm, b"Content-Encoding: aes128gcm\x00", 16)
+        nonce = hkdf(salt, ikm, b"Content-Encoding: nonce\x00", 12)
+        plaintext = AESGCM(cek).decrypt(nonce, body[21 + id_length:], None)
+        assert plaintext.endswith(b"\x02")
+        return server_key, json.loads(plaintext[:-1])
+
+
+@pytest.fixture
+def push_service():
+    from airflow_notification_plugin.dispatchers import webpush
+
+    server = PushServiceStub()
+    yield server
+    webpush.close_clients()
+    server.close()
+
+
+@pytest.fixture
+def vapid():
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    from airflow_notification_plugin.dispatchers.webpush import b64url_encode
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    private_key = b64url_encode(key.private_numbers().private_value.to_bytes(32, "big"))
+    return key, {"vapid_private_key": private_key, "vapid_subject": "mailto:ops@example.com"}
+
+
+def test_webpush_messages_decrypt_and_reuse_cached_keys(push_service, vapid):
+    """Messages decrypt with the subscription's keys; key material and VAPID token are reused."""
+    import jwt
+
+    from airflow_notification_plugin.dispatchers.webpush import WebPushHandler
+
+    key, channel_config = vapid
+    browser = Browser(push_service.url + "/push/abc")
+    handler = WebPushHandler()
+
+    assert handler.send(channel_config, "Task failed", device_token=browser.device_token)
+    assert handler.send(channel_config, "Task retried", device_token=browser.device_token)
+
+    (port1, path, headers1, body1), (port2, _, headers2, body2) = push_service.requests
+    assert path == "/push/abc"
+    assert port1 == port2  # pooled keep-alive connection
+    assert headers1["Content-Encoding"] == "aes128gcm"
+    assert headers1["Authorization"] == headers2["Authorization"]
+
+    server_key1, message1 = browser.decrypt(body1)
+    server_key2, message2 = browser.decrypt(body2)
+    assert message1["body"] == "Task failed" and message2["body"] == "Task retried"
+    assert server_key1 == server_key2 and body1[:16] != body2[:16]  # cached keys, fresh salt
+
+    token = headers1["Authorization"].split("t=", 1)[1].split(",", 1)[0]
+    claims = jwt.decode(
+        token, key.public_key(), algorithms=["ES256"], audience=push_service.url
+    )
+    assert claims["sub"] == "mailto:ops@example.com"
+
+
+def test_webpush_gone_subscription_is_reported(push_service, vapid):
+    """A 410 from the push service fails the send with the status the dispatcher acts on."""
+    from airflow_notification_plugin.dispatchers.webpush import WebPushHandler
+
+    handler = WebPushHandler()
+    browser = Browser(push_service.url + "/gone")
+
+    assert not handler.send(vapid[1], "Task failed", device_token=browser.device_token)
+    assert handler.last_status_code in handler.device_gone_status_codes
+    assert not handler.send(vapid[1], "Task failed", device_token="fcm-registration-token")
+
+
+def test_webpush_message_is_cut_to_one_record(push_service, vapid):
+    """A body too long for one aes128gcm record is cut short; data that cannot fit is not sent."""
+    from airflow_notification_plugin.dispatchers.webpush import (
+        MAX_PLAINTEXT_SIZE,
+        WebPushHandler,
+        encrypt,
+        subscription_keys,
+    )
+
+    handler = WebPushHandler()
+    browser = Browser(push_service.url + "/push/abc")
+
+    assert handler.send(vapid[1], "Task failed: " + "é" * 5000, device_token=browser.device_token)
+    [(_, _, _, body)] = push_service.requests
+    _, message = browser.decrypt(body)
+    assert message["body"].startswith("Task failed: éé") and message["body"].endswith("…")
+    assert len(json.dumps(message).encode("utf-8")) <= MAX_PLAINTEXT_SIZE
+
+    assert not handler.send(
+        vapid[1], "Task failed", device_token=browser.device_token, data={"log": "x" * 5000}
+    )
+    assert len(push_service.requests) == 1
+    with pytest.raises(ValueError):
+        encrypt(subscription_keys(browser.device_token), b"x" * (MAX_PLAINTEXT_SIZE + 1))
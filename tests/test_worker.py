@@ -0,0 +1,443 @@
+"""Tests for the standalone dispatch worker and its event sources."""
+
+import json
+import threading
+import urllib.request
+
+import pytest
+
+
+@pytest.fixture
+def recording_handler(monkeypatch):
+    from airflow_notification_plugin.dispatchers import handlers
+
+    calls = []
+
+    class Recording(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            calls.append(message)
+            return True
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", Recording())
+    return calls
+
+
+def _subscribe(session_factory):
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+
+    session = session_factory()
+    channel = NotificationChannel(name="ops", channel_type=ChannelType.SLACK, config=json.dumps({}))
+    session.add(channel)
+    session.flush()
+    session.add(DagSubscription(
+        user_id="ops", dag_id="etl", event_type=EventType.TASK_FAILED, channel_id=channel.id
+    ))
+    session.commit()
+    session.close()
+
+
+def test_outbox_source_claims_and_acks(session_factory):
+    """Claimed rows are hidden from other workers and deleted on ack."""
+    from airflow_notification_plugin.models import EventType, NotificationOutbox
+    from airflow_notification_plugin.transport import write_outbox
+    from airflow_notification_plugin.worker import OutboxSource
+
+    for n in range(3):
+        assert write_outbox(EventType.TASK_FAILED, {"dag_id": "etl", "n": n}, session_factory)
+
+    first = OutboxSource(session_factory, worker_id="a")
+    second = OutboxSource(session_factory, worker_id="b")
+    batch = first.get_batch(2, timeout=0)
+
+    assert [event.event_data["n"] for event in batch] == [0, 1]
+    assert [event.event_data["n"] for event in second.get_batch(10, timeout=0)] == [2]
+
+    first.ack(batch)
+    session = session_factory()
+    assert session.query(NotificationOutbox).count() == 1
+    session.close()
+
+
+def test_worker_renews_leases_of_inflight_outbox_rows(session_factory):
+    """Rows still in flight get their lease renewed, so another worker cannot claim them."""
+    from datetime import datetime, timedelta
+    from airflow_notification_plugin.models import EventType, NotificationOutbox
+    from airflow_notification_plugin.transport import write_outbox
+    from airflow_notification_plugin.worker import DispatchWorker, OutboxSource
+
+    for n in range(2):
+        assert write_outbox(EventType.TASK_FAILED, {"dag_id": "etl", "n": n}, session_factory)
+    source = OutboxSource(session_factory, worker_id="a", lease_seconds=3)
+    worker = DispatchWorker(source, processes=0)
+    worker._inflight[0] = source.get_batch(10, timeout=0)
+
+    # The claims have nearly run out, and one row was reclaimed by another worker meanwhile
+    session = session_factory()
+    session.query(NotificationOutbox).update(
+        {NotificationOutbox.claimed_at: datetime.utcnow() - timedelta(seconds=2)}
+    )
+    session.query(NotificationOutbox).filter(
+        NotificationOutbox.id == worker._inflight[0][1].token
+    ).update({NotificationOutbox.claimed_by: "b"})
+    session.commit()
+
+    worker._renewed_at -= 1
+    worker._renew_leases()
+
+    assert OutboxSource(session_factory, worker_id="c", lease_seconds=3).get_batch(10, timeout=0) == []
+    claimed_by = dict(session.query(NotificationOutbox.id, NotificationOutbox.claimed_by))
+    ages = [datetime.utcnow() - claimed_at for claimed_at, in session.query(NotificationOutbox.claimed_at)
+            .filter(NotificationOutbox.claimed_by == "a")]
+    assert list(claimed_by.values()).count("a") == 1
+    assert all(age < timedelta(seconds=1) for age in ages)
+    session.close()
+
+
+def test_reclaimed_outbox_rows_are_logged_as_later_attempts(session_factory, recording_handler):
+    """A row claimed again after its lease ran out is dispatched, and logged, as attempt 2."""
+    from datetime import datetime, timedelta
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.dispatcher import NotificationDispatcher
+    from airflow_notification_plugin.models import EventType, NotificationDelivery, NotificationOutbox
+    from airflow_notification_plugin.transport import write_outbox
+    from airflow_notification_plugin.worker import OutboxSource
+
+    _subscribe(session_factory)
+    assert write_outbox(EventType.TASK_FAILED, {"dag_id": "etl"}, session_factory)
+    assert [event.attempt for event in OutboxSource(session_factory).get_batch(1, timeout=0)] == [1]
+
+    session = session_factory()
+    session.query(NotificationOutbox).update(
+        {NotificationOutbox.claimed_at: datetime.utcnow() - timedelta(hours=1)}
+    )
+    session.commit()
+    [event] = OutboxSource(session_factory).get_batch(1, timeout=0)
+    assert event.attempt == 2
+
+    NotificationDispatcher(
+        session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=True),
+        routing_snapshot_path="",
+    ).dispatch(event.event_type, event.event_data, event.attempt)
+
+    assert [attempt for attempt, in session.query(NotificationDelivery.attempt)] == [2]
+    session.close()
+
+
+def test_worker_drains_in_memory_source(session_factory, recording_handler):
+    """Events put on the source are dispatched, then the worker drains on stop."""
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.worker import DispatchWorker, InMemorySource
+
+    _subscribe(session_factory)
+    source = InMemorySource()
+    worker = DispatchWorker(
+        source,
+        processes=0,
+        poll_interval=0.05,
+        probe_port=0,
+        dispatcher_kwargs={
+            "session_factory": session_factory,
+            "delivery_log": DeliveryLogBuffer(session_factory, enabled=True),
+        },
+    )
+    for n in range(5):
+        source.put(EventType.TASK_FAILED, {"dag_id": "etl", "task_id": f"t{n}"})
+
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        for _ in range(100):
+            if worker.dispatched == 5:
+                break
+            threading.Event().wait(0.05)
+        port = worker._probe.port
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz") as response:
+            assert response.status == 200
+    finally:
+        worker.stop()
+        thread.join(timeout=10)
+
+    assert worker.dispatched == 5
+    assert len(recording_handler) == 5
+    assert not worker.is_ready()
+
+
+def test_overflow_policies_when_lanes_are_full(session_factory):
+    """Full lanes spill, evict lower-priority sends or drop, per event type."""
+    from concurrent.futures import Future
+    from types import SimpleNamespace
+
+    from airflow_notification_plugin.dispatchers.lanes import LaneScheduler
+    from airflow_notification_plugin.models import EventType, NotificationOutbox, NotificationPriority
+    from airflow_notification_plugin.worker import SendJob, WorkerDispatcher
+
+    scheduler = LaneScheduler(capacity=1)
+    low_send = SendJob(Future(), print, (), EventType.TASK_SUCCESS, "etl")
+    scheduler.put(low_send, NotificationPriority.LOW)
+    dispatcher = WorkerDispatcher(SimpleNamespace(scheduler=scheduler), session_factory=session_factory)
+
+    # task_failed spills to the outbox
+    assert dispatcher._admit(EventType.TASK_FAILED, {"dag_id": "etl"}, 1) is False
+    session = session_factory()
+    assert session.query(NotificationOutbox).count() == 1
+    session.close()
+
+    # dag_success (normal lane) evicts the queued low-priority send
+    assert dispatcher._admit(EventType.DAG_SUCCESS, {"dag_id": "etl"}, 1) is True
+    assert low_send.future.result() is False
+    assert len(scheduler) == 0
+
+    # task_success has nothing lower to evict, so it is dropped
+    scheduler.put(SendJob(Future(), print, ()), NotificationPriority.NORMAL)
+    assert dispatcher._admit(EventType.TASK_SUCCESS, {"dag_id": "etl"}, 1) is False
+
+
+def test_event_is_admitted_only_if_all_of_its_sends_fit(session_factory):
+    """An event fanning out to several subscriptions needs room for every send."""
+    from concurrent.futures import Future
+    from types import SimpleNamespace
+
+    from airflow_notification_plugin.dispatchers.lanes import LaneScheduler
+    from airflow_notification_plugin.models import EventType, NotificationPriority
+    from airflow_notification_plugin.worker import SendJob, WorkerDispatcher
+
+    scheduler = LaneScheduler(capacity=3)
+    dispatcher = WorkerDispatcher(SimpleNamespace(scheduler=scheduler), session_factory=session_factory)
+    # More sends than the capacity are admitted into empty lanes only
+    assert dispatcher._admit(EventType.DAG_SUCCESS, {"dag_id": "etl"}, 5) is True
+
+    low_send = SendJob(Future(), print, (), EventType.TASK_SUCCESS, "etl")
+    scheduler.put(low_send, NotificationPriority.LOW)
+    scheduler.put(SendJob(Future(), print, ()), NotificationPriority.NORMAL)
+    assert scheduler.has_room(1) and not scheduler.has_room(2)
+
+    # dag_success needs two more slots but only one low send can be evicted: nothing is evicted
+    assert dispatcher._admit(EventType.DAG_SUCCESS, {"dag_id": "etl"}, 3) is False
+    assert len(scheduler) == 2 and not low_send.future.done()
+
+    # Evicting the low send makes room for two
+    assert dispatcher._admit(EventType.DAG_SUCCESS, {"dag_id": "etl"}, 2) is True
+    assert low_send.future.result() is False
+    assert len(scheduler) == 1
+
+
+def test_deferred_send_completes_with_its_batch():
+    """A send returning a Future (a batched webhook) is done when that Future is, not before."""
+    from concurrent.futures import Future
+
+    from airflow_notification_plugin.worker import LaneSender, _count_failed
+
+    sender = LaneSender(1)
+    posted, failed = Future(), Future()
+    try:
+        sends = [sender.submit(lambda: posted), sender.submit(lambda: failed)]
+        # The sender thread is free again while the batch is pending
+        assert sender.submit(lambda: True).result(timeout=5) is True
+        assert not any(send.done() for send in sends)
+
+        posted.set_result(True)
+        failed.set_exception(RuntimeError("500 - batch rejected"))
+        assert _count_failed(sends) == 1
+    finally:
+        sender.close()
+
+
+def test_queued_send_outcome_is_recorded_on_completion(session_factory, monkeypatch):
+    """A queued send is counted by its real result, once it has completed."""
+    from prometheus_client import REGISTRY
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.worker import LaneSender, WorkerDispatcher
+
+    release = threading.Event()
+
+    class Failing(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            release.wait(5)
+            return False
+
+    def count(outcome):
+        labels = {"event_type": "task_failed", "channel_type": "slack", "outcome": outcome}
+        return REGISTRY.get_sample_value("notification_send_total", labels) or 0.0
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", Failing())
+    _subscribe(session_factory)
+    sent, failed = count("sent"), count("failed")
+    sender = LaneSender(1)
+    dispatcher = WorkerDispatcher(
+        sender,
+        session_factory=session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path="",
+    )
+    try:
+        dispatcher.dispatch(EventType.TASK_FAILED, {"dag_id": "etl"})
+        # Nothing is reported while the send is still in flight
+        assert (count("sent"), count("failed")) == (sent, failed)
+
+        release.set()
+        assert dispatcher.wait_for_sends() == 1
+        assert (count("sent"), count("failed")) == (sent, failed + 1)
+    finally:
+        sender.close()
+
+
+def test_outbox_is_claimed_by_priority(session_factory):
+    """Failure events are claimed before older success events."""
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin.transport import write_outbox
+    from airflow_notification_plugin.worker import OutboxSource
+
+    for event_type in [EventType.TASK_SUCCESS, EventType.TASK_SUCCESS, EventType.DAG_FAILED]:
+        assert write_outbox(event_type, {"dag_id": "etl"}, session_factory)
+
+    batch = OutboxSource(session_factory).get_batch(2, timeout=0)
+
+    assert [event.event_type for event in batch] == [EventType.DAG_FAILED, EventType.TASK_SUCCESS]
+
+
+def test_worker_keeps_lanes_fed_while_sends_run(session_factory, monkeypatch):
+    """Later batches are queued while earlier sends are still running, and acked when done."""
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.models import EventType
+    from airflow_notification_plugin import worker as worker_module
+    from airflow_notification_plugin.worker import DispatchWorker, InMemorySource
+
+    release = threading.Event()
+
+    class Blocking(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            return release.wait(5)
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", Blocking())
+    _subscribe(session_factory)
+    source = InMemorySource()
+    worker = DispatchWorker(
+        source,
+        processes=0,
+        send_concurrency=1,
+        batch_size=2,
+        poll_interval=0.05,
+        dispatcher_kwargs={
+            "session_factory": session_factory,
+            "delivery_log": DeliveryLogBuffer(session_factory, enabled=False),
+            "routing_snapshot_path": "",
+        },
+    )
+    for n in range(6):
+        source.put(EventType.TASK_FAILED, {"dag_id": "etl", "task_id": f"t{n}"})
+
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        for _ in range(100):
+            dispatcher = worker_module._process_dispatcher
+            if dispatcher is not None and len(dispatcher._sender.scheduler) == 5:
+                break
+            threading.Event().wait(0.05)
+        # All three batches are queued: one send is running, the other five wait in the lanes
+        assert len(worker_module._process_dispatcher._sender.scheduler) == 5
+        assert worker._inflight_events == 6
+        assert worker.dispatched == 0
+
+        release.set()
+        for _ in range(100):
+            if worker.dispatched == 6:
+                break
+            threading.Event().wait(0.05)
+    finally:
+        release.set()
+        worker.stop()
+        thread.join(timeout=10)
+
+    assert worker.dispatched == 6
+    assert worker.failed_sends == 0
+
+
+def test_full_lanes_shed_sends_through_dispatch(session_factory, monkeypatch):
+    """Once dispatch has filled the lanes, drop-policy events evict lower sends or are dropped."""
+    from prometheus_client import REGISTRY
+    from airflow_notification_plugin.dispatchers import handlers
+    from airflow_notification_plugin.dispatchers.delivery_log import DeliveryLogBuffer
+    from airflow_notification_plugin.dispatchers.lanes import LaneScheduler
+    from airflow_notification_plugin.models import (
+        ChannelType,
+        DagSubscription,
+        EventType,
+        NotificationChannel,
+    )
+    from airflow_notification_plugin.worker import LaneSender, WorkerDispatcher
+
+    release = threading.Event()
+    started = threading.Event()
+    sent = []
+
+    class Blocking(handlers.NotificationHandler):
+        channel_type = "slack"
+
+        def send(self, config, message, **kwargs):
+            started.set()
+            release.wait(5)
+            sent.append((kwargs["event_type"], kwargs["task_id"]))
+            return True
+
+    def shed(event_type, reason):
+        labels = {"event_type": event_type, "reason": reason}
+        return REGISTRY.get_sample_value("notification_shed_total", labels) or 0.0
+
+    monkeypatch.setitem(handlers.HANDLERS, "slack", Blocking())
+    session = session_factory()
+    channel = NotificationChannel(name="ops", channel_type=ChannelType.SLACK, config="{}")
+    session.add(channel)
+    session.flush()
+    for event_type in (EventType.TASK_SUCCESS, EventType.DAG_SUCCESS):
+        session.add(DagSubscription(
+            user_id="ops", dag_id="etl", event_type=event_type, channel_id=channel.id
+        ))
+    session.commit()
+    session.close()
+
+    dropped, evicted = shed("task_success", "dropped"), shed("task_success", "evicted")
+    sender = LaneSender(1, LaneScheduler(capacity=2))
+    dispatcher = WorkerDispatcher(
+        sender,
+        session_factory=session_factory,
+        delivery_log=DeliveryLogBuffer(session_factory, enabled=False),
+        routing_snapshot_path="",
+    )
+    try:
+        dispatcher.dispatch(EventType.TASK_SUCCESS, {"dag_id": "etl", "task_id": "running"})
+        assert started.wait(5)
+        for task_id in ("queued-1", "queued-2", "dropped"):
+            dispatcher.dispatch(EventType.TASK_SUCCESS, {"dag_id": "etl", "task_id": task_id})
+        # dag_success is in the normal lane and evicts the newest low-lane send
+        dispatcher.dispatch(EventType.DAG_SUCCESS, {"dag_id": "etl", "task_id": None})
+
+        assert shed("task_success", "dropped") == dropped + 1
+        assert shed("task_success", "evicted") == evicted + 1
+        release.set()
+        assert dispatcher.wait_for_sends() == 1
+    finally:
+        release.set()
+        sender.close()
+
+    assert sent == [
+        ("task_success", "running"),
+        ("dag_success", None),
+        ("task_success", "queued-1"),
+    ]